@@ -0,0 +1,70 @@
+"""
+DESCRIPTION:
+    Deployment specs for the voice questionnaire agents.
+
+    my-voic-agent-test-v2 is the "Sarah" persona deployed by main.py;
+    my-voic-agent is the terse-rules agent deployed by agent.py.
+    The model deployment name is read from AZURE_AI_MODEL_DEPLOYMENT_NAME.
+    COSMOS_MCP_SERVER_URL overrides the MCP server, for example to use a
+    tunnel to cosmos_mcp_server.py. INSTRUCTION_TOKEN_BUDGET, when set, caps
+    the compiled instructions (see instruction_compiler.py); deployment fails
+    if the required rule blocks do not fit.
+"""
+
+import os
+
+from agent_tools import get_graph
+from instruction_compiler import compile_instructions
+from instructions import SARAH_PROFILE, VOICE_PROFILE
+from provisioning import AgentSpec
+
+COSMOS_MCP_SERVER_URL = os.environ.get(
+    "COSMOS_MCP_SERVER_URL", "https://voice-mcp-server-csg4e6dqh3f5ezf6.eastus2-01.azurewebsites.net/cosmos/"
+)
+
+
+# Instruction profile behind each deployed agent.
+AGENT_PROFILES = {
+    "my-voic-agent": VOICE_PROFILE,
+    "my-voic-agent-test-v2": SARAH_PROFILE,
+}
+
+
+def compiled_instructions(profile):
+    budget = os.environ.get("INSTRUCTION_TOKEN_BUDGET")
+    return compile_instructions(profile, get_graph(), budget=int(budget) if budget else None).text
+
+
+def sarah_agent_spec():
+    return AgentSpec(
+        agent_name="my-voic-agent-test-v2",
+        vector_store_name="ProductInfoStoreTest",
+        instructions=compiled_instructions(SARAH_PROFILE),
+        model=os.environ["AZURE_AI_MODEL_DEPLOYMENT_NAME"],
+        mcp_tool={
+            "server_label": "Voicmcp",
+            "server_url": COSMOS_MCP_SERVER_URL,
+            "require_approval": "never",
+            "project_connection_id": "Voicmcp",
+        },
+    )
+
+
+def voice_agent_spec():
+    return AgentSpec(
+        agent_name="my-voic-agent",
+        vector_store_name="ProductInfoStore",
+        instructions=compiled_instructions(VOICE_PROFILE),
+        model=os.environ["AZURE_AI_MODEL_DEPLOYMENT_NAME"],
+        mcp_tool={
+            "server_label": "voicemcpserver",
+            "server_url": COSMOS_MCP_SERVER_URL,
+            "require_approval": "never",
+        },
+    )
+
+
+AGENT_SPECS = {
+    "my-voic-agent": voice_agent_spec,
+    "my-voic-agent-test-v2": sarah_agent_spec,
+}
@@ -0,0 +1,277 @@
+"""
+DESCRIPTION:
+    Local function tools exposed to the voice agent.
+
+    Each tool is declared once as a JSON schema and registered on the
+    PromptAgentDefinition as a FunctionTool. The model emits a function_call
+    item; the caller runs it here with call_tool() and sends the result back
+    as a function_call_output item.
+
+USAGE:
+    from agent_tools import function_tools, call_tool
+
+    tools = [mcp_tool, *function_tools()]
+    output = call_tool("get_question", '{"questionId": "Q1"}')
+"""
+
+import json
+
+from answer_persistence import AnswerPersister, open_answer_sink
+from choice_matching import build_choice_indexes, choice_index, node_choices
+from graph_analysis import analyze
+from normalization import normalize
+from phrasing import PHRASING_KEY, render_confirmation
+from question_graph import QuestionGraph
+from session_store import SessionState, open_session_store
+from summary import build_payload, summary_chunks
+
+_graph = None
+_report = None
+_session_store = None
+_answer_persister = None
+
+
+def get_graph():
+    """Question graph shared by all tool calls in this process, loaded on first use."""
+    global _graph
+    if _graph is None:
+        _graph = QuestionGraph.load()
+        if isinstance(_graph.nodes, dict):
+            # A .qbank decodes nodes on demand; its choice indexes are built on first use instead.
+            build_choice_indexes(_graph)
+    return _graph
+
+
+def get_report():
+    """Precomputed path table for the shared graph."""
+    global _report
+    if _report is None:
+        _report = analyze(get_graph())
+    return _report
+
+
+def get_session_store():
+    """Session backend shared by all tool calls in this process, opened on first use."""
+    global _session_store
+    if _session_store is None:
+        _session_store = open_session_store()
+    return _session_store
+
+
+def get_answer_persister():
+    """Section-by-section Cosmos writer, or None when ANSWER_SINK is not set."""
+    global _answer_persister
+    if _answer_persister is None:
+        sink = open_answer_sink()
+        _answer_persister = AnswerPersister(sink, get_graph()) if sink is not None else False
+    return _answer_persister or None
+
+
+def _progress(question_id):
+    shortest, longest = get_report().remaining.get(question_id, (None, None))
+    return {
+        "percent_done": get_report().progress(question_id, get_graph().start_id),
+        "questions_left_min": shortest,
+        "questions_left_max": longest,
+    }
+
+
+def _get_question(questionId):
+    return {**get_graph().get_question(questionId), "progress": _progress(questionId)}
+
+
+def _next_question(questionId, answer):
+    graph = get_graph()
+    next_id = graph.next_question(questionId, answer)
+    if next_id is None:
+        return {"questionId": questionId, "next": None}
+    return {"questionId": questionId, "next": next_id, "node": _get_question(next_id)}
+
+
+def _normalize_answer(questionId, answer):
+    node = get_graph().get_question(questionId)
+    result = normalize(node, answer)
+    if result["valid"] and node.get(PHRASING_KEY):
+        result["confirmation"] = render_confirmation(node, result["normalized"])
+    return result
+
+
+def _match_choice(questionId, answer):
+    node = get_graph().get_question(questionId)
+    if not node_choices(node):
+        raise ValueError(f"Question {questionId} has no choices")
+    return {"questionId": questionId, **choice_index(node).match(answer).to_dict()}
+
+
+def _read_summary(sessionId):
+    state = get_session_store().load(sessionId)
+    if state is None:
+        raise KeyError(f"Unknown session: {sessionId}")
+    graph = get_graph()
+    return {"chunks": list(summary_chunks(graph, state.answers)), "payload": build_payload(graph, sessionId, state.answers)}
+
+
+def _load_session(sessionId):
+    store = get_session_store()
+    state = store.load(sessionId)
+    if state is None:
+        state = SessionState(sessionId, current_node=get_graph().start_id)
+        store.save(state)
+    return state.to_dict()
+
+
+def _save_session(sessionId, currentNode, answers, retries, silences, completed):
+    store = get_session_store()
+    state = store.load(sessionId) or SessionState(sessionId)
+    get_graph().get_question(currentNode)
+    for item in answers:
+        state.answers[item["questionId"]] = item["value"]
+    state.current_node = currentNode
+    state.retries = retries
+    state.silences = silences
+    state.completed = completed
+    store.save(state)
+    result = {"saved": True, "answers": len(state.answers), "currentNode": state.current_node, "completed": state.completed}
+    persister = get_answer_persister()
+    if persister is not None:
+        result["persisted"] = persister.observe(sessionId, state.answers, currentNode, completed)
+    return result
+
+
+TOOL_SPECS = {
+    "get_question": {
+        "description": "Load one question node by id. Returns its text, type, choices, meta, next branches and interview progress.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "questionId": {"type": "string", "description": "Question id, for example Q1 or Q26_HTN_2."},
+            },
+            "required": ["questionId"],
+            "additionalProperties": False,
+        },
+        "handler": _get_question,
+    },
+    "next_question": {
+        "description": "Resolve the next question after a confirmed and validated answer, following the node's branches, and return that node.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "questionId": {"type": "string", "description": "Id of the question that was just answered."},
+                "answer": {"type": "string", "description": "The normalized, validated answer."},
+            },
+            "required": ["questionId", "answer"],
+            "additionalProperties": False,
+        },
+        "handler": _next_question,
+    },
+    "normalize_answer": {
+        "description": "Normalize and validate the caller's spoken answer for a question. Returns normalized, valid and error.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "questionId": {"type": "string", "description": "Id of the question being answered."},
+                "answer": {"type": "string", "description": "The caller's answer as transcribed."},
+            },
+            "required": ["questionId", "answer"],
+            "additionalProperties": False,
+        },
+        "handler": _normalize_answer,
+    },
+    "match_choice": {
+        "description": "Rank a question's choices (or allowed_values) against the caller's words by spelling, sound and synonyms. Returns value when one choice is a confident match, and the top matches with scores. normalize_answer already applies it; use this to pick options to offer when an answer was ambiguous.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "questionId": {"type": "string", "description": "Id of a question with choices or allowed_values."},
+                "answer": {"type": "string", "description": "The caller's answer as transcribed."},
+            },
+            "required": ["questionId", "answer"],
+            "additionalProperties": False,
+        },
+        "handler": _match_choice,
+    },
+    "load_session": {
+        "description": "Load the saved interview state for this call: current node, confirmed answers and counters. Starts a new session at the first question if none exists.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "sessionId": {"type": "string", "description": "Call/session id given at the start of the conversation."},
+            },
+            "required": ["sessionId"],
+            "additionalProperties": False,
+        },
+        "handler": _load_session,
+    },
+    "save_session": {
+        "description": "Checkpoint the interview after a confirmed answer. answers holds only new or changed answers; they are merged into the saved ones. Finished sections are written to Cosmos DB, with retries, and reported under persisted.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "sessionId": {"type": "string"},
+                "currentNode": {"type": "string", "description": "Id of the question to ask next."},
+                "answers": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"questionId": {"type": "string"}, "value": {"type": "string"}},
+                        "required": ["questionId", "value"],
+                        "additionalProperties": False,
+                    },
+                },
+                "retries": {"type": "integer", "description": "Retry count for currentNode."},
+                "silences": {"type": "integer", "description": "Consecutive silences for currentNode."},
+                "completed": {"type": "boolean", "description": "True once the answers were submitted."},
+            },
+            "required": ["sessionId", "currentNode", "answers", "retries", "silences", "completed"],
+            "additionalProperties": False,
+        },
+        "handler": _save_session,
+    },
+    "read_summary": {
+        "description": "At the end node, read every confirmed answer back to the caller, grouped by section, and build the submission payload. The call runtime speaks the summary itself; the result tells you it was spoken and holds payload, the exact object to submit to Cosmos DB if a submission is needed.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "sessionId": {"type": "string"},
+            },
+            "required": ["sessionId"],
+            "additionalProperties": False,
+        },
+        "handler": _read_summary,
+    },
+}
+
+
+def function_tools():
+    """FunctionTool definitions for PromptAgentDefinition(tools=[...])."""
+    from azure.ai.projects.models import FunctionTool
+
+    return [
+        FunctionTool(name=name, description=spec["description"], parameters=spec["parameters"], strict=True)
+        for name, spec in TOOL_SPECS.items()
+    ]
+
+
+def response_tools():
+    """The same tools as plain Responses API function definitions, for calls made without an agent reference."""
+    return [
+        {"type": "function", "name": name, "description": spec["description"], "parameters": spec["parameters"], "strict": True}
+        for name, spec in TOOL_SPECS.items()
+    ]
+
+
+def call_tool(name, arguments):
+    """Run a function tool and return its JSON-encoded output.
+
+    Errors are returned to the model as {"error": ...} rather than raised, so a bad
+    question id costs one retry instead of failing the turn.
+    """
+    spec = TOOL_SPECS.get(name)
+    if spec is None:
+        return json.dumps({"error": f"Unknown tool: {name}"})
+    try:
+        kwargs = json.loads(arguments) if isinstance(arguments, str) else dict(arguments or {})
+        result = spec["handler"](**kwargs)
+    except (KeyError, ValueError, TypeError) as e:
+        return json.dumps({"error": str(e.args[0]) if e.args else str(e)})
+    return json.dumps(result)
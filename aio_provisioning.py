@@ -0,0 +1,241 @@
+"""
+DESCRIPTION:
+    Concurrent provisioning of several agents with the async (aio) clients.
+
+    For each agent spec the vector store creation, node uploads and MCP server
+    check run at the same time, the file batch is polled with exponential
+    backoff, and the agent version is cut once everything it references exists.
+    Specs are provisioned in parallel up to --max-parallel, so deploying many
+    product-line agents takes about as long as the slowest one. The same
+    .deploy_state.json as provisioning.py is used, so unchanged specs are skipped.
+    With --incremental, question edits are applied node by node to the
+    deployed vector store, as in provisioning.py.
+
+USAGE:
+    python aio_provisioning.py                         # every spec in agent_specs.AGENT_SPECS
+    python aio_provisioning.py my-voic-agent --force
+    python aio_provisioning.py --max-parallel 8
+    python aio_provisioning.py --incremental
+
+    Before running:
+
+    pip install "azure-ai-projects>=2.0.0b1" azure-identity openai aiohttp python-dotenv
+"""
+
+import argparse
+import asyncio
+import contextlib
+import time
+
+from agent_specs import AGENT_SPECS
+from clients import async_clients
+from graph_analysis import validate_graph
+from ingestion import DEFAULT_UPLOAD_CONCURRENCY, diff_nodes, file_batches, merge_file_ids, node_file, node_hashes
+from provisioning import DeployState, agent_hash, build_tools, record_vector_store, vector_store_hash
+from question_graph import QuestionGraph
+
+DEFAULT_MAX_PARALLEL = 4
+
+POLL_INITIAL_DELAY = 0.5
+POLL_MAX_DELAY = 8.0
+POLL_TIMEOUT = 600.0
+
+MCP_CHECK_TIMEOUT = 10.0
+
+
+async def upload_nodes(openai_client, nodes, concurrency=DEFAULT_UPLOAD_CONCURRENCY):
+    """Upload ``nodes`` ({node_id: node}) with at most ``concurrency`` requests in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def upload(node_id, node):
+        async with semaphore:
+            file = await openai_client.files.create(file=node_file(node_id, node), purpose="assistants")
+        return node_id, file.id
+
+    return dict(await asyncio.gather(*(upload(node_id, node) for node_id, node in nodes.items())))
+
+
+async def poll_file_batch(openai_client, vector_store_id, batch_id, timeout=POLL_TIMEOUT):
+    """Wait for a vector store file batch to finish, backing off between polls."""
+    delay = POLL_INITIAL_DELAY
+    deadline = time.monotonic() + timeout
+    while True:
+        batch = await openai_client.vector_stores.file_batches.retrieve(batch_id, vector_store_id=vector_store_id)
+        if batch.status != "in_progress":
+            break
+        if time.monotonic() + delay > deadline:
+            raise TimeoutError(f"File batch {batch_id} still in progress after {timeout:.0f}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, POLL_MAX_DELAY)
+    if batch.status != "completed" or batch.file_counts.failed:
+        raise RuntimeError(f"File batch {batch_id} ended with status {batch.status} ({batch.file_counts.failed} failed)")
+    return batch
+
+
+async def attach_files(openai_client, vector_store_id, nodes, file_ids):
+    """Async ingestion.attach_files: the batches are created first and then polled together."""
+    batches = [
+        await openai_client.vector_stores.file_batches.create(vector_store_id=vector_store_id, files=items)
+        for items in file_batches(nodes, file_ids)
+    ]
+    await asyncio.gather(*(poll_file_batch(openai_client, vector_store_id, batch.id) for batch in batches))
+
+
+async def update_nodes(openai_client, vector_store_id, graph, file_ids, diff, concurrency=DEFAULT_UPLOAD_CONCURRENCY):
+    """Async ingestion.update_nodes: attach new and edited nodes, then remove the files they replace."""
+    from openai import NotFoundError
+
+    updated = diff.nodes_to_upload(graph)
+    new_ids = await upload_nodes(openai_client, updated, concurrency=concurrency)
+    if new_ids:
+        await attach_files(openai_client, vector_store_id, updated, new_ids)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def remove(file_id):
+        async with semaphore:
+            with contextlib.suppress(NotFoundError):
+                await openai_client.vector_stores.files.delete(file_id, vector_store_id=vector_store_id)
+            with contextlib.suppress(NotFoundError):
+                await openai_client.files.delete(file_id)
+
+    await asyncio.gather(*(remove(file_id) for file_id in diff.stale_files(file_ids)))
+    return merge_file_ids(graph, file_ids, new_ids)
+
+
+async def validate_mcp_server(http_session, server_url, timeout=MCP_CHECK_TIMEOUT):
+    """Check that the MCP server answers an initialize request.
+
+    401/403 count as reachable: the agent authenticates through its project
+    connection, which this check does not have.
+    """
+    import aiohttp
+
+    payload = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "initialize",
+        "params": {"protocolVersion": "2025-03-26", "capabilities": {}, "clientInfo": {"name": "provisioning", "version": "1"}},
+    }
+    headers = {"Accept": "application/json, text/event-stream"}
+    try:
+        async with http_session.post(server_url, json=payload, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if response.status >= 500 or response.status == 404:
+                raise RuntimeError(f"MCP server {server_url} answered initialize with HTTP {response.status}")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise RuntimeError(f"MCP server {server_url} is not reachable: {e!r}") from e
+
+
+async def provision_vector_store(openai_client, spec, state, force=False, concurrency=DEFAULT_UPLOAD_CONCURRENCY, incremental=False):
+    key = vector_store_hash(spec)
+    cached = state.vector_stores.get(key)
+    if cached and not force:
+        print(f"[{spec.agent_name}] Reusing vector store (id: {cached['vector_store_id']})")
+        return cached["vector_store_id"]
+
+    graph = QuestionGraph.load(spec.question_file)
+    hashes = node_hashes(graph)
+    previous_key, previous = state.latest_vector_store(spec.vector_store_name) if incremental and not force else (None, None)
+    if previous is not None:
+        vector_store_id = previous["vector_store_id"]
+        diff = diff_nodes(previous["node_hashes"], hashes)
+        file_ids = await update_nodes(openai_client, vector_store_id, graph, previous["file_ids"], diff, concurrency=concurrency)
+        print(f"[{spec.agent_name}] Vector store updated in place (id: {vector_store_id}): {diff}")
+        record_vector_store(state, spec, key, vector_store_id, file_ids, hashes, replaces=previous_key)
+        return vector_store_id
+
+    # Node files don't depend on the store, so both start at once.
+    vector_store, file_ids = await asyncio.gather(
+        openai_client.vector_stores.create(name=spec.vector_store_name),
+        upload_nodes(openai_client, graph.nodes, concurrency=concurrency),
+    )
+    print(f"[{spec.agent_name}] Vector store created (id: {vector_store.id}), {len(file_ids)} node files uploaded")
+    await attach_files(openai_client, vector_store.id, graph.nodes, file_ids)
+    print(f"[{spec.agent_name}] Indexed {len(file_ids)} question nodes")
+
+    record_vector_store(state, spec, key, vector_store.id, file_ids, hashes)
+    return vector_store.id
+
+
+async def provision_agent(project_client, openai_client, http_session, spec, state, force=False, incremental=False):
+    from azure.ai.projects.models import PromptAgentDefinition
+
+    tasks = [
+        asyncio.create_task(provision_vector_store(openai_client, spec, state, force=force, incremental=incremental)),
+        asyncio.create_task(validate_mcp_server(http_session, spec.mcp_tool["server_url"])),
+    ]
+    try:
+        vector_store_id, _ = await asyncio.gather(*tasks)
+    except BaseException:
+        # Don't leave uploads running for an agent that has already failed.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    key = agent_hash(spec, vector_store_id)
+    cached = state.agents.get(key)
+    if cached and not force:
+        print(f"[{spec.agent_name}] Reusing agent (id: {cached['id']}, version: {cached['version']})")
+        return cached
+
+    agent = await project_client.agents.create_version(
+        agent_name=spec.agent_name,
+        definition=PromptAgentDefinition(
+            model=spec.model,
+            instructions=spec.instructions,
+            tools=build_tools(spec, vector_store_id),
+        ),
+    )
+    print(f"[{spec.agent_name}] Agent created (id: {agent.id}, version: {agent.version})")
+
+    record = {"id": agent.id, "name": agent.name, "version": agent.version, "vector_store_id": vector_store_id}
+    state.agents[key] = record
+    state.save()
+    return record
+
+
+async def provision_all(specs, max_parallel=DEFAULT_MAX_PARALLEL, force=False, state=None, incremental=False):
+    """Provision ``specs`` concurrently. Returns {agent_name: record or exception}."""
+    for spec in specs:
+        validate_graph(QuestionGraph.load(spec.question_file))
+    state = state or DeployState()
+    semaphore = asyncio.Semaphore(max_parallel)
+
+    async with async_clients() as (project_client, openai_client, http_session):
+
+        async def run(spec):
+            async with semaphore:
+                return await provision_agent(project_client, openai_client, http_session, spec, state, force=force, incremental=incremental)
+
+        results = await asyncio.gather(*(run(spec) for spec in specs), return_exceptions=True)
+    return {spec.agent_name: result for spec, result in zip(specs, results)}
+
+
+def main():
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Provision several voice agents concurrently.")
+    parser.add_argument("agents", nargs="*", help=f"Agent names to deploy (default: all of {', '.join(AGENT_SPECS)}).")
+    parser.add_argument("--max-parallel", type=int, default=DEFAULT_MAX_PARALLEL, help="Agents provisioned at the same time.")
+    parser.add_argument("--force", action="store_true", help="Ignore .deploy_state.json and recreate everything.")
+    parser.add_argument("--incremental", action="store_true", help="Update the deployed vector stores node by node.")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.agents if name not in AGENT_SPECS]
+    if unknown:
+        parser.error(f"unknown agent(s): {', '.join(unknown)}")
+
+    load_dotenv()
+    specs = [AGENT_SPECS[name]() for name in (args.agents or AGENT_SPECS)]
+
+    start = time.perf_counter()
+    results = asyncio.run(provision_all(specs, max_parallel=args.max_parallel, force=args.force, incremental=args.incremental))
+    failed = {name: result for name, result in results.items() if isinstance(result, BaseException)}
+    for name, error in failed.items():
+        print(f"[{name}] Provisioning failed: {error}")
+    print(f"Provisioned {len(results) - len(failed)}/{len(results)} agents in {time.perf_counter() - start:.1f}s")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+DESCRIPTION:
+    Batched, idempotent answer persistence to Cosmos DB.
+
+    Confirmed answers are buffered per session and written one section at a
+    time (meta.section: personal, employment, medical_history). A section is
+    flushed as a single bulk upsert as soon as the interview moves past it,
+    and every remaining section is flushed when the interview completes. Each
+    write carries an idempotency key derived from the session, the section
+    and its answers, so repeating a write is harmless and a section whose
+    answers did not change is never sent twice.
+
+    Retries with exponential backoff happen here, not in the model: a write
+    that still fails after the last attempt leaves its section pending, and it
+    is retried on the next flush instead of failing the interview.
+
+    Answers to nodes without meta.section are written under OTHER_SECTION,
+    like the END summary groups them.
+
+    Sinks are chosen by ANSWER_SINK:
+        mcp+https://host/cosmos/    save_answers tool on the Cosmos MCP server
+        file:///path/answers.jsonl  append-only JSON lines (local runs)
+        memory://                   process-local, for tests and benchmarks
+    Persistence is off when ANSWER_SINK is not set.
+
+USAGE:
+    persister = AnswerPersister(open_answer_sink("mcp+https://example/cosmos/"), graph)
+    status = persister.observe("call-123", {"Q1": "Superman"}, current_node="Q2", completed=False)
+"""
+
+import collections
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+
+from question_graph import END_NODE_ID
+from summary import OTHER_SECTION
+
+SAVE_ANSWERS_TOOL = "save_answers"
+DEFAULT_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 8.0
+DEFAULT_TIMEOUT = 10.0
+# Sessions whose written sections are remembered; older ones may be written again (harmlessly).
+MAX_TRACKED_SESSIONS = 10000
+MCP_PROTOCOL_VERSION = "2025-03-26"
+
+# HTTP statuses worth retrying; anything else is a bad request and fails at once.
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class AnswerWriteError(RuntimeError):
+    """A write that must not be retried."""
+
+
+class TransientWriteError(AnswerWriteError):
+    """A write that may succeed if repeated (timeouts, throttling, 5xx)."""
+
+
+class SessionExpiredError(TransientWriteError):
+    """The MCP server no longer knows the session (HTTP 404); the next attempt opens a new one."""
+
+
+@dataclass
+class AnswerBatch:
+    session_id: str
+    section: str
+    answers: dict
+    idempotency_key: str
+
+    @classmethod
+    def build(cls, session_id, section, answers):
+        return cls(session_id, section, dict(answers), idempotency_key(session_id, section, answers))
+
+    def to_payload(self):
+        return {
+            "id": f"{self.session_id}:{self.section}",
+            "sessionId": self.session_id,
+            "section": self.section,
+            "idempotencyKey": self.idempotency_key,
+            "answers": [{"questionId": k, "value": v} for k, v in sorted(self.answers.items())],
+        }
+
+
+def idempotency_key(session_id, section, answers):
+    """Stable key for one section's answers; changes only when an answer changes."""
+    body = json.dumps([session_id, section, sorted(answers.items())], separators=(",", ":"))
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def with_retries(fn, attempts=DEFAULT_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY, sleep=time.sleep):
+    """Call ``fn`` until it succeeds, retrying TransientWriteError with full-jitter exponential backoff."""
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except TransientWriteError:
+            if attempt == attempts - 1:
+                raise
+            sleep(random.uniform(0, min(max_delay, base_delay * 2**attempt)))
+
+
+class AnswerSink:
+    """Backend interface. write() must be an upsert keyed by batch id, safe to repeat."""
+
+    def write(self, batch):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class InMemoryAnswerSink(AnswerSink):
+    def __init__(self):
+        self.documents = {}
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    def write(self, batch):
+        payload = batch.to_payload()
+        with self._lock:
+            self.writes += 1
+            self.documents[payload["id"]] = payload
+
+
+class JsonlAnswerSink(AnswerSink):
+    """Appends one line per batch; lines whose idempotency key was already written are skipped."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._keys = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._keys = {json.loads(line)["idempotencyKey"] for line in f if line.strip()}
+
+    def write(self, batch):
+        with self._lock:
+            if batch.idempotency_key in self._keys:
+                return
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(batch.to_payload()) + "\n")
+            self._keys.add(batch.idempotency_key)
+
+
+class McpAnswerSink(AnswerSink):
+    """Calls the save_answers tool on an MCP server over streamable HTTP.
+
+    The first write opens an MCP session (initialize, then the initialized
+    notification) and every request after it carries the Mcp-Session-Id the
+    server assigned. Replies may be JSON or a text/event-stream. A session
+    the server no longer knows (HTTP 404) is reopened on the next attempt.
+    """
+
+    def __init__(self, server_url, tool_name=SAVE_ANSWERS_TOOL, headers=None, timeout=DEFAULT_TIMEOUT):
+        self.server_url = server_url
+        self.tool_name = tool_name
+        self.headers = {"Content-Type": "application/json", "Accept": "application/json, text/event-stream", **(headers or {})}
+        self.timeout = timeout
+        self._ids = iter(range(1, 1 << 62))
+        self._lock = threading.Lock()
+        self._session_lock = threading.Lock()
+        self._initialized = False
+        self._session_headers = {}
+
+    def _next_id(self):
+        with self._lock:
+            return next(self._ids)
+
+    def _post(self, message, headers):
+        """Send one JSON-RPC message; returns the reply to it, or None for a notification."""
+        request = urllib.request.Request(self.server_url, json.dumps(message).encode("utf-8"), headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                content_type = response.headers.get("Content-Type", "")
+                session_id = response.headers.get("Mcp-Session-Id")
+        except urllib.error.HTTPError as e:
+            if e.code == 404 and "Mcp-Session-Id" in headers:
+                # The caller drops the session: it may be holding the session lock.
+                raise SessionExpiredError(f"{self.tool_name}: the MCP session expired") from e
+            error = TransientWriteError if e.code in RETRYABLE_STATUSES else AnswerWriteError
+            raise error(f"{self.tool_name} returned HTTP {e.code}") from e
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            raise TransientWriteError(f"{self.tool_name} unreachable: {e}") from e
+        if session_id:
+            self._session_headers["Mcp-Session-Id"] = session_id
+        if "id" not in message:
+            return None
+        try:
+            if content_type.startswith("text/event-stream"):
+                return _sse_reply(body.decode("utf-8"), message["id"])
+            return json.loads(body or b"{}")
+        except (ValueError, UnicodeDecodeError) as e:
+            # A truncated or garbled reply; the upsert is idempotent, so try again.
+            raise TransientWriteError(f"{self.tool_name} sent an unreadable reply: {e}") from e
+
+    def _ensure_session(self):
+        with self._session_lock:
+            if self._initialized:
+                return
+            self._session_headers = {}
+            reply = self._post(
+                {
+                    "jsonrpc": "2.0",
+                    "id": self._next_id(),
+                    "method": "initialize",
+                    "params": {
+                        "protocolVersion": MCP_PROTOCOL_VERSION,
+                        "capabilities": {},
+                        "clientInfo": {"name": "answer-persistence", "version": "1.0"},
+                    },
+                },
+                self.headers,
+            )
+            if "error" in reply:
+                raise AnswerWriteError(f"MCP initialize failed: {reply['error'].get('message', reply['error'])}")
+            version = (reply.get("result") or {}).get("protocolVersion")
+            if version:
+                self._session_headers["MCP-Protocol-Version"] = version
+            try:
+                self._post({"jsonrpc": "2.0", "method": "notifications/initialized"}, {**self.headers, **self._session_headers})
+            except SessionExpiredError:
+                self._session_headers = {}
+                raise
+            self._initialized = True
+
+    def _reset_session(self):
+        with self._session_lock:
+            self._initialized = False
+            self._session_headers = {}
+
+    def write(self, batch):
+        self._ensure_session()
+        message = {
+            "jsonrpc": "2.0",
+            "id": self._next_id(),
+            "method": "tools/call",
+            "params": {"name": self.tool_name, "arguments": batch.to_payload()},
+        }
+        try:
+            result = self._post(message, {**self.headers, **self._session_headers})
+        except SessionExpiredError:
+            self._reset_session()
+            raise
+        if "error" in result:
+            raise AnswerWriteError(f"{self.tool_name} failed: {result['error'].get('message', result['error'])}")
+        if (result.get("result") or {}).get("isError"):
+            raise AnswerWriteError(f"{self.tool_name} rejected the batch: {result['result'].get('content')}")
+
+
+def _sse_reply(text, request_id):
+    """The JSON-RPC response to ``request_id`` in a text/event-stream body."""
+    for event in text.replace("\r\n", "\n").split("\n\n"):
+        data = "\n".join(line[5:].lstrip() for line in event.split("\n") if line.startswith("data:"))
+        if not data:
+            continue
+        message = json.loads(data)
+        for item in message if isinstance(message, list) else [message]:
+            if isinstance(item, dict) and item.get("id") == request_id and ("result" in item or "error" in item):
+                return item
+    raise ValueError("the event stream ended without a response")
+
+
+def open_answer_sink(url=None):
+    """Open the sink named by ``url`` or ANSWER_SINK; None when persistence is off."""
+    url = url or os.environ.get("ANSWER_SINK")
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return InMemoryAnswerSink()
+    if url.startswith("file://"):
+        return JsonlAnswerSink(url[len("file://") :])
+    if url.startswith(("mcp+http://", "mcp+https://")):
+        return McpAnswerSink(url[len("mcp+") :])
+    raise ValueError(f"Unsupported ANSWER_SINK: {url}")
+
+
+class AnswerPersister:
+    """Flushes each finished section of a session's answers to a sink, once per distinct content."""
+
+    def __init__(self, sink, graph, attempts=DEFAULT_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY, sleep=time.sleep):
+        self.sink = sink
+        self.graph = graph
+        self.retry = {"attempts": attempts, "base_delay": base_delay, "max_delay": max_delay, "sleep": sleep}
+        # session id -> {section: idempotency key written}, least recently used first.
+        self._flushed = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def section_of(self, node_id):
+        node = self.graph.nodes.get(node_id) or {}
+        return (node.get("meta") or {}).get("section") or OTHER_SECTION
+
+    def finished_sections(self, answers, current_node, completed):
+        """Sections with answers that the interview has moved past, in question order."""
+        current = None if completed or current_node == END_NODE_ID else self.section_of(current_node)
+        sections = []
+        for question_id in answers:
+            section = self.section_of(question_id)
+            if section != current and section not in sections:
+                sections.append(section)
+        return sections
+
+    def observe(self, session_id, answers, current_node, completed=False):
+        """Flush every finished section not yet written with these answers.
+
+        Returns {"flushed": [...], "pending": [...], "errors": {...}}; pending
+        sections are retried on the next call.
+        """
+        status = {"flushed": [], "pending": [], "errors": {}}
+        for section in self.finished_sections(answers, current_node, completed):
+            batch = AnswerBatch.build(session_id, section, {q: v for q, v in answers.items() if self.section_of(q) == section})
+            with self._lock:
+                if self._flushed.get(session_id, {}).get(section) == batch.idempotency_key:
+                    continue
+            try:
+                with_retries(lambda: self.sink.write(batch), **self.retry)
+            except AnswerWriteError as e:
+                status["pending"].append(section)
+                status["errors"][section] = str(e)
+                continue
+            with self._lock:
+                self._flushed.setdefault(session_id, {})[section] = batch.idempotency_key
+                self._flushed.move_to_end(session_id)
+                while len(self._flushed) > MAX_TRACKED_SESSIONS:
+                    # Abandoned calls never complete; forgetting them only risks an idempotent rewrite.
+                    self._flushed.popitem(last=False)
+            status["flushed"].append(section)
+        if completed and not status["pending"]:
+            # The session is done; a repeated final save is still safe thanks to the idempotency keys.
+            with self._lock:
+                self._flushed.pop(session_id, None)
+        return status
@@ -0,0 +1 @@
+"""Benchmarks and local stand-ins for the voice agent. Run modules with ``python -m benchmarks.<name>`` from the repo root."""
@@ -0,0 +1,141 @@
+"""
+DESCRIPTION:
+    Scripted callers for benchmarks: fixed answer sets that walk every branch
+    of the question graph.
+
+    A script is the list of utterances the caller says after the greeting:
+    an answer to each question followed by "yes" to its confirmation.
+
+    The replay corpus (replay_corpus.jsonl) holds one caller per line: its
+    answers over DEFAULT_ANSWERS, plus optional "corrections" (a first answer
+    the caller rejects at confirmation) and "invalid" (answers that fail
+    validation before the real one), or a literal "utterances" list.
+
+USAGE:
+    for name, utterances in branch_scripts(graph).items():
+        ...
+    for entry in load_corpus():
+        utterances = corpus_script(graph, entry)
+"""
+
+import json
+import os
+
+from question_graph import END_NODE_ID
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "replay_corpus.jsonl")
+
+DEFAULT_ANSWERS = {
+    "Q1": "S U P E R M A N",
+    "Q2": "none",
+    "Q3": "K E N T",
+    "Q4": "male",
+    "Q5": "February twenty ninth nineteen eighty",
+    "Q6": "one two three four five six seven eight nine",
+    "Q7": "Smallville Kansas",
+    "Q8": "seventy four inches",
+    "Q9": "two hundred twenty five pounds",
+    "Q10": "married",
+    "Q11": "not applicable",
+    "Q12": "K one two three four five six seven Kansas",
+    "Q13": "five five five two one two four five six seven",
+    "Q14": "not applicable",
+    "Q15": "five five five three one three nine eight seven six",
+    "Q16": "three forty four Clinton Street Metropolis New York one zero zero zero one",
+    "Q17": "none",
+    "Q18": "clark dot kent at dailyplanet dot com",
+    "Q19": "Reporter",
+    "Q20": "Writes news stories",
+    "Q21": "twelve",
+    "Q22": "eighty five thousand dollars",
+    "Q23": "Daily Planet",
+    "Q24": "three fifty five Fifth Avenue Metropolis New York",
+    "Q26_HTN_1": "March two thousand fifteen",
+    "Q26_HTN_2": "yes",
+    "Q26_HTN_3": "Lisinopril",
+    "Q26_DM_1": "June two thousand eighteen",
+    "Q26_DM_2": "yeah",
+    "Q26_DM_3": "Metformin",
+    "Q26_KIDNEY_1": "Last winter",
+    "Q26_KIDNEY_2": "nope",
+    "Q26_KIDNEY_3": "Antibiotics",
+}
+
+# Spoken answer to Q25 for each branch, as speech-to-text tends to transcribe
+# it; "unmatched" exercises the default branch.
+BRANCH_ANSWERS = {
+    "hypertension": "hyper tension",
+    "diabetes": "die a beetus",
+    "kidney_infection": "kidney infection",
+    "unmatched": "seasonal allergies",
+}
+
+
+def walk(graph, answers, resolve=None):
+    """Question ids visited when ``answers`` are given, in order.
+
+    ``resolve`` maps a spoken answer to the normalized value used for branching.
+    """
+    resolve = resolve or (lambda node_id, spoken: spoken)
+    node_id = graph.start_id
+    visited = []
+    while node_id and node_id != END_NODE_ID:
+        visited.append(node_id)
+        answer = resolve(node_id, answers.get(node_id, ""))
+        try:
+            node_id = graph.next_question(node_id, answer)
+        except ValueError:
+            node_id = graph.next_question(node_id, "default")
+    return visited
+
+
+def _resolver(graph):
+    from normalization import normalize
+
+    def resolve(node_id, spoken):
+        result = normalize(graph.get_question(node_id), spoken)
+        return result["normalized"] if result["valid"] else "default"
+
+    return resolve
+
+
+def script_for(graph, answers, corrections=None, invalid=None):
+    """Caller utterances for one interview: answer then "yes" for every visited question.
+
+    ``corrections`` maps a question id to an answer given and rejected first;
+    ``invalid`` maps it to answers that fail validation before the real one.
+    """
+    corrections = corrections or {}
+    invalid = invalid or {}
+    utterances = []
+    for node_id in walk(graph, answers, _resolver(graph)):
+        utterances += invalid.get(node_id, [])
+        if node_id in corrections:
+            utterances += [corrections[node_id], "no"]
+        utterances += [answers.get(node_id, "none"), "yes"]
+    return utterances
+
+
+def branch_scripts(graph, answers=None):
+    """One script per Q25 branch: {"hypertension": [...], "diabetes": [...], ...}."""
+    base = {**DEFAULT_ANSWERS, **(answers or {})}
+    return {name: script_for(graph, {**base, "Q25": spoken}) for name, spoken in BRANCH_ANSWERS.items()}
+
+
+def load_corpus(path=DEFAULT_CORPUS):
+    """Corpus entries from a JSONL file, one caller per line."""
+    with open(path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    ids = [entry["script_id"] for entry in entries]
+    duplicates = sorted({i for i in ids if ids.count(i) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate script_id in {path}: {', '.join(duplicates)}")
+    return entries
+
+
+def corpus_script(graph, entry):
+    """Caller utterances for one corpus entry."""
+    if "utterances" in entry:
+        return list(entry["utterances"])
+    answers = {**DEFAULT_ANSWERS, **entry.get("answers", {})}
+    return script_for(graph, answers, entry.get("corrections"), entry.get("invalid"))
@@ -0,0 +1,115 @@
+"""
+DESCRIPTION:
+    Accuracy and latency of the choice matcher on speech-to-text misses.
+
+    Each case is a transcribed answer to a choice node and the value it
+    should map to (None when it should not map to any). The report counts,
+    for the previous substring-only matching and for normalize_answer with
+    the phonetic/fuzzy index, how many answers were resolved correctly, how
+    many were wrong and how many would have gone back to the model or the
+    caller as a clarification turn, plus the per-answer matching time.
+
+USAGE:
+    python -m benchmarks.choice_matching [--repeat 2000]
+"""
+
+import argparse
+import time
+
+from choice_matching import build_choice_indexes, choice_index
+from normalization import _key, clean, join_spelling, normalize
+from question_graph import QuestionGraph
+
+# (question id, transcribed answer, expected value)
+CASES = [
+    ("Q25", "hypertension", "Hypertension"),
+    ("Q25", "hyper tension", "Hypertension"),
+    ("Q25", "hyper tenshun", "Hypertension"),
+    ("Q25", "high per tension", "Hypertension"),
+    ("Q25", "high blood pressure", "Hypertension"),
+    ("Q25", "I have high blood pressure", "Hypertension"),
+    ("Q25", "diabetes", "Diabetes"),
+    ("Q25", "die a beetus", "Diabetes"),
+    ("Q25", "diabetis", "Diabetes"),
+    ("Q25", "I'm diabetic", "Diabetes"),
+    ("Q25", "type two diabetes", "Diabetes"),
+    ("Q25", "sugar", None),
+    ("Q25", "blood pressure", None),
+    ("Q25", "kidney infection", "Kidney Infection"),
+    ("Q25", "kidney in fection", "Kidney Infection"),
+    ("Q25", "kidnee infekshun", "Kidney Infection"),
+    ("Q25", "seasonal allergies", None),
+    ("Q25", "cancer", None),
+    # Named but not affirmed, or a different condition: must not be stored as the choice.
+    ("Q25", "I don't have diabetes", None),
+    ("Q25", "no diabetes", None),
+    ("Q25", "my mother has diabetes", None),
+    ("Q25", "pre diabetes", None),
+    ("Q25", "low blood pressure", None),
+    ("Q4", "male", "Male"),
+    ("Q4", "mail", "Male"),
+    ("Q4", "femail", "Female"),
+    ("Q4", "woman", "Female"),
+    ("Q10", "married", "Married"),
+    ("Q10", "mary'd", "Married"),
+    ("Q10", "divorst", "Divorced"),
+    ("Q10", "widow", "Widowed"),
+    ("Q10", "seperated", "Separated"),
+    ("Q10", "never married", "Single"),
+    ("Q10", "I'm not married", "Single"),
+]
+
+
+def substring_match(node, text):
+    """The matching normalize_answer did before the index: exact, then a unique substring."""
+    choices = node.get("choices") or node.get("meta", {}).get("allowed_values") or []
+    key = _key(join_spelling(clean(text)))
+    for choice in choices:
+        if _key(choice) == key:
+            return choice
+    matches = [choice for choice in choices if key and (_key(choice).startswith(key) or key in _key(choice))]
+    return matches[0] if len(matches) == 1 else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Choice matcher accuracy and latency on speech-to-text misses.")
+    parser.add_argument("--repeat", type=int, default=2000, help="Matches per case for the timing.")
+    args = parser.parse_args()
+
+    graph = QuestionGraph.load()
+    started = time.perf_counter()
+    build_choice_indexes(graph)
+    print(f"Indexed choice sets in {(time.perf_counter() - started) * 1000:.2f} ms\n")
+
+    methods = {
+        "substring": lambda node, text: substring_match(node, text),
+        "fuzzy": lambda node, text: (lambda r: r["normalized"] if r["valid"] else None)(normalize(node, text)),
+    }
+    totals = {name: {"correct": 0, "wrong": 0, "clarify": 0} for name in methods}
+    print(f"{'question':<8} {'answer':<28} {'expected':<17} {'substring':<17} {'fuzzy':<17} {'match us':>8}")
+    for question_id, text, expected in CASES:
+        node = graph.get_question(question_id)
+        row = {}
+        for name, method in methods.items():
+            value = method(node, text)
+            row[name] = value
+            if value == expected:
+                totals[name]["correct"] += 1
+            elif value is None:
+                totals[name]["clarify"] += 1
+            else:
+                totals[name]["wrong"] += 1
+        index = choice_index(node)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            index.match(text)
+        micros = (time.perf_counter() - started) / args.repeat * 1e6
+        print(f"{question_id:<8} {text:<28} {str(expected):<17} {str(row['substring']):<17} {str(row['fuzzy']):<17} {micros:>8.1f}")
+
+    print()
+    for name, counts in totals.items():
+        print(f"{name:<10} correct {counts['correct']:>3}/{len(CASES)}  wrong {counts['wrong']:>3}  clarification turns {counts['clarify']:>3}")
+
+
+if __name__ == "__main__":
+    main()
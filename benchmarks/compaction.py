@@ -0,0 +1,72 @@
+"""
+DESCRIPTION:
+    Input tokens per turn with and without context compaction.
+
+    Replays one full scripted interview twice against the local mock model:
+    once keeping the whole transcript, once compacting to a state message after
+    every confirmed answer. Prints input and cached tokens per caller turn and
+    the per-turn growth (least-squares slope) of each mode.
+
+USAGE:
+    python -m benchmarks.compaction [--branch hypertension] [--instructions sarah|terse]
+"""
+
+import argparse
+import os
+
+os.environ.setdefault("SESSION_STORE", "memory://")
+
+from agent_tools import get_graph  # noqa: E402
+from benchmarks.caller_scripts import branch_scripts  # noqa: E402
+from benchmarks.mock_model import MockOpenAIClient  # noqa: E402
+from conversation import ConversationDriver  # noqa: E402
+from instructions import sarah_instructions, voice_agent_instructions  # noqa: E402
+
+INSTRUCTION_SETS = {"sarah": sarah_instructions, "terse": voice_agent_instructions}
+
+
+def replay(script, instructions, compact, session_id):
+    driver = ConversationDriver(MockOpenAIClient(), "mock", instructions, session_id=session_id, compact=compact)
+    driver.start()
+    for utterance in script:
+        driver.turn(utterance)
+    return driver
+
+
+def slope(values):
+    n = len(values)
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    num = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    den = sum((x - mean_x) ** 2 for x in range(n))
+    return num / den if den else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("USAGE:")[0].strip())
+    parser.add_argument("--branch", default="hypertension", choices=["hypertension", "diabetes", "kidney_infection", "unmatched"])
+    parser.add_argument("--instructions", default="sarah", choices=sorted(INSTRUCTION_SETS))
+    args = parser.parse_args()
+
+    script = branch_scripts(get_graph())[args.branch]
+    instructions = INSTRUCTION_SETS[args.instructions]()
+    full = replay(script, instructions, compact=False, session_id=f"bench-full-{args.branch}")
+    compact = replay(script, instructions, compact=True, session_id=f"bench-compact-{args.branch}")
+
+    print(f"{'turn':>4} {'full in':>9} {'full cached':>11} {'compact in':>10} {'compact cached':>14}")
+    for i, (a, b) in enumerate(zip(full.stats.turns, compact.stats.turns)):
+        print(f"{i:>4} {a.input_tokens:>9} {a.cached_tokens:>11} {b.input_tokens:>10} {b.cached_tokens:>14}")
+
+    print()
+    for name, driver in (("full", full), ("compact", compact)):
+        per_turn = [t.input_tokens for t in driver.stats.turns]
+        per_call = [t.input_tokens / t.model_calls for t in driver.stats.turns]
+        print(
+            f"{name:>8}: turns={len(per_turn)} input={driver.stats.input_tokens} "
+            f"cached={sum(t.cached_tokens for t in driver.stats.turns)} "
+            f"per-call first/last={per_call[0]:.0f}/{per_call[-1]:.0f} growth/turn={slope(per_call):+.1f} tokens"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+DESCRIPTION:
+    Load test: simulated callers replaying scripted interviews concurrently.
+
+    Each caller walks one branch of QuestionListCopy.json (Hypertension,
+    Diabetes, Kidney Infection or unmatched) through AsyncConversationDriver
+    against the local mock Responses endpoint, which saves the answers to the
+    local mock /cosmos/ MCP server at END. Reports per-turn latency
+    percentiles, tool calls, tokens per session and throughput.
+
+    With --persist, save_session writes each finished section to the MCP
+    server itself (ANSWER_SINK) instead of one model-driven submission at END.
+
+    --mcp-store runs the reference server (cosmos_mcp_server.py) on that
+    store instead of the mock MCP server, so the whole write path is measured;
+    its /metrics timings are included in the report.
+
+    --quota-rpm / --quota-tpm give the mock deployment a synthetic quota
+    (HTTP 429 with Retry-After beyond it). --schedule puts every call through
+    a shared RateLimitScheduler, which paces calls under the quota, serves
+    in-progress interviews first and applies admission backpressure.
+
+    --trace file://traces.jsonl records a span per turn, model call and tool
+    call (summarized in the report, or with python tracing.py traces.jsonl);
+    --otlp-collector sends them over OTLP/HTTP to a local stand-in collector.
+
+    Pass --responses-url / --mcp-url to point at servers that are already
+    running instead of starting the in-process stand-ins.
+
+USAGE:
+    python -m benchmarks.load_test --callers 200 --concurrency 100 --model-latency 0.3 --mcp-latency 0.05
+    python -m benchmarks.load_test --callers 500 --concurrency 500 --instructions terse --no-compact
+    python -m benchmarks.load_test --callers 100 --persist --mcp-error-rate 0.2
+    python -m benchmarks.load_test --callers 200 --persist --mcp-store sqlite:///load.db --mcp-pool-size 8
+    python -m benchmarks.load_test --callers 100 --quota-rpm 3000 --quota-tpm 20000000 --schedule --max-sessions 40
+    python -m benchmarks.load_test --callers 50 --persist --trace file://traces.jsonl
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import time
+
+os.environ.setdefault("SESSION_STORE", "memory://")
+
+from agent_tools import get_graph  # noqa: E402
+from benchmarks.caller_scripts import branch_scripts  # noqa: E402
+from conversation import AsyncConversationDriver  # noqa: E402
+from instructions import sarah_instructions, voice_agent_instructions  # noqa: E402
+from metrics import summarize  # noqa: E402
+from rate_limiter import AdmissionRejected, RateLimitScheduler, ScheduledClient  # noqa: E402
+from tracing import JsonlSpanExporter, Tracer, aggregate, load_spans, open_span_exporter  # noqa: E402
+
+INSTRUCTION_SETS = {"sarah": sarah_instructions, "terse": voice_agent_instructions}
+# Default scheduler budget as a share of the quota.
+SCHEDULER_HEADROOM = 0.9
+
+
+async def run_caller(client, caller_id, branch, script, args, mcp_url, results, scheduler=None, tracer=None):
+    if scheduler is not None:
+        try:
+            async with scheduler.session(timeout=args.admission_timeout):
+                return await run_caller(client, caller_id, branch, script, args, mcp_url, results, tracer=tracer)
+        except AdmissionRejected:
+            results["rejected"] += 1
+            return
+    driver = AsyncConversationDriver(
+        client,
+        "mock",
+        INSTRUCTION_SETS[args.instructions](),
+        session_id=f"load-{caller_id}",
+        compact=args.compact,
+        extra_tools=[{"type": "mcp", "server_label": "cosmos", "server_url": mcp_url, "require_approval": "never"}],
+        tracer=tracer,
+    )
+    started = time.perf_counter()
+    try:
+        await driver.start()
+        for utterance in script:
+            if driver.finished:
+                break
+            await driver.turn(utterance)
+    except Exception as e:  # a failed caller is a data point, not a reason to stop the run
+        results["errors"].append(f"{caller_id}/{branch}: {e!r}")
+        return
+    results["sessions"].append(
+        {
+            "branch": branch,
+            "seconds": time.perf_counter() - started,
+            "turns": [t.seconds for t in driver.stats.turns],
+            "tool_calls": driver.stats.tool_calls,
+            "model_calls": sum(t.model_calls for t in driver.stats.turns),
+            "input_tokens": driver.stats.input_tokens,
+            "cached_tokens": sum(t.cached_tokens for t in driver.stats.turns),
+            "output_tokens": driver.stats.output_tokens,
+            "completed": driver.finished,
+        }
+    )
+
+
+@contextlib.asynccontextmanager
+async def servers(args):
+    """Yield (responses_base_url, mcp_url, mock servers), starting local stand-ins when no URL is given."""
+    from benchmarks.mock_servers import MockMcpServer, MockOtlpCollector, MockResponsesServer
+
+    async with contextlib.AsyncExitStack() as stack:
+        started = []
+        mcp_url = args.mcp_url
+        if not mcp_url and args.mcp_store:
+            from cosmos_mcp_server import CosmosMcpServer, open_answer_store
+
+            mcp = await stack.enter_async_context(CosmosMcpServer(open_answer_store(args.mcp_store, pool_size=args.mcp_pool_size)))
+            mcp_url = mcp.server_url
+            started.append(mcp)
+        elif not mcp_url:
+            mcp = await stack.enter_async_context(
+                MockMcpServer(latency=args.mcp_latency, jitter=args.mcp_jitter, error_rate=args.mcp_error_rate)
+            )
+            mcp_url = mcp.server_url
+            started.append(mcp)
+        responses_url = args.responses_url
+        if not responses_url:
+            api = await stack.enter_async_context(
+                MockResponsesServer(latency=args.model_latency, jitter=args.model_jitter, rpm=args.quota_rpm, tpm=args.quota_tpm)
+            )
+            responses_url = api.base_url
+            started.append(api)
+        if args.otlp_collector:
+            collector = await stack.enter_async_context(MockOtlpCollector())
+            args.trace = f"otlp+{collector.url}"
+            started.append(collector)
+        yield responses_url, mcp_url, started
+
+
+async def run(args):
+    from openai import AsyncOpenAI
+
+    scripts = branch_scripts(get_graph())
+    branches = itertools.cycle(sorted(scripts))
+    results = {"sessions": [], "errors": [], "rejected": 0}
+    semaphore = asyncio.Semaphore(args.concurrency)
+    scheduler = None
+    if args.schedule:
+        scheduler = RateLimitScheduler(
+            rpm=args.sched_rpm or int((args.quota_rpm or 10**6) * SCHEDULER_HEADROOM),
+            tpm=args.sched_tpm or int((args.quota_tpm or 10**9) * SCHEDULER_HEADROOM),
+            max_sessions=args.max_sessions,
+            max_backlog=args.max_backlog,
+        )
+
+    async with servers(args) as (responses_url, mcp_url, stand_ins):
+        if args.persist:
+            os.environ["ANSWER_SINK"] = f"mcp+{mcp_url}"
+        tracer = Tracer(open_span_exporter(args.trace)) if args.trace else None
+        # One client for every caller: its pooled connections are shared, as in a real worker process.
+        async with AsyncOpenAI(base_url=responses_url, api_key="mock", max_retries=args.sdk_retries, timeout=120) as openai_client:
+            client = ScheduledClient(openai_client, scheduler) if scheduler else openai_client
+
+            async def caller(caller_id, branch):
+                async with semaphore:
+                    await run_caller(client, caller_id, branch, scripts[branch], args, mcp_url, results, scheduler, tracer)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(caller(i, next(branches)) for i in range(args.callers)))
+            wall = time.perf_counter() - started
+        if tracer is not None:
+            await asyncio.to_thread(tracer.close)
+        server_stats = {}
+        for server in stand_ins:
+            stats = {k: v for k, v in vars(server).items() if isinstance(v, int) and k != "port"}
+            if hasattr(server, "metrics"):
+                stats["timings_ms"] = server.metrics.snapshot()
+            server_stats[type(server).__name__] = stats
+    if scheduler is not None:
+        server_stats["scheduler"] = scheduler.report()
+    if tracer is not None and isinstance(tracer.exporter, JsonlSpanExporter):
+        server_stats["trace"] = aggregate(load_spans(tracer.exporter.path))
+    return report(results, wall, args, server_stats)
+
+
+def report(results, wall, args, server_stats):
+    sessions = results["sessions"]
+    turn_latencies = [t for s in sessions for t in s["turns"]]
+    summary = {
+        "callers": args.callers,
+        "concurrency": args.concurrency,
+        "instructions": args.instructions,
+        "compact": args.compact,
+        "persist": args.persist,
+        "completed_sessions": sum(s["completed"] for s in sessions),
+        "errors": len(results["errors"]),
+        "rejected_sessions": results["rejected"],
+        "wall_seconds": wall,
+        "sessions_per_second": len(sessions) / wall if wall else None,
+        "turns_per_second": len(turn_latencies) / wall if wall else None,
+        "turn_latency_seconds": summarize(turn_latencies),
+        "session_seconds": summarize(s["seconds"] for s in sessions),
+        "tool_calls_per_session": summarize(s["tool_calls"] for s in sessions),
+        "model_calls_per_session": summarize(s["model_calls"] for s in sessions),
+        "input_tokens_per_session": summarize(s["input_tokens"] for s in sessions),
+        "cached_tokens_per_session": summarize(s["cached_tokens"] for s in sessions),
+        "output_tokens_per_session": summarize(s["output_tokens"] for s in sessions),
+        "per_branch": {
+            branch: summarize(t for s in sessions if s["branch"] == branch for t in s["turns"])
+            for branch in sorted({s["branch"] for s in sessions})
+        },
+        "servers": server_stats,
+        "first_errors": results["errors"][:5],
+    }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated-caller load test against local stand-ins.")
+    parser.add_argument("--callers", type=int, default=50, help="Total interviews to run.")
+    parser.add_argument("--concurrency", type=int, default=50, help="Interviews in progress at the same time.")
+    parser.add_argument("--instructions", default="sarah", choices=sorted(INSTRUCTION_SETS))
+    parser.add_argument("--no-compact", dest="compact", action="store_false", help="Keep the full transcript.")
+    parser.add_argument("--model-latency", type=float, default=0.2, help="Mock model latency per request, seconds.")
+    parser.add_argument("--model-jitter", type=float, default=0.1)
+    parser.add_argument("--mcp-latency", type=float, default=0.05, help="Mock MCP latency per request, seconds.")
+    parser.add_argument("--mcp-jitter", type=float, default=0.02)
+    parser.add_argument("--mcp-error-rate", type=float, default=0.0, help="Share of mock MCP tool calls that fail with 503.")
+    parser.add_argument("--mcp-store", help="Run the reference MCP server on this store (sqlite:///..., file:///..., memory://).")
+    parser.add_argument("--mcp-pool-size", type=int, default=4, help="SQLite connections for --mcp-store.")
+    parser.add_argument("--persist", action="store_true", help="Write answers per section from save_session (ANSWER_SINK).")
+    parser.add_argument("--quota-rpm", type=int, help="Synthetic requests-per-minute quota on the mock deployment.")
+    parser.add_argument("--quota-tpm", type=int, help="Synthetic tokens-per-minute quota on the mock deployment.")
+    parser.add_argument("--sdk-retries", type=int, default=0, help="openai SDK retries (its own 429 backoff; off under --schedule).")
+    parser.add_argument("--schedule", action="store_true", help="Send calls through a shared RateLimitScheduler.")
+    parser.add_argument("--sched-rpm", type=int, help="Scheduler RPM budget (default: 90%% of --quota-rpm).")
+    parser.add_argument("--sched-tpm", type=int, help="Scheduler TPM budget (default: 90%% of --quota-tpm).")
+    parser.add_argument("--max-sessions", type=int, help="Scheduler: interviews admitted at once.")
+    parser.add_argument("--max-backlog", type=int, help="Scheduler: waiting calls beyond which new interviews wait.")
+    parser.add_argument("--admission-timeout", type=float, help="Scheduler: seconds a new interview may wait for admission.")
+    parser.add_argument("--trace", help="Span exporter URL (file://traces.jsonl, otlp+http://host:4318, memory://).")
+    parser.add_argument("--otlp-collector", action="store_true", help="Export spans over OTLP to a local stand-in collector.")
+    parser.add_argument("--responses-url", help="Use a running Responses endpoint (base URL ending in /v1).")
+    parser.add_argument("--mcp-url", help="Use a running MCP server URL.")
+    parser.add_argument("--json", help="Also write the report to this file.")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args))
+    text = json.dumps(summary, indent=2, default=lambda v: round(v, 4) if isinstance(v, float) else str(v))
+    print(text)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+DESCRIPTION:
+    Deterministic stand-in for the model behind the Responses API.
+
+    ScriptedAgentModel follows the agent's protocol using only what is in the
+    request input, as a real model would: load_session, get_question, ask,
+    normalize_answer, confirm, next_question, save_session, and read_summary
+    at END. MockOpenAIClient wraps it in the shape of openai_client.responses,
+    reports token usage estimated from the request, and simulates prompt
+    caching by remembering request prefixes, so benchmarks can compare
+    prompt layouts and conversation drivers without a deployment.
+
+USAGE:
+    client = MockOpenAIClient(latency=0.2)
+    driver = ConversationDriver(client, "mock", sarah_instructions(), session_id="bench-1")
+"""
+
+import hashlib
+import itertools
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from conversation import STATE_MESSAGE_HEADER
+from token_count import estimate_tokens
+
+CONFIRM_SUFFIX = "Is that correct?"
+GREETING = "Hi there! I'm Sarah, and I'll be helping you complete your application today."
+CLOSING = "Wonderful! That's all the questions I have. Your information has been submitted. Have a wonderful day!"
+YES = re.compile(r"^\s*(yes|yeah|yep|yup|sure|correct|right)\b", re.IGNORECASE)
+
+# Minimum shared prefix, in tokens, before the provider starts caching.
+CACHE_MIN_TOKENS = 1024
+
+_ids = itertools.count(1)
+
+
+def _get(item, key, default=None):
+    return item.get(key, default) if isinstance(item, dict) else getattr(item, key, default)
+
+
+def _text(item):
+    content = _get(item, "content", "")
+    if isinstance(content, list):
+        return "".join(_get(part, "text", "") for part in content)
+    return content or ""
+
+
+def _failed(output):
+    """Tool errors come back as {"error": ...}; normalize_answer results also carry an error field."""
+    return "error" in output and "valid" not in output
+
+
+class _Context:
+    """What the model can infer from the request input."""
+
+    def __init__(self, items):
+        self.items = items
+        self.session_id = None
+        self.session_loaded = False
+        self.current_node = None
+        self.node = None
+        self.next_node = None
+        self.pending = None
+        self.last_assistant = None
+        self.answers = {}
+        self.persisted = None
+        self.calls = {}
+        for item in items:
+            kind = _get(item, "type")
+            role = _get(item, "role")
+            if kind == "function_call":
+                self.calls[_get(item, "call_id")] = (_get(item, "name"), json.loads(_get(item, "arguments") or "{}"))
+            elif kind == "function_call_output":
+                name, args = self.calls.get(_get(item, "call_id"), (None, {}))
+                self._tool_output(name, args, json.loads(_get(item, "output") or "{}"))
+            elif role == "developer" and _text(item).startswith(STATE_MESSAGE_HEADER):
+                state = json.loads(_text(item).split("\n", 1)[1])
+                self.session_id = state["session_id"]
+                self.session_loaded = True
+                self.current_node = state["current_node"]
+                self.node = state.get("current_question")
+                self.answers.update(state.get("answers", {}))
+            elif role == "user" and self.session_id is None:
+                match = re.search(r"session_id:\s*(\S+)", _text(item))
+                if match:
+                    self.session_id = match.group(1)
+            elif role == "assistant":
+                self.last_assistant = _text(item)
+
+    def _tool_output(self, name, args, output):
+        if _failed(output):
+            return
+        if name == "load_session":
+            self.session_loaded = True
+            self.current_node = output["current_node"]
+        elif name == "get_question":
+            self.node = output
+            self.current_node = output["id"]
+        elif name == "normalize_answer":
+            if not output["valid"] and self.node and self.node.get("meta", {}).get("allowed_values"):
+                # Unmatched allowed_values answers are stored empty and take the default branch.
+                output = {**output, "normalized": "", "valid": True, "unmatched": True}
+            self.pending = (args["questionId"], output)
+        elif name == "next_question":
+            self.next_node = output.get("node")
+        elif name == "save_session":
+            self.answers.update({a["questionId"]: a["value"] for a in args.get("answers", [])})
+            self.current_node = output["currentNode"]
+            self.node = self.next_node
+            self.persisted = output.get("persisted")
+
+
+class ScriptedAgentModel:
+    """Decides the next output items for a request, like the agent would."""
+
+    def respond(self, input_items):
+        ctx = _Context(input_items)
+        last = input_items[-1]
+        kind = _get(last, "type")
+
+        if kind == "function_call_output":
+            name, args = ctx.calls[_get(last, "call_id")]
+            output = json.loads(_get(last, "output"))
+            return self._after_tool(ctx, name, args, output)
+
+        text = _text(last)
+        if not ctx.session_loaded:
+            return [self._call("load_session", {"sessionId": ctx.session_id or "anonymous"})]
+        if ctx.last_assistant and ctx.last_assistant.endswith(CONFIRM_SUFFIX) and ctx.pending:
+            question_id, result = ctx.pending
+            if YES.match(text):
+                return [self._call("next_question", {"questionId": question_id, "answer": result["normalized"]})]
+            return [self._message("No problem! What should it be?")]
+        return [self._call("normalize_answer", {"questionId": ctx.current_node, "answer": text})]
+
+    def collected_answers(self, input_items):
+        """Answers confirmed so far, as the model would read them from the request."""
+        return _Context(input_items).answers
+
+    def answers_persisted(self, input_items):
+        """True when the last save_session reported every section written, so no MCP submission is needed."""
+        persisted = _Context(input_items).persisted
+        return persisted is not None and not persisted["pending"]
+
+    def _after_tool(self, ctx, name, args, output):
+        if _failed(output):
+            return [self._message("Sorry, let me ask that again.")]
+        if name == "load_session":
+            return [self._call("get_question", {"questionId": output["current_node"]})]
+        if name == "get_question":
+            greeting = "" if ctx.last_assistant else GREETING + " "
+            return [self._message(greeting + output["text"])]
+        if name == "normalize_answer":
+            result = ctx.pending[1]
+            if result.get("unmatched"):
+                return [self._message(f"I understood that as none of the listed options. {CONFIRM_SUFFIX}")]
+            if result["valid"]:
+                return [self._message(f"I understood your answer as {result['normalized'] or 'empty'}. {CONFIRM_SUFFIX}")]
+            return [self._message(f"{output['error']} {ctx.node['text'] if ctx.node else ''}".strip())]
+        if name == "next_question":
+            node = output.get("node") or {}
+            return [
+                self._call(
+                    "save_session",
+                    {
+                        "sessionId": ctx.session_id,
+                        "currentNode": output.get("next") or args["questionId"],
+                        "answers": [{"questionId": args["questionId"], "value": args["answer"]}],
+                        "retries": 0,
+                        "silences": 0,
+                        "completed": node.get("type") == "end",
+                    },
+                )
+            ]
+        if name == "save_session":
+            node = ctx.next_node or {}
+            if args.get("completed") or node.get("type") == "end":
+                return [self._call("read_summary", {"sessionId": ctx.session_id})]
+            return [self._message(node.get("text", ""))]
+        if name == "read_summary":
+            return [self._message(CLOSING)]
+        return [self._message("")]
+
+    @staticmethod
+    def _call(name, arguments):
+        n = next(_ids)
+        return {"type": "function_call", "id": f"fc_{n}", "call_id": f"call_{n}", "name": name, "arguments": json.dumps(arguments), "status": "completed"}
+
+    @staticmethod
+    def _message(text):
+        return {
+            "type": "message",
+            "id": f"msg_{next(_ids)}",
+            "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        }
+
+
+class PromptCache:
+    """Prefix cache keyed by the running hash of instructions, tools and input items."""
+
+    def __init__(self, min_tokens=CACHE_MIN_TOKENS):
+        self.min_tokens = min_tokens
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def lookup_and_store(self, instructions, tools, input_items):
+        """Return (total_tokens, cached_tokens) for a request and remember its prefixes."""
+        h = hashlib.sha256()
+        segments = [json.dumps([instructions, tools], sort_keys=True)]
+        segments += [json.dumps(_plain(item), sort_keys=True) for item in input_items]
+        total = cached = 0
+        prefixes = []
+        with self._lock:
+            for segment in segments:
+                h.update(segment.encode("utf-8"))
+                total += estimate_tokens(segment)
+                digest = h.hexdigest()
+                prefixes.append(digest)
+                if digest in self._seen and total >= self.min_tokens:
+                    cached = total
+            self._seen.update(prefixes)
+        return total, cached
+
+
+def _plain(item):
+    if isinstance(item, dict):
+        return item
+    if hasattr(item, "model_dump"):
+        return item.model_dump(exclude_none=True)
+    return {k: v for k, v in vars(item).items() if not k.startswith("_")}
+
+
+def build_response(model_name, output, input_tokens, cached_tokens):
+    """Responses API JSON body for ``output`` items."""
+    output_tokens = sum(estimate_tokens(o.get("arguments") or _text(o)) for o in output)
+    return {
+        "id": f"resp_{next(_ids)}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": model_name,
+        "output": output,
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": input_tokens,
+            "input_tokens_details": {"cached_tokens": cached_tokens},
+            "output_tokens": output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+def _pieces(item):
+    """What the mock generates one "token" at a time: words of a message, four-character runs of tool arguments."""
+    if _get(item, "type") == "message":
+        return re.findall(r"\S+\s*", _text(item))
+    arguments = _get(item, "arguments") or ""
+    return [arguments[i : i + 4] for i in range(0, len(arguments), 4)]
+
+
+def to_namespace(value):
+    """Attribute access over a JSON body, in the shape of the SDK's response objects."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(v) for v in value]
+    return value
+
+
+class _Responses:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, *, model, input, instructions=None, tools=None, stream=False, **kwargs):
+        client = self._client
+        if client.latency:
+            time.sleep(client.latency)
+        output = client.model.respond(list(input))
+        input_tokens, cached_tokens = client.cache.lookup_and_store(instructions, tools, input)
+        body = build_response(model, output, input_tokens, cached_tokens)
+        response = to_namespace(body)
+        response.output_text = "".join(_text(o) for o in output if o["type"] == "message")
+        if stream:
+            return self._stream(response)
+        if client.token_interval:
+            time.sleep(client.token_interval * sum(len(_pieces(o)) for o in output))
+        return response
+
+    def _stream(self, response):
+        """Server-sent events in the SDK's shape: created, one delta per word, completed."""
+        interval = self._client.token_interval
+        yield SimpleNamespace(type="response.created", response=response)
+        for index, item in enumerate(response.output):
+            for delta in _pieces(item):
+                if interval:
+                    time.sleep(interval)
+                if item.type == "message":
+                    yield SimpleNamespace(type="response.output_text.delta", item_id=item.id, output_index=index, delta=delta)
+        yield SimpleNamespace(type="response.completed", response=response)
+
+
+class MockOpenAIClient:
+    """Drop-in for openai_client where only responses.create is used.
+
+    ``latency`` is the time to the first output token and ``token_interval``
+    the time per output token after it; responses.create(stream=True) yields
+    SDK-shaped events instead of a response.
+    """
+
+    def __init__(self, model=None, latency=0.0, cache=None, token_interval=0.0):
+        self.model = model or ScriptedAgentModel()
+        self.latency = latency
+        self.token_interval = token_interval
+        self.cache = cache or PromptCache()
+        self.responses = _Responses(self)
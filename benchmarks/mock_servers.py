@@ -0,0 +1,225 @@
+"""
+DESCRIPTION:
+    Local HTTP stand-ins for the Responses endpoint and the /cosmos/ MCP server.
+
+    MockResponsesServer serves POST /v1/responses (and /openai/v1/responses)
+    with the scripted agent model. When the request carries an MCP tool and
+    the model closes the interview without save_session having persisted
+    every section, the server calls that MCP server's tools/call itself, as
+    the hosted Responses API does, and reports an mcp_call output item. It
+    can also enforce a synthetic RPM/TPM quota and answer 429 beyond it.
+    MockMcpServer answers initialize, tools/list and tools/call. Both take a
+    fixed latency plus uniform jitter per request. MockOtlpCollector accepts
+    OTLP/HTTP JSON traces at /v1/traces and keeps the spans.
+
+USAGE:
+    async with MockMcpServer(latency=0.05) as mcp, MockResponsesServer(latency=0.3) as api:
+        client = AsyncOpenAI(base_url=api.base_url, api_key="mock")
+"""
+
+import asyncio
+import json
+import math
+import random
+import time
+
+from aiohttp import ClientSession, web
+
+from benchmarks.mock_model import CLOSING, PromptCache, ScriptedAgentModel, build_response
+from rate_limiter import TokenBucket
+
+SAVE_ANSWERS_TOOL = "save_answers"
+
+
+class _MockServer:
+    def __init__(self, latency=0.0, jitter=0.0, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._runner = None
+
+    async def _delay(self):
+        delay = self.latency + random.uniform(0, self.jitter) if self.jitter else self.latency
+        if delay:
+            await asyncio.sleep(delay)
+
+    def routes(self):
+        raise NotImplementedError
+
+    async def start(self):
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.add_routes(self.routes())
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port, backlog=2048)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+
+class MockMcpServer(_MockServer):
+    """JSON-RPC MCP endpoint at /cosmos/ that accepts any tools/call and counts it.
+
+    ``error_rate`` makes that share of tools/call requests fail with HTTP 503.
+    """
+
+    def __init__(self, path="/cosmos/", error_rate=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.error_rate = error_rate
+        self.tool_calls = 0
+        self.failed_calls = 0
+        self.saved = []
+
+    def routes(self):
+        return [web.post(self.path, self.handle)]
+
+    @property
+    def server_url(self):
+        return self.url + self.path
+
+    async def handle(self, request):
+        self.requests += 1
+        await self._delay()
+        message = await request.json()
+        method = message.get("method")
+        if method == "initialize":
+            result = {"protocolVersion": "2025-03-26", "capabilities": {"tools": {}}, "serverInfo": {"name": "mock-cosmos", "version": "1"}}
+        elif method == "tools/list":
+            result = {"tools": [{"name": SAVE_ANSWERS_TOOL, "inputSchema": {"type": "object"}}]}
+        elif method == "tools/call":
+            self.tool_calls += 1
+            if self.error_rate and random.random() < self.error_rate:
+                self.failed_calls += 1
+                return web.Response(status=503, text="throttled")
+            self.saved.append(message["params"].get("arguments", {}))
+            result = {"content": [{"type": "text", "text": json.dumps({"saved": True})}], "isError": False}
+        elif "id" not in message:
+            return web.Response(status=202)
+        else:
+            return web.json_response({"jsonrpc": "2.0", "id": message.get("id"), "error": {"code": -32601, "message": f"Unknown method {method}"}})
+        return web.json_response({"jsonrpc": "2.0", "id": message.get("id"), "result": result})
+
+
+class MockOtlpCollector(_MockServer):
+    """OTLP/HTTP trace receiver that keeps every span it is sent."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.spans = []
+        self.received_spans = 0
+
+    def routes(self):
+        return [web.post("/v1/traces", self.handle)]
+
+    async def handle(self, request):
+        self.requests += 1
+        payload = await request.json()
+        for resource in payload.get("resourceSpans", []):
+            for scope in resource.get("scopeSpans", []):
+                self.spans.extend(scope.get("spans", []))
+                self.received_spans += len(scope.get("spans", []))
+        return web.json_response({"partialSuccess": {}})
+
+
+class MockResponsesServer(_MockServer):
+    """Responses API endpoint backed by ScriptedAgentModel.
+
+    With ``rpm`` / ``tpm`` it enforces a synthetic quota like a deployment's:
+    requests over it get HTTP 429 with Retry-After and retry-after-ms headers.
+    """
+
+    def __init__(self, model=None, cache=None, rpm=None, tpm=None, **kwargs):
+        super().__init__(**kwargs)
+        self.model = model or ScriptedAgentModel()
+        self.cache = cache or PromptCache()
+        self.quota = [TokenBucket.per_minute(limit) if limit else None for limit in (rpm, tpm)]
+        self.mcp_calls = 0
+        self.throttled = 0
+        self._http = None
+
+    def routes(self):
+        return [web.post("/v1/responses", self.handle), web.post("/openai/v1/responses", self.handle)]
+
+    @property
+    def base_url(self):
+        return self.url + "/v1"
+
+    async def stop(self):
+        if self._http is not None:
+            await self._http.close()
+        await super().stop()
+
+    async def handle(self, request):
+        self.requests += 1
+        started = time.perf_counter()
+        body = await request.json()
+        input_items = body.get("input") or []
+        if isinstance(input_items, str):
+            input_items = [{"role": "user", "content": input_items}]
+        input_tokens, cached_tokens = self.cache.lookup_and_store(body.get("instructions"), body.get("tools"), input_items)
+        retry_after = self._over_quota(input_tokens)
+        if retry_after:
+            self.throttled += 1
+            return web.json_response(
+                {"error": {"code": "429", "message": "Rate limit is exceeded. Try again later.", "type": "rate_limit_exceeded"}},
+                status=429,
+                headers={"Retry-After": str(math.ceil(retry_after)), "retry-after-ms": str(int(retry_after * 1000))},
+            )
+        output = self.model.respond(input_items)
+        await self._delay()
+        mcp_tool = next((t for t in body.get("tools") or [] if t.get("type") == "mcp"), None)
+        closing = any(o["content"][0]["text"] == CLOSING for o in output if o["type"] == "message")
+        if mcp_tool and closing and not self.model.answers_persisted(input_items):
+            output.insert(0, await self._call_mcp(mcp_tool, self.model.collected_answers(input_items)))
+        response = build_response(body.get("model", "mock"), output, input_tokens, cached_tokens)
+        if self.quota[1] is not None:
+            self.quota[1].take(response["usage"]["output_tokens"])
+        response["metadata"] = {"server_ms": round((time.perf_counter() - started) * 1000, 3)}
+        return web.json_response(response)
+
+    def _over_quota(self, input_tokens):
+        """Seconds until this request would fit the quota; charges the quota and returns 0 when it fits."""
+        requests, tokens = self.quota
+        wait = max(requests.wait_time(1) if requests else 0.0, tokens.wait_time(input_tokens) if tokens else 0.0)
+        if wait:
+            return wait
+        if requests:
+            requests.take(1)
+        if tokens:
+            tokens.take(input_tokens)
+        return 0.0
+
+    async def _call_mcp(self, tool, answers):
+        if self._http is None:
+            self._http = ClientSession()
+        self.mcp_calls += 1
+        arguments = {"answers": answers}
+        payload = {"jsonrpc": "2.0", "id": self.mcp_calls, "method": "tools/call", "params": {"name": SAVE_ANSWERS_TOOL, "arguments": arguments}}
+        async with self._http.post(tool["server_url"], json=payload, headers={"Accept": "application/json, text/event-stream"}) as response:
+            result = await response.json()
+        return {
+            "type": "mcp_call",
+            "id": f"mcp_{self.mcp_calls}",
+            "server_label": tool.get("server_label", "cosmos"),
+            "name": SAVE_ANSWERS_TOOL,
+            "arguments": json.dumps(arguments),
+            "output": json.dumps(result.get("result")),
+            "error": json.dumps(result["error"]) if "error" in result else None,
+        }
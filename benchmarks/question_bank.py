@@ -0,0 +1,111 @@
+"""
+DESCRIPTION:
+    Startup and lookup cost of the JSON guide versus a .qbank question bank.
+
+    Builds a synthetic guide from --copies copies of QuestionListCopy.json
+    (each copy's ids and branch targets prefixed, chained END to start), then
+    measures for several sizes: opening the graph, looking up --lookups
+    random nodes, and walking one copy's default path. The conversion's time
+    and peak Python memory are reported too.
+
+USAGE:
+    python -m benchmarks.question_bank [--copies 10 100 1000] [--lookups 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from question_bank import convert
+from question_graph import DEFAULT_QUESTION_FILE, END_NODE_ID, QuestionGraph
+
+
+def synthetic_guide(path, copies, source=DEFAULT_QUESTION_FILE):
+    """Write ``copies`` prefixed copies of ``source`` as one guide; returns the node count."""
+    with open(source, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    meta = data.pop("meta", {})
+    count = 0
+    with open(path, "w", encoding="utf-8") as out:
+        out.write('{"meta": ' + json.dumps(meta))
+        for copy in range(copies):
+
+            def rename(node_id):
+                if node_id == END_NODE_ID and copy < copies - 1:
+                    return f"P{copy + 1}_{next(iter(data))}"
+                return node_id if node_id == END_NODE_ID else f"P{copy}_{node_id}"
+
+            for node_id, node in data.items():
+                if node_id == END_NODE_ID and copy < copies - 1:
+                    continue
+                target = node.get("next")
+                if isinstance(target, dict):
+                    target = {key: rename(t) for key, t in target.items()}
+                elif isinstance(target, str):
+                    target = rename(target)
+                out.write(f",\n{json.dumps(rename(node_id))}: {json.dumps({**node, 'next': target})}")
+                count += 1
+        out.write("}\n")
+    return count
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def measure(path, ids, lookups):
+    graph, open_seconds = timed(lambda: QuestionGraph.load(path))
+
+    def lookup():
+        for node_id in ids[:lookups]:
+            graph.get_question(node_id)
+
+    def walk():
+        node_id, steps = graph.start_id, 0
+        while node_id and node_id != END_NODE_ID and steps < 200:
+            node_id = graph.next_question(node_id, "default")
+            steps += 1
+        return steps
+
+    _, lookup_seconds = timed(lookup)
+    _, walk_seconds = timed(walk)
+    return open_seconds, lookup_seconds, walk_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON guide versus .qbank question bank.")
+    parser.add_argument("--copies", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>7} {'format':<6} {'size KB':>8} {'open ms':>9} {'lookups ms':>10} {'walk ms':>8}   convert")
+    with tempfile.TemporaryDirectory() as tmp:
+        for copies in args.copies:
+            json_path = os.path.join(tmp, f"guide-{copies}.json")
+            bank_path = os.path.join(tmp, f"guide-{copies}.qbank")
+            count = synthetic_guide(json_path, copies)
+            _, convert_seconds = timed(lambda: convert(json_path, bank_path))
+            # Peak memory from a second, traced run: tracing slows the conversion down.
+            tracemalloc.start()
+            convert(json_path, bank_path)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            ids = list(QuestionGraph.load(bank_path).nodes)
+            random.Random(copies).shuffle(ids)
+            for label, path in (("json", json_path), ("qbank", bank_path)):
+                open_seconds, lookup_seconds, walk_seconds = measure(path, ids, args.lookups)
+                note = f"{convert_seconds * 1000:.0f} ms, peak {peak / 1024:.0f} KB" if label == "qbank" else ""
+                print(
+                    f"{count:>7} {label:<6} {os.path.getsize(path) / 1024:>8.0f} {open_seconds * 1000:>9.2f} "
+                    f"{lookup_seconds * 1000:>10.2f} {walk_seconds * 1000:>8.2f}   {note}"
+                )
+
+
+if __name__ == "__main__":
+    main()
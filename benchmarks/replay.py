@@ -0,0 +1,282 @@
+"""
+DESCRIPTION:
+    Offline replay of a fixed caller corpus against agent definitions.
+
+    Every caller script in the corpus (benchmarks/replay_corpus.jsonl by
+    default, see caller_scripts.py for the format) is replayed through
+    ConversationDriver once per agent definition, each agent with the
+    instructions compiled from its profile (agent_specs.AGENT_PROFILES).
+    Reports per interview and per agent: caller turns, model calls, input,
+    cached and output tokens, tool calls per question answered and wall time,
+    and each agent's totals relative to the first one.
+
+    Model backends:
+
+        mock (default)      the local ScriptedAgentModel, which follows the
+                            protocol the same way for every agent, so token
+                            differences come from the instructions alone; it
+                            answers instantly unless --latency and
+                            --token-interval give it a simulated speed
+        --recording FILE    responses recorded from a deployment, replayed in
+                            order with their recorded latency (scaled by
+                            --time-scale) and usage, so the agents' actual
+                            behaviour (extra turns, tool calls) is compared
+        --record FILE       runs the corpus against the deployment in
+                            AZURE_AI_MODEL_DEPLOYMENT_NAME and writes such a
+                            recording (needs AZURE_AI_PROJECT_ENDPOINT)
+
+    Tools always run locally on an in-memory session store. --out writes one
+    JSON line per interview, to compare a prompt change against a baseline.
+
+USAGE:
+    python -m benchmarks.replay
+    python -m benchmarks.replay --agents my-voic-agent --budget 1500 --out terse.jsonl
+    python -m benchmarks.replay --record recordings.jsonl
+    python -m benchmarks.replay --recording recordings.jsonl --time-scale 0
+"""
+
+import argparse
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+
+os.environ.setdefault("SESSION_STORE", "memory://")
+
+from agent_specs import AGENT_PROFILES  # noqa: E402
+from agent_tools import get_graph, get_session_store  # noqa: E402
+from benchmarks.caller_scripts import DEFAULT_CORPUS, corpus_script, load_corpus  # noqa: E402
+from benchmarks.mock_model import MockOpenAIClient, PromptCache, to_namespace  # noqa: E402
+from conversation import ConversationDriver  # noqa: E402
+from instruction_compiler import compile_instructions  # noqa: E402
+
+
+@dataclass
+class InterviewResult:
+    agent: str
+    script_id: str
+    completed: bool
+    turns: int
+    questions: int
+    model_calls: int
+    tool_calls: int
+    input_tokens: int
+    cached_tokens: int
+    output_tokens: int
+    seconds: float
+
+    @property
+    def tool_calls_per_question(self):
+        return self.tool_calls / self.questions if self.questions else 0.0
+
+
+class _RecordingResponses:
+    def __init__(self, client, records, key):
+        self._client = client
+        self._records = records
+        self._key = key
+
+    def create(self, **kwargs):
+        started = time.perf_counter()
+        response = self._client.responses.create(**kwargs)
+        self._records.append(
+            {
+                **self._key,
+                "call": len(self._records),
+                "seconds": round(time.perf_counter() - started, 4),
+                "response": response.model_dump(mode="json"),
+            }
+        )
+        return response
+
+
+class RecordingClient:
+    """Passes responses.create through to a live client and keeps each response for the recording."""
+
+    def __init__(self, client, agent, script_id):
+        self.records = []
+        self.responses = _RecordingResponses(client, self.records, {"agent": agent, "script_id": script_id})
+
+
+class _RecordedResponses:
+    def __init__(self, records, name, time_scale):
+        self._records = records
+        self._name = name
+        self._time_scale = time_scale
+        self._next = 0
+
+    def create(self, **kwargs):
+        if self._next >= len(self._records):
+            raise RuntimeError(f"The recording for {self._name} ends after {len(self._records)} responses")
+        record = self._records[self._next]
+        self._next += 1
+        if self._time_scale:
+            time.sleep(record["seconds"] * self._time_scale)
+        response = to_namespace(record["response"])
+        response.output_text = "".join(
+            part.text
+            for item in response.output
+            if item.type == "message"
+            for part in item.content
+            if getattr(part, "type", "") == "output_text"
+        )
+        return response
+
+
+class RecordedClient:
+    """Serves one interview's recorded responses in order."""
+
+    def __init__(self, records, agent, script_id, time_scale=1.0):
+        self.responses = _RecordedResponses(records, f"{agent}/{script_id}", time_scale)
+
+
+def load_recording(path):
+    """{(agent, script_id): [record, ...]} from a recording file, each list in call order."""
+    recordings = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                recordings.setdefault((record["agent"], record["script_id"]), []).append(record)
+    for records in recordings.values():
+        records.sort(key=lambda r: r["call"])
+    return recordings
+
+
+def replay(client, model, instructions, agent, script_id, script, run):
+    session_id = f"replay-{agent}-{script_id}-{run}"
+    driver = ConversationDriver(client, model, instructions, session_id=session_id)
+    started = time.perf_counter()
+    driver.start()
+    for utterance in script:
+        driver.turn(utterance)
+    seconds = time.perf_counter() - started
+    state = get_session_store().load(session_id)
+    turns = driver.stats.turns
+    return InterviewResult(
+        agent=agent,
+        script_id=script_id,
+        completed=driver.finished,
+        turns=len(turns),
+        questions=len(state.answers) if state else 0,
+        model_calls=sum(t.model_calls for t in turns),
+        tool_calls=driver.stats.tool_calls,
+        input_tokens=driver.stats.input_tokens,
+        cached_tokens=sum(t.cached_tokens for t in turns),
+        output_tokens=driver.stats.output_tokens,
+        seconds=seconds,
+    )
+
+
+def _live_client():
+    from dotenv import load_dotenv
+
+    from clients import get_openai_client
+
+    load_dotenv()
+    return get_openai_client(), os.environ["AZURE_AI_MODEL_DEPLOYMENT_NAME"]
+
+
+def print_header():
+    print(
+        f"{'agent':<22} {'script':<18} {'done':>4} {'turns':>5} {'calls':>5} {'input':>9} {'cached':>9} "
+        f"{'output':>7} {'tools/q':>7} {'seconds':>8}"
+    )
+
+
+def print_row(r):
+    print(
+        f"{r.agent:<22} {r.script_id:<18} {'yes' if r.completed else 'no':>4} {r.turns:>5} {r.model_calls:>5} "
+        f"{r.input_tokens:>9} {r.cached_tokens:>9} {r.output_tokens:>7} {r.tool_calls_per_question:>7.2f} {r.seconds:>8.2f}",
+        flush=True,
+    )
+
+
+def print_totals(results, agents):
+    print(f"\n{'per interview':<22} {'turns':>6} {'input':>9} {'output':>7} {'tools/q':>7} {'seconds':>8} {'completed':>9}")
+    totals = {}
+    for agent in agents:
+        rows = [r for r in results if r.agent == agent]
+        n = len(rows)
+        questions = sum(r.questions for r in rows)
+        totals[agent] = {
+            "turns": sum(r.turns for r in rows) / n,
+            "input": sum(r.input_tokens for r in rows) / n,
+            "output": sum(r.output_tokens for r in rows) / n,
+            "tools/q": sum(r.tool_calls for r in rows) / questions if questions else 0.0,
+            "seconds": sum(r.seconds for r in rows) / n,
+        }
+        t = totals[agent]
+        completed = f"{sum(r.completed for r in rows)}/{n}"
+        print(
+            f"{agent:<22} {t['turns']:>6.1f} {t['input']:>9.0f} {t['output']:>7.0f} {t['tools/q']:>7.2f} "
+            f"{t['seconds']:>8.2f} {completed:>9}"
+        )
+
+    baseline = agents[0]
+    for agent in agents[1:]:
+        changes = ", ".join(
+            f"{metric} {(value / totals[baseline][metric] - 1) * 100:+.1f}%"
+            for metric, value in totals[agent].items()
+            if totals[baseline][metric]
+        )
+        print(f"\n{agent} vs {baseline}: {changes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a caller corpus against agent definitions.")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL caller scripts.")
+    parser.add_argument("--scripts", nargs="+", help="Replay only these script_ids.")
+    parser.add_argument("--agents", nargs="+", choices=sorted(AGENT_PROFILES), default=sorted(AGENT_PROFILES))
+    parser.add_argument("--budget", type=int, help="Instruction token budget (see instruction_compiler.py).")
+    parser.add_argument("--repeat", type=int, default=1, help="Replays per script and agent.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock time to first token, seconds.")
+    parser.add_argument("--token-interval", type=float, default=0.0, help="Mock time per output token, seconds.")
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument("--recording", help="Replay responses recorded with --record instead of the mock model.")
+    backend.add_argument("--record", help="Run against the deployment and write its responses to this file.")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiplier on recorded latencies (0 = no waiting).")
+    parser.add_argument("--out", help="Write one JSON line per interview to this file.")
+    args = parser.parse_args()
+
+    graph = get_graph()
+    corpus = [e for e in load_corpus(args.corpus) if not args.scripts or e["script_id"] in args.scripts]
+    recordings = load_recording(args.recording) if args.recording else None
+    live, model = _live_client() if args.record else (None, "mock")
+    recorded = []
+
+    results = []
+    print_header()
+    for agent in args.agents:
+        instructions = compile_instructions(AGENT_PROFILES[agent], graph, budget=args.budget).text
+        # One cache per agent: its deployment's prompt cache stays warm across callers.
+        cache = PromptCache()
+        for entry in corpus:
+            script_id = entry["script_id"]
+            script = corpus_script(graph, entry)
+            for run in range(args.repeat):
+                if recordings is not None:
+                    client = RecordedClient(recordings.get((agent, script_id), []), agent, script_id, args.time_scale)
+                elif live is not None:
+                    client = RecordingClient(live, agent, script_id)
+                else:
+                    client = MockOpenAIClient(latency=args.latency, token_interval=args.token_interval, cache=cache)
+                results.append(replay(client, model, instructions, agent, script_id, script, run))
+                print_row(results[-1])
+                if live is not None and run == 0:
+                    recorded += client.records
+
+    print_totals(results, args.agents)
+
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(record) + "\n" for record in recorded)
+        print(f"\nWrote {len(recorded)} responses to {args.record}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for r in results:
+                f.write(json.dumps({**asdict(r), "tool_calls_per_question": r.tool_calls_per_question}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+DESCRIPTION:
+    Fast/main model routing on a scripted interview.
+
+    Replays one branch twice against the local mock model: once with every
+    call on the main deployment, once through ModelRouter. The mock fast
+    deployment answers sooner but, at --fast-error-rate, returns a broken
+    tool call (an unknown question id) that must be caught locally and
+    retried on the main model. Prints per-route calls, fallbacks, latency and
+    tokens, and the wall time of both runs.
+
+USAGE:
+    python -m benchmarks.routing [--branch kidney_infection] [--main-latency 0.4] [--fast-latency 0.1] [--fast-error-rate 0.1]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+
+os.environ.setdefault("SESSION_STORE", "memory://")
+
+from agent_tools import get_graph  # noqa: E402
+from benchmarks.caller_scripts import branch_scripts  # noqa: E402
+from benchmarks.mock_model import MockOpenAIClient, PromptCache, ScriptedAgentModel  # noqa: E402
+from conversation import ConversationDriver  # noqa: E402
+from instructions import sarah_instructions  # noqa: E402
+from model_router import ModelRouter  # noqa: E402
+
+MAIN_MODEL = "main-deployment"
+FAST_MODEL = "fast-deployment"
+
+
+class TwoDeploymentClient:
+    """Sends each request to a mock deployment chosen by its model name."""
+
+    def __init__(self, main_latency, fast_latency, fast_error_rate, seed=7):
+        model, cache = ScriptedAgentModel(), PromptCache()
+        self.clients = {
+            MAIN_MODEL: MockOpenAIClient(model, latency=main_latency, cache=cache),
+            FAST_MODEL: MockOpenAIClient(model, latency=fast_latency, cache=cache),
+        }
+        self.fast_error_rate = fast_error_rate
+        self.random = random.Random(seed)
+        self.responses = self
+
+    def create(self, *, model, **kwargs):
+        response = self.clients[model].responses.create(model=model, **kwargs)
+        if model == FAST_MODEL and self.random.random() < self.fast_error_rate:
+            for item in response.output:
+                if item.type == "function_call" and "questionId" in item.arguments:
+                    item.arguments = json.dumps({**json.loads(item.arguments), "questionId": "Q999"})
+        return response
+
+
+def replay(script, client, router, session_id):
+    driver = ConversationDriver(client, MAIN_MODEL, sarah_instructions(), session_id=session_id, router=router)
+    started = time.perf_counter()
+    driver.start()
+    for utterance in script:
+        driver.turn(utterance)
+    return driver, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fast/main model routing on a scripted interview.")
+    parser.add_argument("--branch", default="hypertension", choices=["hypertension", "diabetes", "kidney_infection", "unmatched"])
+    parser.add_argument("--main-latency", type=float, default=0.05)
+    parser.add_argument("--fast-latency", type=float, default=0.015)
+    parser.add_argument("--fast-error-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    script = branch_scripts(get_graph())[args.branch]
+    client = TwoDeploymentClient(args.main_latency, args.fast_latency, args.fast_error_rate)
+    baseline_router = ModelRouter(MAIN_MODEL)
+    baseline, baseline_seconds = replay(script, client, baseline_router, f"route-main-{args.branch}")
+    router = ModelRouter(MAIN_MODEL, FAST_MODEL)
+    routed, routed_seconds = replay(script, client, router, f"route-fast-{args.branch}")
+
+    print(f"{'route':<28} {'calls':>5} {'fallbk':>6} {'p50 ms':>7} {'p95 ms':>7} {'in tok':>9} {'out tok':>7}")
+    for key, stats in router.report().items():
+        latency = stats["latency_seconds"]
+        print(
+            f"{key:<28} {stats['calls']:>5} {stats['fallbacks']:>6} {latency['p50'] * 1000:>7.0f} {latency['p95'] * 1000:>7.0f} "
+            f"{stats['input_tokens']:>9} {stats['output_tokens']:>7}"
+        )
+    fast_calls = sum(s["calls"] for k, s in router.report().items() if k.startswith("fast:"))
+    total_calls = sum(s["calls"] for s in router.report().values())
+    print(f"\nfast share: {fast_calls}/{total_calls} calls")
+    print(f"main only: {baseline_seconds:.2f}s  routed: {routed_seconds:.2f}s  answers match: {saved_answers(baseline) == saved_answers(routed)}")
+
+
+def saved_answers(driver):
+    from agent_tools import get_session_store
+
+    return get_session_store().load(driver.session_id).answers
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+DESCRIPTION:
+    Silence handling by the turn manager: timer accuracy and model calls.
+
+    A scripted caller answers one branch of the interview but stays silent
+    before every Nth answer (and optionally goes silent for good near the
+    end). The turn manager plays the silence phrases from its own timers;
+    the report shows how late each phrase fired versus its schedule and how
+    many model calls the call took, compared with the prompt-driven approach
+    where every silence is a model round trip.
+
+    Waits are scaled by --time-scale so a run takes seconds, not minutes.
+
+USAGE:
+    python -m benchmarks.silence [--branch diabetes] [--silence-every 4] [--hang-silent] [--policy terse]
+"""
+
+import argparse
+import asyncio
+import os
+from dataclasses import replace
+
+os.environ.setdefault("SESSION_STORE", "memory://")
+
+from agent_tools import get_graph  # noqa: E402
+from benchmarks.caller_scripts import branch_scripts  # noqa: E402
+from benchmarks.mock_model import MockOpenAIClient  # noqa: E402
+from conversation import ConversationDriver  # noqa: E402
+from instructions import sarah_instructions  # noqa: E402
+from metrics import summarize  # noqa: E402
+from speech import SpeechSink  # noqa: E402
+from turn_manager import SILENCE_POLICIES, Transcript, TurnManager  # noqa: E402
+
+
+class ScriptedCaller(SpeechSink):
+    """Speech sink that plays the caller: after each agent turn it says the next line or stays silent."""
+
+    def __init__(self, loop, events, actions):
+        self.loop = loop
+        self.events = events
+        self.actions = list(actions)
+        self.spoken = []
+
+    def speak(self, text):
+        self.spoken.append(text)
+
+    def end_turn(self):
+        if not self.actions:
+            return
+        action = self.actions.pop(0)
+        if action is not None:
+            self.loop.call_soon_threadsafe(self.events.put_nowait, Transcript(action))
+
+
+def caller_actions(script, silence_every, hang_silent, max_silences):
+    """Utterances with one silence (None) before every ``silence_every``-th answer."""
+    actions = []
+    for i, utterance in enumerate(script):
+        if silence_every and i % (2 * silence_every) == 2 * silence_every - 2:
+            actions.append(None)
+        actions.append(utterance)
+    if hang_silent:
+        actions = actions[: len(actions) * 2 // 3] + [None] * max_silences
+    return actions
+
+
+async def run(args):
+    policy = SILENCE_POLICIES[args.policy]
+    policy = replace(policy, waits=tuple(w * args.time_scale for w in policy.waits))
+    script = branch_scripts(get_graph())[args.branch]
+    events = asyncio.Queue()
+    actions = caller_actions(script, args.silence_every, args.hang_silent, policy.max_silences)
+    caller = ScriptedCaller(asyncio.get_running_loop(), events, actions)
+    driver = ConversationDriver(MockOpenAIClient(latency=args.model_latency), "mock", sarah_instructions(), session_id=f"silence-{args.branch}")
+    manager = TurnManager(driver, caller, policy)
+    outcome = await manager.run(events)
+
+    silences = len(manager.stats.silences)
+    model_calls = sum(t.model_calls for t in driver.stats.turns)
+    errors = summarize(e * 1000 for e in manager.stats.timer_errors)
+    print(f"outcome: {outcome}")
+    print(f"caller turns: {len(driver.stats.turns)}  silences handled: {silences}  model calls: {model_calls}")
+    print(f"prompt-driven silences would add at least {silences} model calls ({model_calls + silences} total)")
+    if silences:
+        print(f"timer lateness ms: p50 {errors['p50']:.1f}  p95 {errors['p95']:.1f}  max {errors['max']:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Silence timers in the turn manager.")
+    parser.add_argument("--branch", default="hypertension", choices=["hypertension", "diabetes", "kidney_infection", "unmatched"])
+    parser.add_argument("--policy", default="sarah", choices=sorted(SILENCE_POLICIES))
+    parser.add_argument("--silence-every", type=int, default=4, help="Stay silent once before every Nth answer (0: never).")
+    parser.add_argument("--hang-silent", action="store_true", help="Go silent for good two thirds of the way through.")
+    parser.add_argument("--time-scale", type=float, default=0.05, help="Multiplier on the policy's waits.")
+    parser.add_argument("--model-latency", type=float, default=0.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+DESCRIPTION:
+    Worker cold start: per-script clients versus the shared client factory.
+
+    Each sample is a fresh Python process that gets ready to call the model:
+    import the SDKs, build the clients and obtain an access token. Modes:
+
+        baseline        DefaultAzureCredential + AIProjectClient +
+                        project_client.get_openai_client(), as the scripts
+                        did before clients.py
+        factory cold    clients.get_openai_client() with an empty token cache
+                        (walks the credential chain once and fills the cache)
+        factory warm    the same with the token cached by an earlier process,
+                        the usual case for a short-lived conversation worker
+        warm + project  factory warm plus get_project_client(), as the
+                        provisioning scripts use it
+
+    Prints the median seconds per phase. The token cache lives in a temporary
+    directory. Without Azure credentials the chain fails (the time to fail is
+    still what a cold start pays); --seed-token puts an unexpired dummy token
+    in the cache so the warm modes can be measured offline.
+
+USAGE:
+    python -m benchmarks.startup [--runs 5] [--seed-token]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_ENDPOINT = "https://example.services.ai.azure.com/api/projects/startup-bench"
+
+PHASES = ("imports", "clients", "token", "total")
+
+_TIMER = """
+import json, time
+started = time.perf_counter()
+phases = {}
+def mark(name, since):
+    now = time.perf_counter()
+    phases[name] = now - since
+    return now
+"""
+
+BASELINE = (
+    _TIMER
+    + """
+import os
+t = started
+from azure.identity import DefaultAzureCredential
+from azure.ai.projects import AIProjectClient
+t = mark("imports", t)
+credential = DefaultAzureCredential()
+project_client = AIProjectClient(endpoint=os.environ["AZURE_AI_PROJECT_ENDPOINT"], credential=credential)
+openai_client = project_client.get_openai_client()
+t = mark("clients", t)
+try:
+    credential.get_token("https://ai.azure.com/.default")
+except Exception as e:
+    phases["error"] = type(e).__name__
+mark("token", t)
+mark("total", started)
+print(json.dumps(phases))
+"""
+)
+
+FACTORY = (
+    _TIMER
+    + """
+t = started
+import clients
+t = mark("imports", t)
+openai_client = clients.get_openai_client()
+if {project}:
+    clients.get_project_client()
+t = mark("clients", t)
+try:
+    clients.get_credential().get_token(clients.PROJECT_SCOPE)
+except Exception as e:
+    phases["error"] = type(e).__name__
+mark("token", t)
+mark("total", started)
+print(json.dumps(phases))
+"""
+)
+
+
+def sample(code, env):
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def seed_token(path):
+    """Write an unexpired dummy token for the project scope into the cache at ``path``."""
+    from clients import PROJECT_SCOPE, CachedTokenCredential, TokenCache, token_cache_key
+
+    cache = TokenCache(path)
+    identity = CachedTokenCredential(cache=cache).identity
+    cache.put(token_cache_key((PROJECT_SCOPE,), None, identity), "startup-bench-token", time.time() + 3600)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start: per-script clients versus the shared client factory.")
+    parser.add_argument("--runs", type=int, default=5, help="Processes per mode.")
+    parser.add_argument("--seed-token", action="store_true", help="Measure the warm modes with a dummy cached token.")
+    args = parser.parse_args()
+
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = os.path.join(tmp, "tokens.json")
+        env = {
+            **os.environ,
+            "AZURE_AI_PROJECT_ENDPOINT": os.environ.get("AZURE_AI_PROJECT_ENDPOINT", DEFAULT_ENDPOINT),
+            "TOKEN_CACHE_FILE": cache_file,
+            "PYTHONPATH": os.pathsep.join(filter(None, [repo, os.environ.get("PYTHONPATH")])),
+        }
+
+        def cold():
+            if os.path.exists(cache_file):
+                os.remove(cache_file)
+
+        def warm():
+            if args.seed_token:
+                seed_token(cache_file)
+
+        modes = [
+            ("baseline", BASELINE, cold),
+            ("factory cold", FACTORY.replace("{project}", "False"), cold),
+            ("factory warm", FACTORY.replace("{project}", "False"), warm),
+            ("warm + project", FACTORY.replace("{project}", "True"), warm),
+        ]
+        print(f"{'mode':<16} " + " ".join(f"{phase:>8}" for phase in PHASES) + "  token")
+        for name, code, prepare in modes:
+            samples = []
+            for _ in range(args.runs):
+                prepare()
+                samples.append(sample(code, env))
+            medians = [statistics.median(s[phase] for s in samples) for phase in PHASES]
+            errors = {s["error"] for s in samples if "error" in s}
+            status = f"failed ({', '.join(sorted(errors))})" if errors else "ok"
+            print(f"{name:<16} " + " ".join(f"{m:>8.3f}" for m in medians) + f"  {status}")
+
+
+if __name__ == "__main__":
+    main()
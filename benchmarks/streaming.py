@@ -0,0 +1,70 @@
+"""
+DESCRIPTION:
+    Perceived latency per turn with and without streaming.
+
+    Replays one scripted interview against the local mock model with a fixed
+    time to first token and a per-token generation time. Without streaming
+    the caller hears nothing until the whole turn is done; with streaming the
+    first clause is spoken as soon as it is complete. Prints p50/p95 of the
+    time until the caller hears something, and time to first token.
+
+USAGE:
+    python -m benchmarks.streaming [--branch diabetes] [--latency 0.3] [--token-interval 0.02]
+"""
+
+import argparse
+import os
+
+os.environ.setdefault("SESSION_STORE", "memory://")
+
+from agent_tools import get_graph  # noqa: E402
+from benchmarks.caller_scripts import branch_scripts  # noqa: E402
+from benchmarks.mock_model import MockOpenAIClient  # noqa: E402
+from conversation import ConversationDriver, StreamingConversationDriver  # noqa: E402
+from instructions import sarah_instructions  # noqa: E402
+from metrics import summarize  # noqa: E402
+from speech import RecordingSpeechSink  # noqa: E402
+
+
+def replay(driver, script):
+    driver.start()
+    for utterance in script:
+        driver.turn(utterance)
+    return driver
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perceived latency with and without streaming.")
+    parser.add_argument("--branch", default="hypertension", choices=["hypertension", "diabetes", "kidney_infection", "unmatched"])
+    parser.add_argument("--latency", type=float, default=0.3, help="Mock time to first token, seconds.")
+    parser.add_argument("--token-interval", type=float, default=0.02, help="Mock time per output token, seconds.")
+    args = parser.parse_args()
+
+    script = branch_scripts(get_graph())[args.branch]
+
+    def client():
+        return MockOpenAIClient(latency=args.latency, token_interval=args.token_interval)
+
+    blocking = replay(ConversationDriver(client(), "mock", sarah_instructions(), session_id=f"stream-off-{args.branch}"), script)
+    sink = RecordingSpeechSink()
+    streaming = replay(
+        StreamingConversationDriver(client(), "mock", sarah_instructions(), session_id=f"stream-on-{args.branch}", speech_sink=sink),
+        script,
+    )
+
+    rows = [
+        ("blocking: turn done", [t.seconds for t in blocking.stats.turns]),
+        ("streaming: first token", [t.first_token_seconds for t in streaming.stats.turns if t.first_token_seconds is not None]),
+        ("streaming: first audio", [t.first_audio_seconds for t in streaming.stats.turns if t.first_audio_seconds is not None]),
+        ("streaming: turn done", [t.seconds for t in streaming.stats.turns]),
+    ]
+    print(f"{'':<24} {'turns':>5} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, values in rows:
+        s = summarize(values)
+        print(f"{name:<24} {s['count']:>5} {s['p50'] * 1000:>8.0f} {s['p95'] * 1000:>8.0f} {s['max'] * 1000:>8.0f}")
+    chunks = [len(turn) for turn in sink.turns]
+    print(f"\nspeech chunks per turn: mean {sum(chunks) / len(chunks):.1f}, max {max(chunks)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+DESCRIPTION:
+    The END turn with a model-generated read-back versus read_summary.
+
+    Replays one scripted interview with the streaming driver against the
+    local mock model twice: once where the model reads every answer back
+    itself (the summary text is generated token by token, as before), and
+    once where it calls read_summary and the driver speaks the rendered
+    chunks. Prints, for the final turn, the time until the caller hears the
+    summary start, the turn time and the output tokens, plus the payload
+    that would be submitted.
+
+USAGE:
+    python -m benchmarks.summary [--branch diabetes] [--latency 0.3] [--token-interval 0.02]
+"""
+
+import argparse
+import json
+import os
+
+os.environ.setdefault("SESSION_STORE", "memory://")
+
+from agent_tools import get_graph, get_session_store  # noqa: E402
+from benchmarks.caller_scripts import branch_scripts  # noqa: E402
+from benchmarks.mock_model import CLOSING, MockOpenAIClient, ScriptedAgentModel  # noqa: E402
+from conversation import StreamingConversationDriver  # noqa: E402
+from instructions import sarah_instructions  # noqa: E402
+from speech import RecordingSpeechSink  # noqa: E402
+from summary import build_payload, render_summary  # noqa: E402
+
+
+class ReadBackModel(ScriptedAgentModel):
+    """The model before read_summary: it generates the read-back itself at END."""
+
+    def _after_tool(self, ctx, name, args, output):
+        items = super()._after_tool(ctx, name, args, output)
+        if items and items[0].get("name") == "read_summary":
+            answers = get_session_store().load(ctx.session_id).answers
+            return [self._message(f"{render_summary(get_graph(), answers)} {CLOSING}")]
+        return items
+
+
+def final_turn(model, script, session_id, args):
+    sink = RecordingSpeechSink()
+    client = MockOpenAIClient(model=model, latency=args.latency, token_interval=args.token_interval)
+    driver = StreamingConversationDriver(client, "mock", sarah_instructions(), session_id=session_id, speech_sink=sink)
+    driver.start()
+    for utterance in script:
+        driver.turn(utterance)
+    return driver.stats.turns[-1], sink.turns[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="END turn latency: model read-back versus read_summary.")
+    parser.add_argument("--branch", default="hypertension", choices=["hypertension", "diabetes", "kidney_infection", "unmatched"])
+    parser.add_argument("--latency", type=float, default=0.3, help="Mock time to first token, seconds.")
+    parser.add_argument("--token-interval", type=float, default=0.02, help="Mock time per output token, seconds.")
+    args = parser.parse_args()
+
+    script = branch_scripts(get_graph())[args.branch]
+    print(f"{'END turn':<14} {'first audio ms':>14} {'turn ms':>8} {'output tokens':>13} {'chunks':>6}")
+    for label, model in (("model read", ReadBackModel()), ("read_summary", ScriptedAgentModel())):
+        session_id = f"summary-{label.replace(' ', '-')}-{args.branch}"
+        turn, chunks = final_turn(model, script, session_id, args)
+        print(f"{label:<14} {turn.first_audio_seconds * 1000:>14.0f} {turn.seconds * 1000:>8.0f} {turn.output_tokens:>13} {len(chunks):>6}")
+
+    answers = get_session_store().load(session_id).answers
+    print("\npayload:")
+    print(json.dumps(build_payload(get_graph(), session_id, answers), indent=2))
+
+
+if __name__ == "__main__":
+    main()
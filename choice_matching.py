@@ -0,0 +1,347 @@
+"""
+DESCRIPTION:
+    Phonetic and fuzzy matching of spoken answers to a node's choices.
+
+    Speech-to-text splits and misspells choice answers ("hyper tension",
+    "die a beetus"). Instead of sending each miss back to the model, every
+    choice set in the graph (choices, or meta.allowed_values) gets an index
+    built once at load time. Each choice is indexed under its own name and
+    its synonyms (SYNONYMS, plus meta.synonyms on the node) by:
+
+        compact key     lowercase letters and digits, spaces removed
+        phonetic key    Metaphone code of the compact key
+        n-grams         character trigrams of the compact key and bigrams of
+                        the phonetic key, in an inverted index
+
+    match() scores every run of words in the answer against the aliases that
+    share an n-gram with it and returns the choices ranked by score (0..1).
+    The best match is confident when it scores at least MATCH_THRESHOLD and
+    leads the runner-up by AMBIGUITY_MARGIN; only the other cases need the
+    model or the caller.
+
+    Naming a choice is not always choosing it. A negation ("I don't have
+    diabetes") or a family member ("my mother has diabetes") anywhere in the
+    answer hedges every choice whose own aliases do not contain that word, and
+    a hedged choice is never confident. A qualifier next to or inside the
+    matched words that names a different condition (CONTRADICTIONS: "low blood
+    pressure", "pre diabetes") blocks the match for that choice.
+
+    normalize_answer uses this for choice nodes, and the match_choice tool
+    exposes the ranking.
+
+USAGE:
+    index = choice_index(graph.get_question("Q25"))
+    index.match("I have die a beetus")
+    # -> ChoiceMatch(value="Diabetes", score=0.9, confident=True, ranked=[("Diabetes", 0.9), ...])
+"""
+
+import re
+from dataclasses import dataclass, field
+
+MATCH_THRESHOLD = 0.75
+AMBIGUITY_MARGIN = 0.1
+# Longest run of extra words around an alias that is still scored as one phrase.
+WINDOW_SLACK = 1
+# Aliases shorter than this ("m", "htn") only match when spoken exactly.
+MIN_FUZZY_LENGTH = 4
+# Score multipliers: a phonetic hit is weaker than a spelling hit, and a phrase
+# found inside a longer answer is weaker than the whole answer matching.
+PHONETIC_WEIGHT = 0.92
+PARTIAL_WEIGHT = 0.97
+
+# Canonical value (casefolded) -> spoken alternatives.
+SYNONYMS = {
+    "hypertension": ["high blood pressure", "high bp", "htn", "elevated blood pressure"],
+    "diabetes": ["diabetic", "high blood sugar", "type 2 diabetes", "type two diabetes", "type 1 diabetes", "type one diabetes"],
+    "kidney infection": ["kidney infections", "renal infection", "pyelonephritis", "kidney problem", "infected kidney"],
+    "male": ["man", "m", "boy", "guy"],
+    "female": ["woman", "f", "girl", "lady"],
+    "single": ["never married", "unmarried", "not married"],
+    "married": ["wed", "wedded", "husband", "wife"],
+    "divorced": ["divorce"],
+    "widowed": ["widow", "widower"],
+    "separated": ["separation", "legally separated"],
+}
+
+# Canonical value (casefolded) -> words that, next to or inside the matched
+# words, make the answer a different condition.
+CONTRADICTIONS = {
+    "hypertension": {"low", "pre", "prehypertension", "hypotension"},
+    "diabetes": {"pre", "prediabetes", "prediabetic", "borderline", "insipidus"},
+}
+
+# Words after which a named choice may not be the caller's own answer.
+NEGATION_CUES = {"no", "not", "dont", "doesnt", "didnt", "never", "without", "neither", "nor", "none"}
+THIRD_PARTY_CUES = {
+    "mother", "mom", "father", "dad", "parent", "parents", "family", "brother", "sister", "son", "daughter",
+    "grandmother", "grandfather", "grandma", "grandpa", "aunt", "uncle", "husband", "wife", "spouse",
+}
+HEDGE_CUES = NEGATION_CUES | THIRD_PARTY_CUES
+
+_VOWELS = set("aeiou")
+_FRONT_VOWELS = set("eiy")
+
+
+def metaphone(word):
+    """Metaphone code of ``word`` (letters only), after Lawrence Philips' original rules."""
+    w = re.sub(r"[^a-z]", "", word.casefold())
+    if not w:
+        return ""
+    for prefix in ("kn", "gn", "pn", "ae", "wr"):
+        if w.startswith(prefix):
+            w = w[1:]
+            break
+    if w.startswith("x"):
+        w = "s" + w[1:]
+    elif w.startswith("wh"):
+        w = "w" + w[2:]
+
+    code = []
+    n = len(w)
+    for i, c in enumerate(w):
+        prev = w[i - 1] if i else ""
+        nxt = w[i + 1] if i + 1 < n else ""
+        after = w[i + 2] if i + 2 < n else ""
+        if c == prev and c != "c":
+            continue
+        if c in _VOWELS:
+            if i == 0:
+                code.append(c.upper())
+        elif c == "b":
+            if not (prev == "m" and i == n - 1):
+                code.append("B")
+        elif c == "c":
+            if nxt == "i" and after == "a" or nxt == "h" and prev != "s":
+                code.append("X")
+            elif nxt in _FRONT_VOWELS:
+                if prev != "s":
+                    code.append("S")
+            else:
+                code.append("K")
+        elif c == "d":
+            code.append("J" if nxt == "g" and after in _FRONT_VOWELS else "T")
+        elif c == "g":
+            if nxt == "h" and after and after not in _VOWELS:
+                continue
+            if nxt == "n" and (i + 2 == n or w[i + 2 :] == "ed"):
+                continue
+            if prev == "d" and nxt in _FRONT_VOWELS:
+                continue
+            code.append("J" if nxt in _FRONT_VOWELS and prev != "g" else "K")
+        elif c == "h":
+            if prev in "csptg" or (prev in _VOWELS and nxt not in _VOWELS) or nxt not in _VOWELS:
+                continue
+            code.append("H")
+        elif c == "k":
+            if prev != "c":
+                code.append("K")
+        elif c == "p":
+            code.append("F" if nxt == "h" else "P")
+        elif c == "q":
+            code.append("K")
+        elif c == "s":
+            code.append("X" if nxt == "h" or (nxt == "i" and after in "ao") else "S")
+        elif c == "t":
+            if nxt == "i" and after in "ao":
+                code.append("X")
+            elif nxt == "h":
+                code.append("0")
+            elif not (nxt == "c" and after == "h"):
+                code.append("T")
+        elif c == "v":
+            code.append("F")
+        elif c in "wy":
+            if nxt in _VOWELS:
+                code.append(c.upper())
+        elif c == "x":
+            code.append("KS")
+        elif c == "z":
+            code.append("S")
+        else:
+            code.append(c.upper())
+    return "".join(code)
+
+
+def compact(text):
+    return re.sub(r"[^a-z0-9]", "", text.casefold())
+
+
+def _words(text):
+    # "don't" -> "dont", so negations stay one word.
+    return re.findall(r"[a-z0-9]+", re.sub(r"['\u2019]", "", text.casefold()))
+
+
+def _ngrams(text, size):
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+@dataclass(frozen=True)
+class _Key:
+    """Features of an alias or of a run of answer words."""
+
+    compact: str
+    phonetic: str
+    trigrams: frozenset
+    phonetic_bigrams: frozenset
+
+    @classmethod
+    def of(cls, text):
+        key = compact(text)
+        phonetic = metaphone(key)
+        return cls(key, phonetic, frozenset(_ngrams(key, 3)), frozenset(_ngrams(phonetic, 2)))
+
+
+@dataclass
+class ChoiceMatch:
+    value: str
+    score: float
+    confident: bool
+    ranked: list = field(default_factory=list)
+    # Ranked choices the answer may not be affirming (negated or about someone else).
+    hedged: frozenset = frozenset()
+
+    def to_dict(self, top=3):
+        return {
+            "value": self.value if self.confident else None,
+            "confident": self.confident,
+            "matches": [
+                {"value": value, "score": round(score, 3), **({"hedged": True} if value in self.hedged else {})}
+                for value, score in self.ranked[:top]
+            ],
+        }
+
+
+class ChoiceIndex:
+    """Compact, phonetic and n-gram index over one set of choices and their synonyms."""
+
+    def __init__(self, choices, synonyms=None):
+        self.choices = list(choices)
+        synonyms = {k.casefold(): v for k, v in (synonyms or {}).items()}
+        self._exact = {}
+        self._aliases = []  # (choice, _Key, words) of the aliases long enough to match fuzzily
+        self._alias_words = {}
+        self._contradictions = {}
+        longest = 1
+        for choice in self.choices:
+            names = [choice, *SYNONYMS.get(choice.casefold(), ()), *synonyms.get(choice.casefold(), ())]
+            self._alias_words[choice] = {word for name in names for word in _words(name)}
+            self._contradictions[choice] = CONTRADICTIONS.get(choice.casefold(), set()) - self._alias_words[choice]
+            for name in dict.fromkeys(names):
+                key = _Key.of(name)
+                self._exact.setdefault(key.compact, choice)
+                if len(key.compact) >= MIN_FUZZY_LENGTH:
+                    self._aliases.append((choice, key, frozenset(_words(name))))
+                    longest = max(longest, len(_words(name)))
+        self._longest = longest + WINDOW_SLACK
+        self._phonetic = {}
+        self._trigrams = {}
+        self._bigrams = {}
+        for position, (_, key, _) in enumerate(self._aliases):
+            self._phonetic.setdefault(key.phonetic, []).append(position)
+            for gram in key.trigrams:
+                self._trigrams.setdefault(gram, []).append(position)
+            for gram in key.phonetic_bigrams:
+                self._bigrams.setdefault(gram, []).append(position)
+
+    def _window_scores(self, window):
+        """{alias position: score} for the aliases sharing a trigram or phonetic bigram with ``window``."""
+        shared_trigrams = {}
+        for gram in window.trigrams:
+            for position in self._trigrams.get(gram, ()):
+                shared_trigrams[position] = shared_trigrams.get(position, 0) + 1
+        shared_bigrams = {}
+        for gram in window.phonetic_bigrams:
+            for position in self._bigrams.get(gram, ()):
+                shared_bigrams[position] = shared_bigrams.get(position, 0) + 1
+        scores = {}
+        for position in shared_trigrams.keys() | shared_bigrams.keys():
+            alias = self._aliases[position][1]
+            spelling = 2 * shared_trigrams.get(position, 0) / (len(window.trigrams) + len(alias.trigrams))
+            sound = 2 * shared_bigrams.get(position, 0) / (len(window.phonetic_bigrams) + len(alias.phonetic_bigrams))
+            scores[position] = max(spelling, PHONETIC_WEIGHT * sound)
+        for position in self._phonetic.get(window.phonetic, ()):
+            scores[position] = max(scores.get(position, 0.0), PHONETIC_WEIGHT)
+        return scores
+
+    def match(self, text):
+        """Choices ranked by how well some run of words in ``text`` matches one of their aliases."""
+        words = _words(text)
+        whole = "".join(words)
+        if whole in self._exact:
+            choice = self._exact[whole]
+            return ChoiceMatch(choice, 1.0, True, [(choice, 1.0)])
+
+        best = {}
+        for start in range(len(words)):
+            for end in range(start + 1, min(len(words), start + self._longest) + 1):
+                # The matched words plus one on each side, for contradicting qualifiers.
+                nearby = set(words[max(start - 1, 0) : end + 1])
+                joined = "".join(words[start:end])
+                if end - start == len(words):
+                    weight = 1.0
+                elif joined in self._exact:
+                    # A choice named inside a longer answer ("I have diabetes").
+                    choice = self._exact[joined]
+                    if not nearby & self._contradictions[choice]:
+                        best[choice] = max(best.get(choice, 0.0), PARTIAL_WEIGHT)
+                    continue
+                else:
+                    weight = PARTIAL_WEIGHT
+                if len(joined) < MIN_FUZZY_LENGTH:
+                    continue
+                window = set(words[start:end])
+                for position, score in self._window_scores(_Key.of(joined)).items():
+                    choice, _, alias_words = self._aliases[position]
+                    if window < alias_words:
+                        # The qualifier was left out: "blood pressure" is not "high blood pressure".
+                        continue
+                    if score * weight > best.get(choice, 0.0) and not nearby & self._contradictions[choice]:
+                        best[choice] = score * weight
+
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return ChoiceMatch(None, 0.0, False, [])
+        cues = set(words) & HEDGE_CUES
+        hedged = frozenset(choice for choice, _ in ranked if cues - self._alias_words[choice])
+        value, score = ranked[0]
+        # A hedged runner-up ("married" inside "not married") does not make the answer ambiguous.
+        others = [s for choice, s in ranked[1:] if choice not in hedged]
+        runner_up = others[0] if others else 0.0
+        confident = value not in hedged and score >= MATCH_THRESHOLD and score - runner_up >= AMBIGUITY_MARGIN
+        return ChoiceMatch(value, score, confident, ranked, hedged)
+
+
+def node_choices(node):
+    return node.get("choices") or (node.get("meta") or {}).get("allowed_values") or []
+
+
+# Node id (or, for a node without one, its choice set) -> (choice set, ChoiceIndex).
+_indexes = {}
+
+
+def choice_index(node, node_id=None):
+    """The shared ChoiceIndex for ``node``'s choice set, built on first use.
+
+    Indexes are kept per node for the life of the process; one is rebuilt only
+    when the node's choices or synonyms change.
+    """
+    synonyms = (node.get("meta") or {}).get("synonyms") or {}
+    signature = (tuple(node_choices(node)), tuple((value, tuple(names)) for value, names in sorted(synonyms.items())))
+    key = node_id or node.get("id") or signature
+    entry = _indexes.get(key)
+    if entry is None or entry[0] != signature:
+        entry = (signature, ChoiceIndex(signature[0], synonyms))
+        _indexes[key] = entry
+    return entry[1]
+
+
+def build_choice_indexes(graph):
+    """Build the index of every choice set in ``graph``; returns how many nodes have one."""
+    count = 0
+    for node_id, node in graph.nodes.items():
+        if node_choices(node):
+            choice_index(node, node_id)
+            count += 1
+    return count
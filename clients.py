@@ -0,0 +1,402 @@
+"""
+DESCRIPTION:
+    Shared Azure credential, HTTP transports and clients for every script and
+    worker in the process.
+
+    Building DefaultAzureCredential, AIProjectClient and an OpenAI client in
+    each script's with-block meant every process start imported both SDKs,
+    walked the whole credential chain for a token and opened fresh TLS
+    connections. Here:
+
+        CachedTokenCredential   serves access tokens from a TokenCache (an
+                                owner-only JSON file, TOKEN_CACHE_FILE, default
+                                .token_cache.json next to this module; "none"
+                                keeps tokens in memory only) and builds
+                                DefaultAzureCredential only when no cached
+                                token is still valid for
+                                TOKEN_REFRESH_SECONDS. Entries are kept per
+                                identity: credential type, OS user, the
+                                AZURE_* identity variables and the Azure CLI's
+                                signed-in account
+        get_openai_client()     OpenAI client on {endpoint}/openai/v1 with the
+                                cached token, as AIProjectClient.get_openai_client
+                                builds it but without importing azure.ai.projects
+        get_project_client()    AIProjectClient on the same credential
+        async_clients()         the asyncio versions, plus one aiohttp session
+
+    The Azure SDK and openai packages are imported on first use. Clients are
+    created once per endpoint and shared; the project clients share one pooled
+    requests session, the OpenAI clients one pooled httpx client (through
+    openai.DefaultHttpxClient). close_clients() runs at exit.
+
+USAGE:
+    from clients import get_openai_client, get_project_client
+
+    openai_client = get_openai_client()
+    openai_client.responses.create(...)
+    get_project_client().agents.create_version(...)
+
+    async with async_clients() as (project_client, openai_client, http_session):
+        ...
+"""
+
+import atexit
+import contextlib
+import getpass
+import hashlib
+import json
+import os
+import threading
+import time
+
+PROJECT_SCOPE = "https://ai.azure.com/.default"
+DEFAULT_TOKEN_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".token_cache.json")
+# A cached token is reused only while it has at least this long to live.
+TOKEN_REFRESH_SECONDS = 300
+# Connections kept open per host by the shared requests session.
+POOL_SIZE = 32
+
+_lock = threading.Lock()
+_credential = None
+_session = None
+_http_client = None
+_project_clients = {}
+_openai_clients = {}
+
+
+class TokenCache:
+    """Access tokens by key, in memory and (with a path) in a JSON file only the owner can read."""
+
+    def __init__(self, path=None, refresh_seconds=TOKEN_REFRESH_SECONDS):
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self._tokens = None
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(token, expires_on) for ``key`` if it is still valid long enough, else None."""
+        with self._lock:
+            entry = self._load().get(key)
+        if entry is None or entry["expires_on"] - time.time() < self.refresh_seconds:
+            return None
+        return entry["token"], entry["expires_on"]
+
+    def put(self, key, token, expires_on):
+        with self._lock:
+            tokens = self._load()
+            now = time.time()
+            for stale in [k for k, e in tokens.items() if e["expires_on"] <= now]:
+                del tokens[stale]
+            tokens[key] = {"token": token, "expires_on": int(expires_on)}
+            if self.path:
+                self._save(tokens)
+
+    def _load(self):
+        if self._tokens is None:
+            self._tokens = {}
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path, encoding="utf-8") as f:
+                        self._tokens = json.load(f)
+                except (OSError, ValueError):
+                    # A damaged cache only costs one trip through the credential chain.
+                    self._tokens = {}
+        return self._tokens
+
+    def _save(self, tokens):
+        tmp_path = self.path + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(tokens, f)
+        os.replace(tmp_path, self.path)
+
+
+def open_token_cache(path=None):
+    """Token cache at ``path`` or TOKEN_CACHE_FILE; "none" caches in memory only."""
+    path = path or os.environ.get("TOKEN_CACHE_FILE") or DEFAULT_TOKEN_CACHE_FILE
+    return TokenCache(None if path.lower() == "none" else path)
+
+
+def _azure_cli_account():
+    """user@tenant of the Azure CLI's default subscription, or "" without a CLI profile."""
+    config_dir = os.environ.get("AZURE_CONFIG_DIR") or os.path.join(os.path.expanduser("~"), ".azure")
+    try:
+        # The CLI writes this file with a byte order mark.
+        with open(os.path.join(config_dir, "azureProfile.json"), encoding="utf-8-sig") as f:
+            subscriptions = json.load(f).get("subscriptions") or []
+    except (OSError, ValueError, AttributeError):
+        return ""
+    default = next((sub for sub in subscriptions if sub.get("isDefault")), {})
+    return f"{(default.get('user') or {}).get('name', '')}@{default.get('tenantId', '')}"
+
+
+def credential_identity(credential_type):
+    """Who a credential of ``credential_type`` signs in as, as far as the environment tells without calling it."""
+    try:
+        user = getpass.getuser()
+    except (KeyError, OSError):
+        user = ""
+    env = [os.environ.get(name, "") for name in ("AZURE_TENANT_ID", "AZURE_CLIENT_ID", "AZURE_USERNAME")]
+    return "\n".join([credential_type, user, *env, _azure_cli_account()])
+
+
+def token_cache_key(scopes, tenant_id, identity):
+    # Separate entries per identity, so switching service principals or
+    # signed-in accounts never serves another identity's token.
+    return hashlib.sha256("\n".join([tenant_id or "", identity, *sorted(scopes)]).encode("utf-8")).hexdigest()
+
+
+def _credential_type(factory):
+    # The sync and async DefaultAzureCredential share a name, so both read the same cache entries.
+    if factory is None:
+        return "DefaultAzureCredential"
+    return getattr(factory, "__name__", None) or type(factory).__name__
+
+
+def _access_token(token, expires_on):
+    from azure.core.credentials import AccessToken
+
+    return AccessToken(token, expires_on)
+
+
+class CachedTokenCredential:
+    """TokenCredential that builds the real credential only when the cache has no valid token.
+
+    ``credential_factory`` defaults to azure.identity.DefaultAzureCredential.
+    Requests with ``claims`` (a conditional access challenge) always go to the
+    real credential.
+    """
+
+    def __init__(self, cache=None, credential_factory=None):
+        self.cache = cache if cache is not None else open_token_cache()
+        self._factory = credential_factory
+        self._credential = None
+        self._identity = None
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes, claims=None, tenant_id=None, **kwargs):
+        key = token_cache_key(scopes, tenant_id, self.identity)
+        if not claims:
+            cached = self.cache.get(key)
+            if cached:
+                return _access_token(*cached)
+        with self._lock:
+            cached = None if claims else self.cache.get(key)
+            if cached:
+                return _access_token(*cached)
+            token = self._inner().get_token(*scopes, claims=claims, tenant_id=tenant_id, **kwargs)
+        self.cache.put(key, token.token, token.expires_on)
+        return token
+
+    def bearer_token_provider(self, scope=PROJECT_SCOPE):
+        """Callable returning a bearer token, for the OpenAI client's api_key."""
+        return lambda: self.get_token(scope).token
+
+    @property
+    def identity(self):
+        if self._identity is None:
+            self._identity = credential_identity(_credential_type(self._factory))
+        return self._identity
+
+    def _inner(self):
+        if self._credential is None:
+            if self._factory is None:
+                from azure.identity import DefaultAzureCredential
+
+                self._factory = DefaultAzureCredential
+            self._credential = self._factory()
+        return self._credential
+
+    def close(self):
+        if self._credential is not None:
+            self._credential.close()
+            self._credential = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncCachedTokenCredential:
+    """AsyncTokenCredential counterpart of CachedTokenCredential (azure.identity.aio by default)."""
+
+    def __init__(self, cache=None, credential_factory=None):
+        import asyncio
+
+        self.cache = cache if cache is not None else open_token_cache()
+        self._factory = credential_factory
+        self._credential = None
+        self._identity = None
+        self._lock = asyncio.Lock()
+
+    async def get_token(self, *scopes, claims=None, tenant_id=None, **kwargs):
+        key = token_cache_key(scopes, tenant_id, self.identity)
+        if not claims:
+            cached = self.cache.get(key)
+            if cached:
+                return _access_token(*cached)
+        async with self._lock:
+            cached = None if claims else self.cache.get(key)
+            if cached:
+                return _access_token(*cached)
+            token = await self._inner().get_token(*scopes, claims=claims, tenant_id=tenant_id, **kwargs)
+        self.cache.put(key, token.token, token.expires_on)
+        return token
+
+    def bearer_token_provider(self, scope=PROJECT_SCOPE):
+        """Async callable returning a bearer token, for the AsyncOpenAI client's api_key."""
+
+        async def provider():
+            return (await self.get_token(scope)).token
+
+        return provider
+
+    @property
+    def identity(self):
+        if self._identity is None:
+            self._identity = credential_identity(_credential_type(self._factory))
+        return self._identity
+
+    def _inner(self):
+        if self._credential is None:
+            if self._factory is None:
+                from azure.identity.aio import DefaultAzureCredential
+
+                self._factory = DefaultAzureCredential
+            self._credential = self._factory()
+        return self._credential
+
+    async def close(self):
+        if self._credential is not None:
+            await self._credential.close()
+            self._credential = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+# Shared, process-wide objects
+
+
+def _endpoint(endpoint):
+    return (endpoint or os.environ["AZURE_AI_PROJECT_ENDPOINT"]).rstrip("/")
+
+
+def get_credential():
+    global _credential
+    with _lock:
+        if _credential is None:
+            _credential = CachedTokenCredential()
+        return _credential
+
+
+def http_transport():
+    """azure-core transport over the shared requests session; closing it leaves the session open."""
+    global _session
+    from azure.core.pipeline.transport import RequestsTransport
+
+    with _lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+    return RequestsTransport(session=_session, session_owner=False)
+
+
+def http_client():
+    """The httpx client every OpenAI client in the process shares."""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            from openai import DefaultHttpxClient
+
+            _http_client = DefaultHttpxClient()
+        return _http_client
+
+
+def get_project_client(endpoint=None):
+    endpoint = _endpoint(endpoint)
+    client = _project_clients.get(endpoint)
+    if client is None:
+        from azure.ai.projects import AIProjectClient
+
+        client = AIProjectClient(endpoint=endpoint, credential=get_credential(), transport=http_transport())
+        client = _project_clients.setdefault(endpoint, client)
+    return client
+
+
+def get_openai_client(endpoint=None):
+    endpoint = _endpoint(endpoint)
+    client = _openai_clients.get(endpoint)
+    if client is None:
+        from openai import OpenAI
+
+        client = OpenAI(
+            base_url=f"{endpoint}/openai/v1",
+            api_key=get_credential().bearer_token_provider(),
+            http_client=http_client(),
+        )
+        client = _openai_clients.setdefault(endpoint, client)
+    return client
+
+
+def close_clients():
+    """Close every shared client, the pooled connections and the credential."""
+    global _credential, _session, _http_client
+    with _lock:
+        project_clients = list(_project_clients.values())
+        _project_clients.clear()
+        _openai_clients.clear()
+        http, session, credential = _http_client, _session, _credential
+        _http_client = _session = _credential = None
+    for client in project_clients:
+        client.close()
+    # The OpenAI clients hold nothing beyond the shared httpx client.
+    if http is not None:
+        http.close()
+    if session is not None:
+        session.close()
+    if credential is not None:
+        credential.close()
+
+
+atexit.register(close_clients)
+
+
+@contextlib.asynccontextmanager
+async def async_clients(endpoint=None):
+    """(project_client, openai_client, http_session) for one event loop.
+
+    The project client and any other aiohttp traffic (such as MCP checks) share
+    one connection pool; the token cache is the same one the sync clients use.
+    """
+    import aiohttp
+    from azure.ai.projects.aio import AIProjectClient
+    from azure.core.pipeline.transport import AioHttpTransport
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    endpoint = _endpoint(endpoint)
+    async with (
+        AsyncCachedTokenCredential(cache=get_credential().cache) as credential,
+        aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit_per_host=POOL_SIZE)) as http_session,
+        AIProjectClient(
+            endpoint=endpoint,
+            credential=credential,
+            transport=AioHttpTransport(session=http_session, session_owner=False),
+        ) as project_client,
+        AsyncOpenAI(
+            base_url=f"{endpoint}/openai/v1",
+            api_key=credential.bearer_token_provider(),
+            http_client=DefaultAsyncHttpxClient(),
+        ) as openai_client,
+    ):
+        yield project_client, openai_client, http_session
@@ -0,0 +1,440 @@
+"""
+DESCRIPTION:
+    Conversation driver for the voice agent on the Responses API.
+
+    The driver sends the agent's instructions and tools with every request,
+    runs the local function tools the model calls, and keeps the input history.
+    In compaction mode, every confirmed answer (a save_session call that
+    succeeded) replaces the history with one compact state message: answers so
+    far, current node and counters. The instructions and tool list are never touched, so the
+    provider's prompt cache keeps hitting on the static prefix and input
+    tokens per turn stay flat across the interview.
+
+USAGE:
+    driver = ConversationDriver(openai_client, model, sarah_instructions(), session_id="call-123")
+    print(driver.start())
+    while not driver.finished:
+        print(driver.turn(input("> ")))
+
+    AsyncConversationDriver has the same interface with awaitable start()/turn().
+
+    StreamingConversationDriver streams each response and speaks it clause by
+    clause as it is generated:
+        driver = StreamingConversationDriver(openai_client, model, sarah_instructions(),
+                                             session_id="call-123", speech_sink=PrintSpeechSink())
+
+    Pass tracer=Tracer(exporter) to record a span per turn, model call and
+    tool call (see tracing.py).
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+
+from agent_tools import call_tool, get_graph, get_session_store, response_tools
+from speech import NullSpeechSink, SentenceChunker
+from tracing import Tracer, new_trace_id
+
+STATE_MESSAGE_HEADER = "SESSION STATE (answers confirmed so far; continue from current_node)"
+
+# Guards against a model that keeps calling tools without ever answering.
+MAX_TOOL_ROUNDS = 8
+
+HOSTED_TOOL_ITEMS = ("file_search_call", "mcp_call", "web_search_call", "code_interpreter_call")
+
+# Tool whose text the driver speaks itself instead of having the model read it out.
+SUMMARY_TOOL = "read_summary"
+
+
+@dataclass
+class TurnStats:
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    model_calls: int = 0
+    tool_calls: int = 0
+    seconds: float = 0.0
+    history_items: int = 0
+    # Streaming only: seconds from the caller's utterance to the first text delta / first chunk spoken.
+    first_token_seconds: float = None
+    first_audio_seconds: float = None
+
+
+@dataclass
+class ConversationStats:
+    turns: list = field(default_factory=list)
+
+    @property
+    def input_tokens(self):
+        return sum(t.input_tokens for t in self.turns)
+
+    @property
+    def output_tokens(self):
+        return sum(t.output_tokens for t in self.turns)
+
+    @property
+    def tool_calls(self):
+        return sum(t.tool_calls for t in self.turns)
+
+
+def _usage(response):
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0, 0, 0
+    details = getattr(usage, "input_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) if details is not None else 0
+    return usage.input_tokens, cached or 0, usage.output_tokens
+
+
+def _output_text(response):
+    text = getattr(response, "output_text", None)
+    if text is not None:
+        return text
+    parts = []
+    for item in response.output:
+        if item.type == "message":
+            parts.extend(c.text for c in item.content if getattr(c, "type", "") == "output_text")
+    return "".join(parts)
+
+
+def _trace_response(span, response):
+    input_tokens, cached_tokens, output_tokens = _usage(response)
+    hosted = [item.type for item in response.output if item.type in HOSTED_TOOL_ITEMS]
+    span.set(input_tokens=input_tokens, cached_tokens=cached_tokens, output_tokens=output_tokens, server_tools=hosted or None)
+
+
+def _saved_session(output):
+    """The save_session result if the save went through, else None (an error or unparsable output)."""
+    try:
+        result = json.loads(output)
+    except (TypeError, json.JSONDecodeError):
+        return None
+    return result if isinstance(result, dict) and result.get("saved") is True else None
+
+
+def _node_argument(arguments):
+    try:
+        arguments = json.loads(arguments) if isinstance(arguments, str) else arguments or {}
+    except json.JSONDecodeError:
+        return None
+    return arguments.get("questionId") or arguments.get("currentNode")
+
+
+class ConversationDriver:
+    """One caller's conversation with the agent."""
+
+    def __init__(
+        self,
+        openai_client,
+        model,
+        instructions,
+        session_id,
+        tools=None,
+        compact=True,
+        extra_tools=(),
+        router=None,
+        tracer=None,
+        **request_options,
+    ):
+        self.client = openai_client
+        self.model = model
+        self.router = router
+        self.tracer = tracer or Tracer()
+        self.trace_id = new_trace_id()
+        self._turn_span = None
+        self.instructions = instructions
+        self.session_id = session_id
+        self.tools = [*(tools if tools is not None else response_tools()), *extra_tools]
+        self.compact = compact
+        self.request_options = request_options
+        self.history = []
+        self.stats = ConversationStats()
+        self.finished = False
+
+    def start(self):
+        """Open the conversation; returns the greeting and first question."""
+        return self.turn(f"session_id: {self.session_id}")
+
+    def turn(self, user_text):
+        """Send one caller utterance and return the agent's spoken reply."""
+        steps = self._turn_steps(user_text)
+        step = next(steps)
+        while True:
+            try:
+                result = self._run_step(*step)
+            except Exception as e:
+                # Fails the turn span; the generator re-raises.
+                steps.throw(e)
+            try:
+                step = steps.send(result)
+            except StopIteration as stop:
+                return stop.value
+
+    def _run_step(self, kind, *args):
+        if kind == "model":
+            return self._create(*args)
+        if kind == "session":
+            return get_session_store().load(self.session_id)
+        return self.run_tool(*args)
+
+    def _turn_steps(self, user_text):
+        """One turn as a generator that yields ("model", input), ("tool", name, arguments)
+        and ("session",) steps and receives their results (the last one the saved session).
+
+        Keeps the turn logic shared between the sync and async drivers; the async
+        driver runs the blocking steps (tools, session store reads) in worker threads.
+        """
+        stats = TurnStats()
+        started = time.perf_counter()
+        state = (yield ("session",)) if self.tracer.enabled else None
+        node_id = state.current_node if state else None
+        with self.tracer.span("turn", trace_id=self.trace_id, session_id=self.session_id, node_id=node_id) as span:
+            self._turn_span = span
+            # A failed turn leaves the history as it was, so a retry does not repeat the utterance.
+            rollback = len(self.history)
+            self.history.append({"role": "user", "content": user_text})
+            confirmed = False
+            reply = ""
+            spoken = []
+            for _ in range(MAX_TOOL_ROUNDS):
+                try:
+                    response = yield ("model", self.history)
+                except Exception:
+                    del self.history[rollback:]
+                    raise
+                input_tokens, cached_tokens, output_tokens = _usage(response)
+                stats.input_tokens += input_tokens
+                stats.cached_tokens += cached_tokens
+                stats.output_tokens += output_tokens
+                stats.model_calls += 1
+
+                calls = [item for item in response.output if item.type == "function_call"]
+                reply = _output_text(response)
+                if reply:
+                    self.history.append({"role": "assistant", "content": reply})
+                if not calls:
+                    break
+                for item in calls:
+                    output = yield ("tool", item.name, item.arguments)
+                    stats.tool_calls += 1
+                    if item.name == SUMMARY_TOOL:
+                        output = self._speak_summary(output, spoken)
+                    self.history.append({"type": "function_call", "call_id": item.call_id, "name": item.name, "arguments": item.arguments})
+                    self.history.append({"type": "function_call_output", "call_id": item.call_id, "output": output})
+                    if item.name == "save_session":
+                        saved = _saved_session(output)
+                        if saved is not None:
+                            confirmed = True
+                            self.finished = self.finished or bool(saved.get("completed"))
+            if confirmed and self.compact:
+                self.compact_history(reply, (yield ("session",)))
+            if spoken:
+                reply = " ".join([*spoken, reply]).strip()
+            stats.seconds = time.perf_counter() - started
+            stats.history_items = len(self.history)
+            self.stats.turns.append(stats)
+            if self.tracer.enabled:
+                state = yield ("session",)
+                span.set(
+                    retries=state.retries if state else 0,
+                    model_calls=stats.model_calls,
+                    tool_calls=stats.tool_calls,
+                    input_tokens=stats.input_tokens,
+                    cached_tokens=stats.cached_tokens,
+                    output_tokens=stats.output_tokens,
+                    finished=self.finished,
+                )
+        return reply
+
+    def _speak_summary(self, output, spoken):
+        """Take the summary chunks out of a read_summary result; the model gets only the payload."""
+        result = json.loads(output)
+        if "chunks" not in result:
+            return output
+        for chunk in result["chunks"]:
+            self._speak_text(chunk)
+            spoken.append(chunk)
+        return json.dumps({"spoken": True, "payload": result["payload"]})
+
+    def _speak_text(self, chunk):
+        """Drivers that return their reply as text speak tool text with it, at the end of the turn."""
+
+    def _create(self, input_items):
+        if self.router is None:
+            return self._traced_request(self.model, input_items)
+        route = self.router.route(self.session_id, input_items)
+        started = time.perf_counter()
+        response = self._traced_request(route.model, input_items, route=route.key, attempt=1)
+        self.router.record(route, response, time.perf_counter() - started)
+        if self.router.check(route, response) is not None:
+            route = self.router.main_route(route)
+            started = time.perf_counter()
+            response = self._traced_request(route.model, input_items, route=route.key, attempt=2)
+            self.router.record(route, response, time.perf_counter() - started)
+        return response
+
+    def _traced_request(self, model, input_items, **attributes):
+        with self.tracer.span("model", parent=self._turn_span, model=model, **attributes) as span:
+            response = self._request(model, input_items)
+            _trace_response(span, response)
+        return response
+
+    def _request(self, model, input_items):
+        return self.client.responses.create(
+            model=model,
+            instructions=self.instructions,
+            tools=self.tools,
+            input=input_items,
+            **self.request_options,
+        )
+
+    def run_tool(self, name, arguments):
+        if not self.tracer.enabled:
+            return call_tool(name, arguments)
+        with self.tracer.span("tool", parent=self._turn_span, tool=name, node_id=_node_argument(arguments)) as span:
+            output = call_tool(name, arguments)
+            error = json.loads(output).get("error") if output.startswith('{"error"') else None
+            if error:
+                span.set(error=error)
+        return output
+
+    def state_message(self, state=None):
+        """Compact stand-in for the transcript, built from the saved session (loaded if not given)."""
+        state = state or get_session_store().load(self.session_id)
+        if state is None:
+            return None
+        # The node being asked goes along so the model still knows its type and choices.
+        node = get_graph().nodes.get(state.current_node)
+        body = {
+            "session_id": state.session_id,
+            "current_node": state.current_node,
+            "current_question": {"id": state.current_node, **node} if node else None,
+            "answers": state.answers,
+            "retries": state.retries,
+            "silences": state.silences,
+            "greeting_spoken": True,
+        }
+        return {"role": "developer", "content": f"{STATE_MESSAGE_HEADER}\n{json.dumps(body, separators=(',', ':'))}"}
+
+    def compact_history(self, last_reply, state=None):
+        """Replace the history with the state message plus the question just asked."""
+        message = self.state_message(state)
+        if message is None:
+            return
+        self.history = [message]
+        if last_reply:
+            self.history.append({"role": "assistant", "content": last_reply})
+
+
+class AsyncConversationDriver(ConversationDriver):
+    """Same conversation on an AsyncOpenAI client, for many concurrent callers in one process.
+
+    Tools and session store reads run in worker threads: they may block on the store or the answer sink.
+    """
+
+    async def start(self):
+        return await self.turn(f"session_id: {self.session_id}")
+
+    async def _run_step(self, kind, *args):
+        if kind == "model":
+            return await self._create(*args)
+        if kind == "session":
+            return await asyncio.to_thread(get_session_store().load, self.session_id)
+        return await asyncio.to_thread(self.run_tool, *args)
+
+    async def _create(self, input_items):
+        if self.router is None:
+            return await self._traced_request(self.model, input_items)
+        route = await self.router.route_async(self.session_id, input_items)
+        started = time.perf_counter()
+        response = await self._traced_request(route.model, input_items, route=route.key, attempt=1)
+        self.router.record(route, response, time.perf_counter() - started)
+        if self.router.check(route, response) is not None:
+            route = self.router.main_route(route)
+            started = time.perf_counter()
+            response = await self._traced_request(route.model, input_items, route=route.key, attempt=2)
+            self.router.record(route, response, time.perf_counter() - started)
+        return response
+
+    async def _traced_request(self, model, input_items, **attributes):
+        with self.tracer.span("model", parent=self._turn_span, model=model, **attributes) as span:
+            response = await self._request(model, input_items)
+            _trace_response(span, response)
+        return response
+
+    async def turn(self, user_text):
+        steps = self._turn_steps(user_text)
+        step = next(steps)
+        while True:
+            try:
+                result = await self._run_step(*step)
+            except Exception as e:
+                steps.throw(e)
+            try:
+                step = steps.send(result)
+            except StopIteration as stop:
+                return stop.value
+
+
+class StreamingConversationDriver(ConversationDriver):
+    """Streams every response and hands text to ``speech_sink`` at sentence and clause boundaries.
+
+    Records per turn the time to the first text delta and the time until the
+    first chunk has been given to the sink (for a TTS sink: first audio ready).
+    With a router, text of a fast response that is then rejected has already
+    been spoken; route only tool-calling phases to the fast model if that matters.
+    """
+
+    def __init__(self, *args, speech_sink=None, chunker_factory=SentenceChunker, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.speech_sink = speech_sink or NullSpeechSink()
+        self.chunker_factory = chunker_factory
+        self._turn_started = None
+        self._first_token = None
+        self._first_audio = None
+
+    def turn(self, user_text):
+        self._turn_started = time.perf_counter()
+        self._first_token = self._first_audio = None
+        reply = super().turn(user_text)
+        stats = self.stats.turns[-1]
+        stats.first_token_seconds = self._first_token
+        stats.first_audio_seconds = self._first_audio
+        self.speech_sink.end_turn()
+        return reply
+
+    def _request(self, model, input_items):
+        stream = self.client.responses.create(
+            model=model,
+            instructions=self.instructions,
+            tools=self.tools,
+            input=input_items,
+            stream=True,
+            **self.request_options,
+        )
+        chunker = self.chunker_factory()
+        response = None
+        for event in stream:
+            if event.type == "response.output_text.delta":
+                if self._first_token is None:
+                    self._first_token = time.perf_counter() - self._turn_started
+                for chunk in chunker.feed(event.delta):
+                    self._speak(chunk)
+            elif event.type == "response.completed":
+                response = event.response
+            elif event.type in ("response.failed", "response.incomplete", "error"):
+                raise RuntimeError(f"Streaming response ended with {event.type}: {getattr(event, 'response', event)}")
+        for chunk in chunker.flush():
+            self._speak(chunk)
+        if response is None:
+            raise RuntimeError("Stream ended without response.completed")
+        return response
+
+    def _speak_text(self, chunk):
+        self._speak(chunk)
+
+    def _speak(self, chunk):
+        self.speech_sink.speak(chunk)
+        if self._first_audio is None:
+            self._first_audio = time.perf_counter() - self._turn_started
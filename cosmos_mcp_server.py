@@ -0,0 +1,517 @@
+"""
+DESCRIPTION:
+    Reference MCP server for the /cosmos/ save endpoint.
+
+    A local, profilable stand-in for the hosted Cosmos MCP server. It speaks
+    MCP's streamable HTTP transport with JSON responses (initialize,
+    tools/list, tools/call) and implements two tools:
+
+        save_answers  Bulk upsert of question-answer pairs keyed by question
+                      id, the per-section batches written by
+                      answer_persistence ({id, sessionId, section,
+                      idempotencyKey, answers:[...]}). The read_summary
+                      payload the agent submits at END ({sessionId,
+                      sections: {section: {field: value}}}) is keyed by field
+                      name instead, so it is kept whole as the session's
+                      submission document rather than mixed into the answers.
+        get_answers   The stored answers and submission of one session.
+
+    Each batch is upserted in one transaction. A batch whose idempotency key
+    was already stored is acknowledged without writing again.
+
+    Storage is chosen by --store or COSMOS_STORE:
+        sqlite:///path/to/answers.db  (default: .answers.db next to this file)
+        file:///path/to/answers.jsonl  append-only log, replayed at startup
+        memory://
+    The SQLite backend keeps a small pool of connections served by a
+    dedicated thread pool of the same size (any of its threads may run any
+    connection, one at a time), so the event loop never waits on disk and a
+    busy default executor (for example, tools calling back into this server
+    from the same process) never starves the writes.
+
+    GET /metrics returns count/mean/p50/p95/p99/max in milliseconds per
+    JSON-RPC method, per tool and per storage operation.
+
+USAGE:
+    python cosmos_mcp_server.py --port 8765 --store sqlite:///answers.db --pool-size 4
+
+    # A worker writes answers per section when ANSWER_SINK names this server, as the load test's --persist does:
+    python -m benchmarks.load_test --callers 50 --persist --mcp-url http://127.0.0.1:8765/cosmos/
+"""
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from metrics import summarize
+
+DEFAULT_ANSWERS_DB = os.path.abspath(os.path.join(os.path.dirname(__file__), ".answers.db"))
+DEFAULT_POOL_SIZE = 4
+MCP_PATH = "/cosmos/"
+PROTOCOL_VERSION = "2025-03-26"
+
+# Timing samples kept per metric; older ones are dropped.
+METRIC_WINDOW = 10000
+
+TOOLS = [
+    {
+        "name": "save_answers",
+        "description": "Upsert question-answer pairs for one interview session in a single batch.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "sessionId": {"type": "string"},
+                "section": {"type": "string"},
+                "idempotencyKey": {"type": "string"},
+                "answers": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"questionId": {"type": "string"}, "value": {"type": "string"}},
+                        "required": ["questionId", "value"],
+                    },
+                },
+            },
+            "additionalProperties": True,
+        },
+    },
+    {
+        "name": "get_answers",
+        "description": "Return the stored answers and END submission of one session.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"sessionId": {"type": "string"}},
+            "required": ["sessionId"],
+        },
+    },
+]
+
+
+class ToolError(ValueError):
+    """A tools/call that the caller got wrong; reported as an MCP tool error."""
+
+
+class InvalidParamsError(ValueError):
+    """Malformed tools/call arguments; reported as a JSON-RPC Invalid params error."""
+
+
+def _session_id(arguments):
+    session_id = arguments.get("sessionId") or arguments.get("session_id")
+    batch_id = arguments.get("id", "")
+    for name, value in (("sessionId", session_id), ("id", batch_id)):
+        if value is not None and not isinstance(value, str):
+            raise InvalidParamsError(f"{name} must be a string, not {type(value).__name__}")
+    return session_id or batch_id.split(":")[0] or "anonymous"
+
+
+def answer_rows(arguments):
+    """(session_id, section, idempotency_key, [(question_id, value), ...]) from a save_answers batch."""
+    answers = arguments["answers"]
+    if isinstance(answers, dict):
+        pairs = list(answers.items())
+    else:
+        pairs = [(item["questionId"], item["value"]) for item in answers]
+    rows = [(str(k), v if isinstance(v, str) else json.dumps(v)) for k, v in pairs]
+    if not rows:
+        raise ToolError("save_answers needs at least one answer")
+    return _session_id(arguments), arguments.get("section", ""), arguments.get("idempotencyKey"), rows
+
+
+def submission_document(arguments):
+    """(session_id, idempotency_key, document) from an END submission.
+
+    Either the read_summary payload ({"sessionId", "completed", "sections": {section: {field: value}}})
+    or an older flat {"field": "value", ...} dictionary.
+    """
+    document = {k: v for k, v in arguments.items() if k not in ("sessionId", "session_id", "idempotencyKey")}
+    if not document:
+        raise ToolError("save_answers needs at least one answer")
+    return _session_id(arguments), arguments.get("idempotencyKey"), document
+
+
+class AnswerStore:
+    """Backend interface. Coroutines; implementations must tolerate concurrent callers."""
+
+    async def upsert_answers(self, session_id, section, idempotency_key, rows):
+        """Write ``rows`` in one batch; returns False when ``idempotency_key`` was already stored."""
+        raise NotImplementedError
+
+    async def get_answers(self, session_id):
+        raise NotImplementedError
+
+    async def save_submission(self, session_id, idempotency_key, document):
+        """Store the END document of a session, replacing an earlier one; False for a repeated key."""
+        raise NotImplementedError
+
+    async def get_submission(self, session_id):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class InMemoryAnswerStore(AnswerStore):
+    def __init__(self):
+        self._answers = collections.defaultdict(dict)
+        self._submissions = {}
+        self._keys = set()
+
+    async def upsert_answers(self, session_id, section, idempotency_key, rows):
+        if idempotency_key and idempotency_key in self._keys:
+            return False
+        self._answers[session_id].update(rows)
+        if idempotency_key:
+            self._keys.add(idempotency_key)
+        return True
+
+    async def get_answers(self, session_id):
+        return dict(self._answers.get(session_id, {}))
+
+    async def save_submission(self, session_id, idempotency_key, document):
+        if idempotency_key and idempotency_key in self._keys:
+            return False
+        self._submissions[session_id] = document
+        if idempotency_key:
+            self._keys.add(idempotency_key)
+        return True
+
+    async def get_submission(self, session_id):
+        return self._submissions.get(session_id)
+
+
+class JsonlAnswerStore(InMemoryAnswerStore):
+    """In-memory store backed by an append-only log that is replayed at startup."""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._lock = asyncio.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="answers-log")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        if "submission" in entry:
+                            self._submissions[entry["sessionId"]] = entry["submission"]
+                        else:
+                            self._answers[entry["sessionId"]].update(entry["answers"])
+                        if entry.get("idempotencyKey"):
+                            self._keys.add(entry["idempotencyKey"])
+
+    async def upsert_answers(self, session_id, section, idempotency_key, rows):
+        async with self._lock:
+            if idempotency_key and idempotency_key in self._keys:
+                return False
+            entry = {"sessionId": session_id, "section": section, "idempotencyKey": idempotency_key, "answers": dict(rows)}
+            await asyncio.get_running_loop().run_in_executor(self._writer, self._append, json.dumps(entry) + "\n")
+            return await super().upsert_answers(session_id, section, idempotency_key, rows)
+
+    async def save_submission(self, session_id, idempotency_key, document):
+        async with self._lock:
+            if idempotency_key and idempotency_key in self._keys:
+                return False
+            entry = {"sessionId": session_id, "idempotencyKey": idempotency_key, "submission": document}
+            await asyncio.get_running_loop().run_in_executor(self._writer, self._append, json.dumps(entry) + "\n")
+            return await super().save_submission(session_id, idempotency_key, document)
+
+    def _append(self, line):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    async def close(self):
+        self._writer.shutdown(wait=True)
+
+
+class SQLiteAnswerStore(AnswerStore):
+    """SQLite in WAL mode behind a fixed pool of connections run on a dedicated thread pool."""
+
+    def __init__(self, path=DEFAULT_ANSWERS_DB, pool_size=DEFAULT_POOL_SIZE):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="answers-db")
+        self._pool = asyncio.Queue()
+        for _ in range(pool_size):
+            self._pool.put_nowait(self._connect())
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "session_id TEXT NOT NULL, question_id TEXT NOT NULL, value TEXT NOT NULL, section TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, PRIMARY KEY (session_id, question_id))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS batches (idempotency_key TEXT PRIMARY KEY, session_id TEXT NOT NULL, "
+            "section TEXT NOT NULL, rows INTEGER NOT NULL, received_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS submissions (session_id TEXT PRIMARY KEY, document TEXT NOT NULL, received_at REAL NOT NULL)"
+        )
+        return conn
+
+    @contextlib.asynccontextmanager
+    async def _connection(self):
+        conn = await self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put_nowait(conn)
+
+    async def upsert_answers(self, session_id, section, idempotency_key, rows):
+        async with self._connection() as conn:
+            return await self._run(self._upsert, conn, session_id, section, idempotency_key, rows)
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    @staticmethod
+    def _claim(conn, idempotency_key, session_id, section, rows, now):
+        """Record a batch key inside the open transaction; False (and rolled back) if it was already stored."""
+        if not idempotency_key:
+            return True
+        inserted = conn.execute(
+            "INSERT OR IGNORE INTO batches (idempotency_key, session_id, section, rows, received_at) VALUES (?, ?, ?, ?, ?)",
+            (idempotency_key, session_id, section, rows, now),
+        ).rowcount
+        if not inserted:
+            conn.execute("ROLLBACK")
+        return bool(inserted)
+
+    @classmethod
+    def _upsert(cls, conn, session_id, section, idempotency_key, rows):
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if not cls._claim(conn, idempotency_key, session_id, section, len(rows), now):
+                return False
+            conn.executemany(
+                "INSERT INTO answers (session_id, question_id, value, section, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(session_id, question_id) DO UPDATE SET value = excluded.value, section = excluded.section, "
+                "updated_at = excluded.updated_at",
+                [(session_id, question_id, value, section, now) for question_id, value in rows],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+
+    async def get_answers(self, session_id):
+        async with self._connection() as conn:
+            rows = await self._run(
+                lambda: conn.execute("SELECT question_id, value FROM answers WHERE session_id = ?", (session_id,)).fetchall()
+            )
+        return dict(rows)
+
+    async def save_submission(self, session_id, idempotency_key, document):
+        async with self._connection() as conn:
+            return await self._run(self._submit, conn, session_id, idempotency_key, json.dumps(document))
+
+    @classmethod
+    def _submit(cls, conn, session_id, idempotency_key, document):
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if not cls._claim(conn, idempotency_key, session_id, "", 0, now):
+                return False
+            conn.execute(
+                "INSERT INTO submissions (session_id, document, received_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET document = excluded.document, received_at = excluded.received_at",
+                (session_id, document, now),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+
+    async def get_submission(self, session_id):
+        async with self._connection() as conn:
+            row = await self._run(
+                lambda: conn.execute("SELECT document FROM submissions WHERE session_id = ?", (session_id,)).fetchone()
+            )
+        return json.loads(row[0]) if row else None
+
+    async def close(self):
+        self._executor.shutdown(wait=True)
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+def open_answer_store(url=None, pool_size=DEFAULT_POOL_SIZE):
+    """Open the backend named by ``url`` or the COSMOS_STORE environment variable."""
+    url = url or os.environ.get("COSMOS_STORE") or f"sqlite:///{DEFAULT_ANSWERS_DB}"
+    if url.startswith("memory://"):
+        return InMemoryAnswerStore()
+    if url.startswith("file://"):
+        return JsonlAnswerStore(url[len("file://") :])
+    if url.startswith("sqlite:///"):
+        return SQLiteAnswerStore(url[len("sqlite:///") :], pool_size=pool_size)
+    raise ValueError(f"Unsupported COSMOS_STORE: {url}")
+
+
+class RequestMetrics:
+    """Rolling timing samples per metric name."""
+
+    def __init__(self, window=METRIC_WINDOW):
+        self._samples = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self.counts = collections.Counter()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def timed(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._samples[name].append(elapsed_ms)
+                self.counts[name] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {name: {**summarize(samples), "total": self.counts[name]} for name, samples in sorted(self._samples.items())}
+
+
+class CosmosMcpServer:
+    """aiohttp application serving MCP at /cosmos/ and timing metrics at /metrics."""
+
+    def __init__(self, store=None, host="127.0.0.1", port=0, path=MCP_PATH):
+        self.store = store or open_answer_store()
+        self.host = host
+        self.port = port
+        self.path = path
+        self.metrics = RequestMetrics()
+        self._runner = None
+
+    def app(self):
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.add_routes([web.post(self.path, self.handle), web.get("/metrics", self.handle_metrics)])
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port, backlog=2048).start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+        await self.store.close()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    @property
+    def server_url(self):
+        return f"http://{self.host}:{self.port}{self.path}"
+
+    async def handle_metrics(self, request):
+        return web.json_response(self.metrics.snapshot())
+
+    async def handle(self, request):
+        with self.metrics.timed("http"):
+            try:
+                message = await request.json()
+            except json.JSONDecodeError:
+                return web.json_response({"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}})
+            if isinstance(message, list) and message:
+                replies = [reply for reply in [await self.dispatch(m) for m in message] if reply is not None]
+                return web.json_response(replies) if replies else web.Response(status=202)
+            reply = await self.dispatch(message)
+            return web.json_response(reply) if reply is not None else web.Response(status=202)
+
+    async def dispatch(self, message):
+        """Handle one JSON-RPC message; None for notifications."""
+        if not isinstance(message, dict):
+            return {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}}
+        method = message.get("method", "")
+        if "id" not in message:
+            return None
+        with self.metrics.timed(f"rpc:{method}"):
+            try:
+                result = await self._call(method, message.get("params") or {})
+            except LookupError as e:
+                return {"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32601, "message": str(e)}}
+            except InvalidParamsError as e:
+                return {"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32602, "message": f"Invalid params: {e}"}}
+        return {"jsonrpc": "2.0", "id": message["id"], "result": result}
+
+    async def _call(self, method, params):
+        if method == "initialize":
+            return {
+                "protocolVersion": params.get("protocolVersion", PROTOCOL_VERSION),
+                "capabilities": {"tools": {"listChanged": False}},
+                "serverInfo": {"name": "cosmos-reference", "version": "1.0"},
+            }
+        if method == "ping":
+            return {}
+        if method == "tools/list":
+            return {"tools": TOOLS}
+        if method == "tools/call":
+            name = params.get("name")
+            with self.metrics.timed(f"tool:{name}"):
+                try:
+                    result = await self.call_tool(name, params.get("arguments") or {})
+                except (ToolError, KeyError, TypeError) as e:
+                    return {"content": [{"type": "text", "text": f"{name} failed: {e}"}], "isError": True}
+            return {"content": [{"type": "text", "text": json.dumps(result)}], "structuredContent": result, "isError": False}
+        raise LookupError(f"Unknown method: {method}")
+
+    async def call_tool(self, name, arguments):
+        if name == "save_answers" and "answers" not in arguments:
+            session_id, key, document = submission_document(arguments)
+            with self.metrics.timed("store:save_submission"):
+                written = await self.store.save_submission(session_id, key, document)
+            return {"saved": True, "duplicate": not written, "sessionId": session_id, "submission": True}
+        if name == "save_answers":
+            session_id, section, key, rows = answer_rows(arguments)
+            with self.metrics.timed("store:upsert_answers"):
+                written = await self.store.upsert_answers(session_id, section, key, rows)
+            return {"saved": True, "duplicate": not written, "sessionId": session_id, "section": section, "rows": len(rows)}
+        if name == "get_answers":
+            with self.metrics.timed("store:get_answers"):
+                answers = await self.store.get_answers(arguments["sessionId"])
+                submission = await self.store.get_submission(arguments["sessionId"])
+            return {"sessionId": arguments["sessionId"], "answers": answers, "submission": submission}
+        raise ToolError(f"unknown tool {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reference MCP server for the /cosmos/ save endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--store", help="sqlite:///path, file:///path or memory:// (default: COSMOS_STORE or .answers.db).")
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE, help="SQLite connections in the pool.")
+    args = parser.parse_args()
+
+    async def serve():
+        async with CosmosMcpServer(open_answer_store(args.store, pool_size=args.pool_size), args.host, args.port) as server:
+            print(f"Serving MCP at {server.server_url} (metrics: http://{args.host}:{server.port}/metrics)")
+            await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
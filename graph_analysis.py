@@ -0,0 +1,186 @@
+"""
+DESCRIPTION:
+    Static checks and precomputed path lengths for the question graph.
+
+    analyze() finds unreachable nodes, dangling next targets, cycles and nodes
+    that cannot reach END, and records for every node the shortest and longest
+    number of questions left before END. Provisioning refuses to deploy a graph
+    with errors, and get_question reports progress from the path table instead
+    of leaving the model to estimate it.
+
+USAGE:
+    python graph_analysis.py [QuestionListCopy.json]
+"""
+
+import sys
+from collections import deque
+from dataclasses import dataclass, field
+
+from question_graph import DEFAULT_QUESTION_FILE, END_NODE_ID, QuestionGraph
+
+
+class GraphValidationError(ValueError):
+    """The question graph has structural errors and must not be deployed."""
+
+
+@dataclass
+class GraphReport:
+    unreachable: list = field(default_factory=list)
+    dangling: list = field(default_factory=list)
+    cycles: list = field(default_factory=list)
+    dead_ends: list = field(default_factory=list)
+    # node_id -> (shortest, longest) questions left, counting the node itself and excluding END.
+    remaining: dict = field(default_factory=dict)
+
+    @property
+    def errors(self):
+        errors = [f"dangling next target {source} -> {target}" for source, target in self.dangling]
+        errors += [f"cycle {' -> '.join(cycle)}" for cycle in self.cycles]
+        errors += [f"node {node_id} cannot reach {END_NODE_ID}" for node_id in self.dead_ends]
+        errors += [f"node {node_id} is unreachable" for node_id in self.unreachable]
+        return errors
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def progress(self, node_id, start_id):
+        """Percent of the interview done when ``node_id`` is about to be asked, using the longest path."""
+        total = self.remaining.get(start_id, (None, None))[1]
+        left = self.remaining.get(node_id, (None, None))[1]
+        if not total or left is None:
+            return None
+        return round(100 * (total - left) / total)
+
+
+def _edges(graph):
+    """node_id -> existing successor ids, and the list of (node_id, missing_target) pairs."""
+    edges, dangling = {}, []
+    for node_id in graph.nodes:
+        edges[node_id] = []
+        for target in graph.successors(node_id):
+            if target in graph.nodes:
+                edges[node_id].append(target)
+            else:
+                dangling.append((node_id, target))
+    return edges, dangling
+
+
+def _reachable(edges, start_id):
+    seen = {start_id}
+    queue = deque([start_id])
+    while queue:
+        for target in edges[queue.popleft()]:
+            if target not in seen:
+                seen.add(target)
+                queue.append(target)
+    return seen
+
+
+def _cycles(edges):
+    """One representative cycle per back edge found by an iterative depth-first search."""
+    WHITE, GREY, BLACK = 0, 1, 2
+    color = dict.fromkeys(edges, WHITE)
+    cycles = []
+    for root in edges:
+        if color[root] != WHITE:
+            continue
+        path = [root]
+        stack = [iter(edges[root])]
+        color[root] = GREY
+        while stack:
+            target = next(stack[-1], None)
+            if target is None:
+                color[path.pop()] = BLACK
+                stack.pop()
+            elif color[target] == GREY:
+                cycles.append(path[path.index(target) :] + [target])
+            elif color[target] == WHITE:
+                color[target] = GREY
+                path.append(target)
+                stack.append(iter(edges[target]))
+    return cycles
+
+
+def _remaining(graph, edges):
+    """(shortest, longest) questions left from each node that can reach END.
+
+    Longest paths are only well defined on the acyclic part of the graph; nodes
+    on or behind a cycle get None as their longest value.
+    """
+    reverse = {node_id: [] for node_id in edges}
+    for source, targets in edges.items():
+        for target in targets:
+            reverse[target].append(source)
+
+    shortest = {}
+    if END_NODE_ID in graph.nodes:
+        shortest[END_NODE_ID] = 0
+        queue = deque([END_NODE_ID])
+        while queue:
+            node_id = queue.popleft()
+            for source in reverse[node_id]:
+                if source not in shortest:
+                    shortest[source] = shortest[node_id] + 1
+                    queue.append(source)
+
+    # Reverse topological pass (Kahn's algorithm from END): a node is settled
+    # once all of its END-reaching successors are; nodes on or behind a cycle
+    # are never settled.
+    pending = {
+        node_id: 0 if node_id == END_NODE_ID else sum(target in shortest for target in edges[node_id])
+        for node_id in shortest
+    }
+    longest = {}
+    queue = deque(node_id for node_id, count in pending.items() if count == 0)
+    while queue:
+        node_id = queue.popleft()
+        if node_id == END_NODE_ID:
+            longest[node_id] = 0
+        else:
+            longest[node_id] = max(longest[target] for target in edges[node_id] if target in shortest) + 1
+        for source in reverse[node_id]:
+            if source in pending and source != END_NODE_ID:
+                pending[source] -= 1
+                if pending[source] == 0:
+                    queue.append(source)
+
+    return {node_id: (shortest[node_id], longest.get(node_id)) for node_id in shortest}
+
+
+def analyze(graph):
+    """Run every check over ``graph`` and return a GraphReport."""
+    edges, dangling = _edges(graph)
+    reachable = _reachable(edges, graph.start_id)
+    remaining = _remaining(graph, edges)
+    return GraphReport(
+        unreachable=[node_id for node_id in graph.nodes if node_id not in reachable],
+        dangling=dangling,
+        cycles=_cycles(edges),
+        dead_ends=[node_id for node_id in graph.nodes if node_id not in remaining],
+        remaining=remaining,
+    )
+
+
+def validate_graph(graph):
+    """Raise GraphValidationError listing every structural problem in ``graph``."""
+    report = analyze(graph)
+    if not report.ok:
+        raise GraphValidationError("Question graph is invalid:\n  " + "\n  ".join(report.errors))
+    return report
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_QUESTION_FILE
+    graph = QuestionGraph.load(path)
+    report = analyze(graph)
+    for error in report.errors:
+        print(f"ERROR: {error}")
+    for node_id in graph.nodes:
+        shortest, longest = report.remaining.get(node_id, (None, None))
+        print(f"{node_id:<16} left: {shortest}-{longest}  progress: {report.progress(node_id, graph.start_id)}%")
+    raise SystemExit(0 if report.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
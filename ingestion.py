@@ -0,0 +1,172 @@
+"""
+DESCRIPTION:
+    Per-node ingestion of the question graph into a vector store.
+
+    Instead of indexing QuestionListCopy.json as one file, every node becomes
+    its own small document carrying node_id, section, type and next-branch
+    attributes. The documents are uploaded with bounded concurrency and added
+    to the vector store in one file batch, so file_search returns whole nodes
+    rather than chunks that split or merge them.
+
+    For a redeploy, diff_nodes compares per-node content hashes with the
+    last deployment and update_nodes applies only the difference to the
+    existing store: new and edited nodes are uploaded and attached, then the
+    files they replace and those of removed nodes are detached and deleted.
+
+USAGE:
+    file_ids = ingest_nodes(openai_client, vector_store.id, QuestionGraph.load())
+
+    diff = diff_nodes(previous_hashes, node_hashes(graph))
+    file_ids = update_nodes(openai_client, vector_store_id, graph, file_ids, diff)
+"""
+
+import contextlib
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+DEFAULT_UPLOAD_CONCURRENCY = 8
+
+# Part of the vector store content hash; bump it when the document layout changes.
+INGESTION_LAYOUT = "per-node-v1"
+
+# Vector store file batches accept at most this many files per request.
+MAX_BATCH_SIZE = 500
+
+# Attribute values are capped at 512 characters by the vector store API.
+MAX_ATTRIBUTE_LENGTH = 512
+
+
+def node_document(node_id, node):
+    """Text indexed for one node: the node JSON with its id attached."""
+    return json.dumps({"id": node_id, **node}, ensure_ascii=False, indent=1)
+
+
+def node_attributes(node_id, node):
+    """Filterable vector store attributes for one node."""
+    target = node.get("next")
+    if isinstance(target, dict):
+        branches = ";".join(f"{answer}={next_id}" for answer, next_id in target.items())
+    else:
+        branches = target or ""
+    return {
+        "node_id": node_id,
+        "section": node.get("meta", {}).get("section", ""),
+        "type": node.get("type", ""),
+        "next": branches[:MAX_ATTRIBUTE_LENGTH],
+    }
+
+
+def node_hash(node_id, node):
+    """Content hash of a node's document; attributes are derived from the same node."""
+    return hashlib.sha256(node_document(node_id, node).encode("utf-8")).hexdigest()
+
+
+def node_hashes(graph):
+    return {node_id: node_hash(node_id, node) for node_id, node in graph.nodes.items()}
+
+
+@dataclass
+class NodeDiff:
+    """Node ids added, edited and removed between two deployments of a graph."""
+
+    added: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    def __str__(self):
+        return f"{len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed"
+
+    def nodes_to_upload(self, graph):
+        """{node_id: node} of the added and edited nodes, which need new files."""
+        return {node_id: graph.nodes[node_id] for node_id in self.added + self.changed}
+
+    def stale_files(self, file_ids):
+        """File ids of the edited and removed nodes, to delete once their replacements are attached."""
+        return [file_ids[node_id] for node_id in self.changed + self.removed if node_id in file_ids]
+
+
+def diff_nodes(previous, current):
+    """Compare {node_id: hash} maps of the deployed and the new graph."""
+    return NodeDiff(
+        added=[node_id for node_id in current if node_id not in previous],
+        changed=[node_id for node_id, digest in current.items() if node_id in previous and previous[node_id] != digest],
+        removed=[node_id for node_id in previous if node_id not in current],
+    )
+
+
+def node_filename(node_id):
+    return f"node_{node_id}.json"
+
+
+def node_file(node_id, node):
+    """(filename, content) of one node document, as files.create expects it."""
+    return node_filename(node_id), node_document(node_id, node).encode("utf-8")
+
+
+def file_batches(nodes, file_ids):
+    """Vector store items for uploaded node files, split into batches of at most MAX_BATCH_SIZE."""
+    items = [{"file_id": file_ids[node_id], "attributes": node_attributes(node_id, nodes[node_id])} for node_id in file_ids]
+    return [items[start : start + MAX_BATCH_SIZE] for start in range(0, len(items), MAX_BATCH_SIZE)]
+
+
+def merge_file_ids(graph, file_ids, new_ids):
+    """{node_id: file_id} for every node of ``graph`` after an update uploaded ``new_ids``."""
+    return {node_id: new_ids.get(node_id) or file_ids[node_id] for node_id in graph.nodes}
+
+
+def upload_node(openai_client, node_id, node):
+    """Upload one node document and return its file id."""
+    return openai_client.files.create(file=node_file(node_id, node), purpose="assistants").id
+
+
+def upload_nodes(openai_client, nodes, concurrency=DEFAULT_UPLOAD_CONCURRENCY):
+    """Upload ``nodes`` ({node_id: node}) in parallel and return {node_id: file_id}."""
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {node_id: pool.submit(upload_node, openai_client, node_id, node) for node_id, node in nodes.items()}
+        return {node_id: future.result() for node_id, future in futures.items()}
+
+
+def attach_files(openai_client, vector_store_id, nodes, file_ids):
+    """Add uploaded node files to the vector store in batches and wait for indexing."""
+    for items in file_batches(nodes, file_ids):
+        batch = openai_client.vector_stores.file_batches.create_and_poll(vector_store_id=vector_store_id, files=items)
+        if batch.file_counts.failed:
+            raise RuntimeError(f"{batch.file_counts.failed} node files failed to index in vector store {vector_store_id}")
+
+
+def remove_file(openai_client, vector_store_id, file_id):
+    """Detach a node file from the vector store and delete it; one that is already gone is skipped."""
+    from openai import NotFoundError
+
+    with contextlib.suppress(NotFoundError):
+        openai_client.vector_stores.files.delete(file_id, vector_store_id=vector_store_id)
+    with contextlib.suppress(NotFoundError):
+        openai_client.files.delete(file_id)
+
+
+def update_nodes(openai_client, vector_store_id, graph, file_ids, diff, concurrency=DEFAULT_UPLOAD_CONCURRENCY):
+    """Apply ``diff`` to a vector store holding ``file_ids`` and return the new {node_id: file_id}.
+
+    Replacements are attached before the files they replace are removed, so
+    every node stays searchable during the update.
+    """
+    updated = diff.nodes_to_upload(graph)
+    new_ids = upload_nodes(openai_client, updated, concurrency=concurrency)
+    if new_ids:
+        attach_files(openai_client, vector_store_id, updated, new_ids)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda file_id: remove_file(openai_client, vector_store_id, file_id), diff.stale_files(file_ids)))
+    return merge_file_ids(graph, file_ids, new_ids)
+
+
+def ingest_nodes(openai_client, vector_store_id, graph, concurrency=DEFAULT_UPLOAD_CONCURRENCY):
+    """Upload every node of ``graph`` as its own document and return {node_id: file_id}."""
+    file_ids = upload_nodes(openai_client, graph.nodes, concurrency=concurrency)
+    attach_files(openai_client, vector_store_id, graph.nodes, file_ids)
+    print(f"Indexed {len(file_ids)} question nodes in vector store (id: {vector_store_id})")
+    return file_ids
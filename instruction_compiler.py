@@ -0,0 +1,227 @@
+"""
+DESCRIPTION:
+    Builds agent instructions from rule blocks and question-graph data, with
+    per-block token counts and a token budget.
+
+    Instructions are resent on every turn, so their size is paid on every
+    model call and their layout decides how much of each request the
+    provider can serve from its prompt cache. A profile (see instructions.py)
+    lists Blocks; each has a scope:
+
+        shared          rules every agent uses, word for word
+        profile         one persona's rules (greeting, confirmation style...)
+        questionnaire   data computed from the question graph, such as the
+                        section transitions from meta.section
+
+    compile_instructions() normalizes each block's whitespace (dedent, no
+    tabs, no trailing spaces), then orders blocks by scope, keeping the
+    profile's order within a scope. Everything before the first
+    questionnaire block is identical for every questionnaire, and the shared
+    part identical for every persona, so the cached prefix is as long as it
+    can be and a new questionnaire adds only its own data block at the end.
+
+    With a budget, optional blocks are dropped, lowest priority first, until
+    the instructions fit; InstructionBudgetError is raised if the required
+    blocks alone do not.
+
+USAGE:
+    compiled = compile_instructions(SARAH_PROFILE, graph, budget=3000)
+    compiled.text
+    print_report(compiled)
+
+    python instruction_compiler.py --profile sarah [--question-file guide.json] [--budget 3000] [--print]
+"""
+
+import argparse
+import os
+import re
+import textwrap
+from dataclasses import dataclass
+
+from phrasing import section_starts, transition_line
+from question_graph import END_NODE_ID
+from token_count import estimate_tokens
+
+SCOPES = ("shared", "profile", "questionnaire")
+BLOCK_SEPARATOR = "\n\n"
+MAX_SECTION_ENTRY_IDS = 3
+
+
+class InstructionBudgetError(ValueError):
+    """The required blocks of a profile do not fit the token budget."""
+
+
+@dataclass(frozen=True)
+class Block:
+    """One topic of the instructions.
+
+    ``text`` may be a string or a callable taking the question graph and
+    returning one (None or "" leaves the block out). Optional blocks can be
+    dropped to meet a budget; a higher ``priority`` is dropped first.
+    """
+
+    name: str
+    text: object
+    scope: str = "shared"
+    optional: bool = False
+    priority: int = 0
+
+    def render(self, graph):
+        text = self.text(graph) if callable(self.text) else self.text
+        return clean_text(text) if text else ""
+
+
+@dataclass(frozen=True)
+class Profile:
+    name: str
+    blocks: tuple
+
+
+@dataclass
+class CompiledBlock:
+    name: str
+    scope: str
+    text: str
+    tokens: int
+    optional: bool
+
+
+@dataclass
+class CompiledInstructions:
+    profile: str
+    text: str
+    blocks: list
+    dropped: list
+    budget: int = None
+
+    @property
+    def tokens(self):
+        return estimate_tokens(self.text)
+
+    @property
+    def stable_prefix_tokens(self):
+        """Tokens before the first questionnaire block: the part every questionnaire shares."""
+        stable = [b.text for b in self.blocks if b.scope != "questionnaire"]
+        return estimate_tokens(BLOCK_SEPARATOR.join(stable)) if stable else 0
+
+
+def clean_text(text):
+    """Dedent, expand tabs, strip trailing spaces and collapse runs of blank lines."""
+    lines = [line.rstrip() for line in textwrap.dedent(text.expandtabs(4)).strip("\n").splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def _ordered(blocks):
+    unknown = [b.name for b in blocks if b.scope not in SCOPES]
+    if unknown:
+        raise ValueError(f"Blocks with an unknown scope: {', '.join(unknown)}")
+    names = [b.name for b in blocks]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate block names: {', '.join(duplicates)}")
+    return sorted(blocks, key=lambda b: SCOPES.index(b.scope))
+
+
+def compile_instructions(profile, graph=None, budget=None):
+    """Render ``profile`` for ``graph`` into one instruction string, within ``budget`` tokens if given."""
+    compiled = []
+    for block in _ordered(profile.blocks):
+        text = block.render(graph) if graph is not None or not callable(block.text) else ""
+        if text:
+            compiled.append(CompiledBlock(block.name, block.scope, text, estimate_tokens(text), block.optional))
+
+    dropped = []
+    if budget is not None:
+        priorities = {b.name: b.priority for b in profile.blocks}
+        droppable = sorted((b for b in compiled if b.optional), key=lambda b: (-priorities[b.name], -b.tokens))
+        while estimate_tokens(BLOCK_SEPARATOR.join(b.text for b in compiled)) > budget and droppable:
+            block = droppable.pop(0)
+            compiled.remove(block)
+            dropped.append(block.name)
+        total = estimate_tokens(BLOCK_SEPARATOR.join(b.text for b in compiled))
+        if total > budget:
+            raise InstructionBudgetError(
+                f"{profile.name} instructions need {total} tokens without their optional blocks; the budget is {budget}"
+            )
+    return CompiledInstructions(profile.name, BLOCK_SEPARATOR.join(b.text for b in compiled), compiled, dropped, budget)
+
+
+# Questionnaire data blocks
+
+
+def section_transitions(graph):
+    """SECTION TRANSITIONS block: the line to say before the first question of each section."""
+    starts = section_starts(graph)
+    lines = []
+    seen = set()
+    for node_id, node in graph.nodes.items():
+        if node_id not in starts or node_id == END_NODE_ID or node.get("type") == "end":
+            continue
+        section = (node.get("meta") or {}).get("section")
+        if not section or section in seen:
+            continue
+        seen.add(section)
+        entries = sorted(n for n in starts if (graph.nodes[n].get("meta") or {}).get("section") == section)
+        # Ids help on small guides; on large ones meta.section identifies the section and the list would only grow.
+        where = f" (before {', '.join(entries)})" if len(entries) <= MAX_SECTION_ENTRY_IDS else ""
+        lines.append(f'- {section}{where}: "{transition_line(node_id, node)}"')
+    if not lines:
+        return None
+    return "\n".join(
+        [
+            "SECTION TRANSITIONS",
+            "Before the first question of a section, say its line (a node's phrasing.transition, when present, takes precedence):",
+            *lines,
+        ]
+    )
+
+
+# Report
+
+
+def duplicate_lines(compiled, min_chars=24):
+    """Rule lines that appear in more than one block: candidates to move into a shared block."""
+    owners = {}
+    for block in compiled.blocks:
+        for line in block.text.splitlines():
+            key = re.sub(r"^[\s\-✓✗\d.]+", "", line).strip().casefold()
+            if len(key) >= min_chars:
+                owners.setdefault(key, set()).add(block.name)
+    return {line: sorted(names) for line, names in owners.items() if len(names) > 1}
+
+
+def print_report(compiled):
+    print(f"{compiled.profile}: {compiled.tokens} tokens", end="")
+    print(f" (budget {compiled.budget})" if compiled.budget is not None else "")
+    print(f"  {'block':<24} {'scope':<14} {'tokens':>6}")
+    for block in compiled.blocks:
+        flag = " (optional)" if block.optional else ""
+        print(f"  {block.name:<24} {block.scope:<14} {block.tokens:>6}{flag}")
+    print(f"  stable prefix: {compiled.stable_prefix_tokens} tokens")
+    if compiled.dropped:
+        print(f"  dropped to fit the budget: {', '.join(compiled.dropped)}")
+    for line, names in duplicate_lines(compiled).items():
+        print(f"  repeated in {', '.join(names)}: {line[:70]}")
+
+
+def main():
+    from instructions import PROFILES
+    from question_graph import QuestionGraph
+
+    parser = argparse.ArgumentParser(description="Compile agent instructions and report tokens per block.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), nargs="+", default=sorted(PROFILES))
+    parser.add_argument("--question-file", help="Question graph to take data blocks from (default: QUESTION_FILE or QuestionListCopy.json).")
+    parser.add_argument("--budget", type=int, default=int(os.environ["INSTRUCTION_TOKEN_BUDGET"]) if os.environ.get("INSTRUCTION_TOKEN_BUDGET") else None)
+    parser.add_argument("--print", action="store_true", help="Print the compiled instructions too.")
+    args = parser.parse_args()
+
+    graph = QuestionGraph.load(args.question_file) if args.question_file else QuestionGraph.load()
+    for name in args.profile:
+        compiled = compile_instructions(PROFILES[name], graph, budget=args.budget)
+        print_report(compiled)
+        if args.print:
+            print("\n" + compiled.text + "\n")
+
+
+if __name__ == "__main__":
+    main()
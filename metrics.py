@@ -0,0 +1,31 @@
+"""
+DESCRIPTION:
+    Small latency/size summaries shared by the benchmarks, the router and the
+    trace report.
+"""
+
+import math
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of ``values`` (q in 0..100); None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values):
+    """count, mean, p50, p95, p99 and max of ``values``."""
+    values = list(values)
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    }
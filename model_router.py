@@ -0,0 +1,232 @@
+"""
+DESCRIPTION:
+    Per-node routing of model calls between a fast deployment and the main one.
+
+    Each model call is classified by the kind of node being asked (yesno,
+    choice, date, number, formatted text, free text, end) and by the phase
+    of the turn:
+
+        ask       presenting a question (after get_question / save_session)
+        validate  the caller answered; normalize it and read it back
+        confirm   the caller replied to the read-back; advance and save
+
+    ROUTES maps (kind, phase) to "fast" or "main". Structured nodes and
+    confirmations go to the fast deployment; reading back free text (which
+    is spelled letter by letter) and the END summary stay on the main model.
+
+    A fast response is checked locally before it is used: tool names and
+    arguments must match the tool schemas, question ids must exist and a
+    next_question answer must select a branch. A response that fails is
+    discarded and the request is sent again to the main model.
+
+    The fast deployment is read from AZURE_AI_FAST_MODEL_DEPLOYMENT_NAME;
+    without it every call goes to the main model.
+
+USAGE:
+    router = ModelRouter(main_model, fast_model="gpt-4.1-mini")
+    driver = ConversationDriver(openai_client, main_model, sarah_instructions(), session_id="call-1", router=router)
+    ...
+    print(router.report())
+"""
+
+import asyncio
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+
+from agent_tools import TOOL_SPECS, get_graph, get_session_store
+from metrics import summarize
+
+FAST = "fast"
+MAIN = "main"
+
+ASK = "ask"
+VALIDATE = "validate"
+CONFIRM = "confirm"
+
+STRUCTURED_KINDS = ("yesno", "choice", "date", "number")
+
+ROUTES = {
+    **{(kind, phase): FAST for kind in STRUCTURED_KINDS for phase in (ASK, VALIDATE, CONFIRM)},
+    ("formatted", ASK): FAST,
+    ("formatted", VALIDATE): MAIN,
+    ("formatted", CONFIRM): FAST,
+    ("text", ASK): FAST,
+    ("text", VALIDATE): MAIN,
+    ("text", CONFIRM): FAST,
+}
+
+CONFIRM_PROMPT_MARKERS = ("is that correct", "is this correct", "did i get that right", "please say yes or no")
+
+
+def _get(item, key, default=None):
+    return item.get(key, default) if isinstance(item, dict) else getattr(item, key, default)
+
+
+def node_kind(node):
+    """Routing kind of a question node."""
+    if not node:
+        return "end"
+    kind = node.get("type", "text")
+    meta = node.get("meta") or {}
+    if kind == "end":
+        return "end"
+    if kind in STRUCTURED_KINDS:
+        return kind
+    if meta.get("allowed_values") or node.get("choices"):
+        return "choice"
+    if meta.get("format"):
+        return "formatted"
+    return "text"
+
+
+def turn_phase(input_items):
+    """Phase of the turn from the tail of the request input."""
+    if not input_items:
+        return ASK
+    last = input_items[-1]
+    if _get(last, "type") == "function_call_output":
+        call_id = _get(last, "call_id")
+        name = next((_get(i, "name") for i in reversed(input_items) if _get(i, "type") == "function_call" and _get(i, "call_id") == call_id), None)
+        if name == "normalize_answer":
+            return VALIDATE
+        if name == "next_question":
+            return CONFIRM
+        return ASK
+    if _get(last, "role") == "user":
+        previous = next((i for i in reversed(input_items[:-1]) if _get(i, "role") == "assistant"), None)
+        content = _get(previous, "content", "") if previous is not None else ""
+        if isinstance(content, list):
+            content = "".join(_get(part, "text", "") for part in content)
+        if any(marker in content.lower() for marker in CONFIRM_PROMPT_MARKERS):
+            return CONFIRM
+        return VALIDATE
+    return ASK
+
+
+def response_error(response):
+    """Why a response must not be used, or None if it passes the local checks."""
+    graph = get_graph()
+    calls = [item for item in response.output if item.type == "function_call"]
+    text = "".join(
+        part.text for item in response.output if item.type == "message" for part in item.content if getattr(part, "type", "") == "output_text"
+    )
+    if not calls and not text.strip():
+        return "empty response"
+    for call in calls:
+        spec = TOOL_SPECS.get(call.name)
+        if spec is None:
+            return f"unknown tool {call.name}"
+        try:
+            arguments = json.loads(call.arguments or "{}")
+        except json.JSONDecodeError:
+            return f"{call.name}: arguments are not JSON"
+        schema = spec["parameters"]
+        missing = [k for k in schema.get("required", []) if k not in arguments]
+        extra = [k for k in arguments if k not in schema["properties"]]
+        if missing or extra:
+            return f"{call.name}: missing {missing} unexpected {extra}"
+        for key in ("questionId", "currentNode"):
+            if key in arguments and arguments[key] not in graph.nodes:
+                return f"{call.name}: unknown node {arguments[key]}"
+        if call.name == "next_question":
+            try:
+                graph.next_question(arguments["questionId"], arguments["answer"])
+            except ValueError as e:
+                return f"next_question: {e}"
+    return None
+
+
+def _usage(response):
+    usage = getattr(response, "usage", None)
+    return (usage.input_tokens, usage.output_tokens) if usage is not None else (0, 0)
+
+
+@dataclass
+class RouteStats:
+    calls: int = 0
+    fallbacks: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    seconds: list = field(default_factory=list)
+    rejections: dict = field(default_factory=dict)
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "fallbacks": self.fallbacks,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "latency_seconds": summarize(self.seconds),
+            "rejections": dict(self.rejections),
+        }
+
+
+@dataclass(frozen=True)
+class Route:
+    key: str
+    target: str
+    model: str
+
+
+class ModelRouter:
+    """Picks a deployment per call and keeps per-route latency, token and fallback stats."""
+
+    def __init__(self, main_model, fast_model=None, routes=None):
+        self.main_model = main_model
+        self.fast_model = fast_model
+        self.routes = routes if routes is not None else ROUTES
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, main_model=None):
+        return cls(main_model or os.environ["AZURE_AI_MODEL_DEPLOYMENT_NAME"], os.environ.get("AZURE_AI_FAST_MODEL_DEPLOYMENT_NAME"))
+
+    def route(self, session_id, input_items):
+        return self.route_for(get_session_store().load(session_id), input_items)
+
+    async def route_async(self, session_id, input_items):
+        """route() with the session read in a worker thread, for the asyncio drivers."""
+        return self.route_for(await asyncio.to_thread(get_session_store().load, session_id), input_items)
+
+    def route_for(self, state, input_items):
+        """Route for a call on the node of an already loaded session ``state`` (None: not started)."""
+        node = get_graph().nodes.get(state.current_node) if state else None
+        kind = node_kind(node) if state else "text"
+        phase = turn_phase(input_items)
+        target = self.routes.get((kind, phase), MAIN) if self.fast_model else MAIN
+        return Route(f"{kind}:{phase}", target, self.fast_model if target == FAST else self.main_model)
+
+    def main_route(self, route):
+        return Route(route.key, MAIN, self.main_model)
+
+    def check(self, route, response):
+        """Local validation of a fast response; returns the rejection reason or None."""
+        if route.target != FAST:
+            return None
+        error = response_error(response)
+        if error is not None:
+            with self._lock:
+                stats = self._stats(route)
+                stats.fallbacks += 1
+                reason = error.split(":")[0]
+                stats.rejections[reason] = stats.rejections.get(reason, 0) + 1
+        return error
+
+    def record(self, route, response, seconds):
+        input_tokens, output_tokens = _usage(response)
+        with self._lock:
+            stats = self._stats(route)
+            stats.calls += 1
+            stats.input_tokens += input_tokens
+            stats.output_tokens += output_tokens
+            stats.seconds.append(seconds)
+
+    def _stats(self, route):
+        return self.stats.setdefault(f"{route.target}:{route.key}", RouteStats())
+
+    def report(self):
+        with self._lock:
+            return {key: stats.to_dict() for key, stats in sorted(self.stats.items())}
@@ -0,0 +1,388 @@
+"""
+DESCRIPTION:
+    Local speech normalization and answer validation.
+
+    Spoken answers are normalized and validated according to the question
+    node's type (text, number, date, choice, yesno) and meta.format (phone,
+    email, currency, ssn). The agent calls this once per answer through the
+    normalize_answer tool instead of reasoning through the rules itself.
+
+USAGE:
+    normalize(graph.get_question("Q18"), "john at gmail dot com")
+    # -> {"normalized": "john@gmail.com", "valid": True, "error": None}
+"""
+
+import re
+from datetime import date
+
+from choice_matching import MATCH_THRESHOLD, choice_index
+
+FILLER_WORDS = ("uh", "um", "umm", "hmm", "er", "actually", "maybe", "i think", "you know")
+
+EMPTY_PHRASES = {
+    "nah", "no", "nope", "none", "nothing", "not at this time", "not now", "don't have", "dont have",
+    "do not have", "not available", "not having",
+}
+NA_PHRASES = {
+    "na", "n/a", "n a", "not applicable", "does not apply", "doesn't apply", "doesnt apply", "not relevant",
+    "no relevance",
+}
+
+YES_WORDS = {"yes", "yeah", "yep", "yup", "sure", "correct", "right", "affirmative", "yes it is", "that's right"}
+NO_WORDS = {"no", "nope", "nah", "negative", "not really", "no it isn't", "that's wrong"}
+
+MONTHS = {
+    name: i
+    for i, names in enumerate(
+        [("january", "jan"), ("february", "feb"), ("march", "mar"), ("april", "apr"), ("may",), ("june", "jun"),
+         ("july", "jul"), ("august", "aug"), ("september", "sep", "sept"), ("october", "oct"),
+         ("november", "nov"), ("december", "dec")],
+        start=1,
+    )
+    for name in names
+}
+
+UNITS = {
+    "zero": 0, "oh": 0, "o": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+    "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+TENS = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90}
+SCALES = {"hundred": 100, "thousand": 1_000, "million": 1_000_000}
+ORDINALS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "sixth": 6, "seventh": 7, "eighth": 8,
+    "ninth": 9, "tenth": 10, "eleventh": 11, "twelfth": 12, "thirteenth": 13, "fourteenth": 14,
+    "fifteenth": 15, "sixteenth": 16, "seventeenth": 17, "eighteenth": 18, "nineteenth": 19, "twentieth": 20,
+    "thirtieth": 30,
+}
+
+_FILLER_RE = re.compile(r"\b(?:" + "|".join(re.escape(w) for w in FILLER_WORDS) + r")\b[,.]?", re.IGNORECASE)
+_SPELLED_RE = re.compile(r"^(?:[A-Za-z](?:[\s\-.,]+|$)){2,}$")
+
+
+def result(normalized, valid=True, error=None):
+    return {"normalized": normalized, "valid": valid, "error": error}
+
+
+def clean(raw):
+    """Trim, drop filler words and collapse whitespace."""
+    text = _FILLER_RE.sub(" ", raw or "")
+    return re.sub(r"\s+", " ", text).strip(" \t\n,.")
+
+
+def _key(text):
+    return re.sub(r"[^\w/' ]+", "", text.casefold()).strip()
+
+
+def empty_value(text):
+    """Return "" or "NA" when the caller explicitly gave no value, otherwise None."""
+    key = _key(text)
+    if key in NA_PHRASES:
+        return "NA"
+    if key in EMPTY_PHRASES:
+        return ""
+    return None
+
+
+def join_spelling(text):
+    """Join letter-by-letter input ("S U P E R") into one word; other input is returned unchanged."""
+    if _SPELLED_RE.match(text):
+        return "".join(re.findall(r"[A-Za-z]", text))
+    return text
+
+
+def words_to_number(text):
+    """Parse digits or spoken English numbers ("twenty five point five") into a float, or None."""
+    text = text.replace(",", "").strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    words = re.findall(r"[a-z]+|\d+(?:\.\d+)?", text.casefold().replace("-", " "))
+    total = current = 0
+    fraction = None
+    seen = False
+    for word in words:
+        if word == "and":
+            continue
+        if word == "point":
+            fraction = ""
+            continue
+        if fraction is not None:
+            if word in UNITS and UNITS[word] < 10:
+                fraction += str(UNITS[word])
+            elif word.isdigit():
+                fraction += word
+            else:
+                return None
+            continue
+        if re.fullmatch(r"\d+(?:\.\d+)?", word):
+            current += float(word)
+        elif word in UNITS:
+            current += UNITS[word]
+        elif word in TENS:
+            current += TENS[word]
+        elif word == "hundred":
+            current = (current or 1) * 100
+        elif word in SCALES:
+            total += (current or 1) * SCALES[word]
+            current = 0
+        else:
+            return None
+        seen = True
+    if not seen:
+        return None
+    value = total + current
+    if fraction:
+        value += float("0." + fraction)
+    return value
+
+
+def _format_number(value):
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def _digits(text):
+    """Digits in ``text``, reading spoken digit words ("five five five") as digits too."""
+    out = []
+    for token in re.findall(r"\d+|[a-z]+", text.casefold()):
+        if token.isdigit():
+            out.append(token)
+        elif token in UNITS and UNITS[token] < 10:
+            out.append(str(UNITS[token]))
+        elif token in ("double", "triple"):
+            out.append(token)
+    digits = []
+    repeat = 1
+    for token in out:
+        if token == "double":
+            repeat = 2
+        elif token == "triple":
+            repeat = 3
+        else:
+            digits.append(token[0] * repeat + token[1:])
+            repeat = 1
+    return "".join(digits)
+
+
+def normalize_yesno(text, node=None):
+    key = _key(text)
+    if key in YES_WORDS or key.startswith("yes"):
+        return result("Yes")
+    if key in NO_WORDS or key.startswith("no "):
+        return result("No")
+    return result(text, False, "Please say yes or no.")
+
+
+def normalize_choice(text, node):
+    choices = node.get("choices") or node.get("meta", {}).get("allowed_values") or []
+    key = _key(join_spelling(text))
+    for choice in choices:
+        if _key(choice) == key:
+            return result(choice)
+    matches = [choice for choice in choices if key and (_key(choice).startswith(key) or key in _key(choice))]
+    if len(matches) == 1:
+        return result(matches[0])
+    match = choice_index(node).match(text)
+    if match.confident:
+        return result(match.value)
+    close = [value for value, score in match.ranked if score >= MATCH_THRESHOLD]
+    if close:
+        # Ambiguous, or a choice named in a negated or third-party answer: let the caller say which.
+        return result(text, False, f"Did you mean {' or '.join(close)}?")
+    return result(text, False, f"Please choose one of: {', '.join(choices)}.")
+
+
+def normalize_email(text, node=None):
+    email = re.sub(r"\s+(?:at)\s+", "@", f" {text} ", flags=re.IGNORECASE)
+    email = re.sub(r"\s+(?:dot|period)\s+", ".", email, flags=re.IGNORECASE)
+    email = re.sub(r"\s+(?:underscore)\s+", "_", email, flags=re.IGNORECASE)
+    email = re.sub(r"\s+(?:dash|hyphen)\s+", "-", email, flags=re.IGNORECASE)
+    email = re.sub(r"\s+", "", email).casefold()
+    if email.count("@") != 1:
+        return result(email, False, "An email address needs exactly one @.")
+    local, domain = email.split("@")
+    if not local or "." not in domain.strip(".") or domain.startswith(".") or domain.endswith("."):
+        return result(email, False, "The email domain must contain a dot, like gmail.com.")
+    if not re.fullmatch(r"[\w.+\-]+@[\w\-]+(?:\.[\w\-]+)+", email):
+        return result(email, False, "The email address contains characters that are not allowed.")
+    return result(email)
+
+
+def normalize_phone(text, node=None):
+    digits = _digits(text)
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    if len(digits) != 10:
+        return result(digits, False, "A phone number needs 10 digits, including the area code.")
+    if digits[0] in "01" or digits[3] in "01":
+        return result(digits, False, "That does not look like a valid US phone number.")
+    return result(f"{digits[:3]}-{digits[3:6]}-{digits[6:]}")
+
+
+def normalize_ssn(text, node=None):
+    digits = _digits(text)
+    if len(digits) != 9:
+        return result(digits, False, "A Social Security number has 9 digits.")
+    area, group, serial = digits[:3], digits[3:5], digits[5:]
+    if area in ("000", "666") or area.startswith("9") or group == "00" or serial == "0000":
+        return result(digits, False, "That is not a valid Social Security number.")
+    return result(f"{area}-{group}-{serial}")
+
+
+def normalize_currency(text, node=None):
+    cleaned = re.sub(r"\b(?:dollars?|usd|bucks|per year|a year|annually)\b|\$", " ", text, flags=re.IGNORECASE)
+    cleaned = cleaned.strip()
+    match = re.fullmatch(r"([\d,.]+)\s*([kKmM])", cleaned)
+    if match:
+        value = words_to_number(match.group(1))
+        if value is not None:
+            value *= 1_000 if match.group(2).lower() == "k" else 1_000_000
+    else:
+        value = words_to_number(cleaned)
+    if value is None:
+        return result(text, False, "Please say the amount as a number, like 85,000 dollars.")
+    if value < 0:
+        return result(text, False, "The amount cannot be negative.")
+    return result(f"{value:.2f}")
+
+
+def normalize_number(text, node=None):
+    value = words_to_number(re.sub(r"\b(?:years?|yrs?|months?|about|around|roughly)\b", " ", text, flags=re.IGNORECASE))
+    if value is None:
+        return result(text, False, "Please answer with a number.")
+    return result(_format_number(value))
+
+
+def _day(token):
+    token = token.casefold()
+    match = re.fullmatch(r"(\d{1,2})(?:st|nd|rd|th)?", token)
+    if match:
+        return int(match.group(1))
+    return ORDINALS.get(token)
+
+
+def parse_date(text):
+    """Parse a spoken or written date into a datetime.date, or None."""
+    cleaned = re.sub(r"\b(?:the|of)\b", " ", text.casefold())
+    cleaned = re.sub(r"(twenty|thirty)[\s\-]+(first|second|third|fourth|fifth|sixth|seventh|eighth|ninth)",
+                     lambda m: str(TENS[m.group(1)] + ORDINALS[m.group(2)]), cleaned)
+    cleaned = re.sub(r"\s+", " ", cleaned.replace(",", " ")).strip()
+
+    match = re.fullmatch(r"(\d{1,2})[/\-.](\d{1,2})[/\-.](\d{2}|\d{4})", cleaned)
+    if match:
+        month, day, year = (int(g) for g in match.groups())
+        if year < 100:
+            year += 1900 if year > date.today().year % 100 else 2000
+        return _safe_date(year, month, day)
+    match = re.fullmatch(r"(\d{4})[/\-.](\d{1,2})[/\-.](\d{1,2})", cleaned)
+    if match:
+        year, month, day = (int(g) for g in match.groups())
+        return _safe_date(year, month, day)
+
+    tokens = cleaned.split(" ")
+    month = next((MONTHS[t.rstrip(".")] for t in tokens if t.rstrip(".") in MONTHS), None)
+    if month is None:
+        return None
+    rest = [t for t in tokens if t.rstrip(".") not in MONTHS]
+    day = year = None
+    for i, token in enumerate(rest):
+        if day is None and _day(token) is not None and _day(token) <= 31 and not re.fullmatch(r"\d{3,4}", token):
+            day = _day(token)
+        elif re.fullmatch(r"\d{4}", token):
+            year = int(token)
+        else:
+            spoken_year = _spoken_year(rest[i:])
+            if spoken_year:
+                year = spoken_year
+                break
+    if day is None or year is None:
+        return None
+    return _safe_date(year, month, day)
+
+
+def _spoken_year(tokens):
+    """"nineteen ninety" -> 1990, "two thousand five" -> 2005."""
+    words = " ".join(tokens)
+    if words.startswith("two thousand"):
+        value = words_to_number(words)
+        return int(value) if value else None
+    if len(tokens) >= 2 and tokens[0] in UNITS and tokens[0] not in ("zero", "oh", "o"):
+        century = UNITS[tokens[0]]
+        rest = words_to_number(" ".join(tokens[1:]).replace("oh ", ""))
+        if 10 <= century <= 20 and rest is not None and rest < 100:
+            return century * 100 + int(rest)
+    return None
+
+
+def _safe_date(year, month, day):
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def normalize_date(text, node=None):
+    parsed = parse_date(text)
+    if parsed is None:
+        return result(text, False, "I couldn't understand that date. Please say the month, day and year.")
+    today = date.today()
+    text_label = (node or {}).get("text", "").casefold()
+    if "birth" in text_label:
+        if parsed > today:
+            return result(parsed.strftime("%m/%d/%Y"), False, "The date of birth can't be in the future.")
+        if today.year - parsed.year > 120:
+            return result(parsed.strftime("%m/%d/%Y"), False, "That date of birth seems too long ago.")
+    return result(parsed.strftime("%m/%d/%Y"))
+
+
+def normalize_text(text, node=None):
+    text = join_spelling(text)
+    if (node or {}).get("meta", {}).get("subsection") == "name" and text.isalpha():
+        text = text[:1].upper() + text[1:].lower()
+    if not text:
+        return result("", False, "Please give an answer.")
+    return result(text)
+
+
+FORMAT_NORMALIZERS = {
+    "phone": normalize_phone,
+    "email": normalize_email,
+    "currency": normalize_currency,
+    "ssn": normalize_ssn,
+    "date": normalize_date,
+}
+
+TYPE_NORMALIZERS = {
+    "yesno": normalize_yesno,
+    "choice": normalize_choice,
+    "date": normalize_date,
+    "number": normalize_number,
+    "text": normalize_text,
+}
+
+
+def normalize(node, raw):
+    """Normalize and validate a spoken answer for ``node``.
+
+    Returns {"normalized": str, "valid": bool, "error": str | None}.
+    """
+    node_type = node.get("type", "text")
+    meta = node.get("meta", {})
+    if node_type in ("end", "action"):
+        return result("")
+
+    text = clean(raw)
+    if not text:
+        return result("", False, "I didn't catch an answer.")
+
+    # "No" is an answer for yes/no and choice nodes, and "no value" everywhere else.
+    if node_type not in ("yesno", "choice"):
+        empty = empty_value(text)
+        if empty is not None:
+            return result(empty)
+
+    if node_type == "text" and meta.get("allowed_values"):
+        return normalize_choice(text, node)
+    normalizer = FORMAT_NORMALIZERS.get(meta.get("format")) or TYPE_NORMALIZERS.get(node_type, normalize_text)
+    return normalizer(text, node)
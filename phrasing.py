@@ -0,0 +1,272 @@
+"""
+DESCRIPTION:
+    Offline build of the spoken phrasing for every question node.
+
+    The model should not rewrite "First Name" into "What's your first name?"
+    on every call. This build step does it once per node and stores the
+    result in the node itself, under "phrasing":
+
+        prompt      the question as it is spoken
+        transition  line spoken before the first question of a section (or
+                    the closing line on END); absent elsewhere
+        confirm     confirmation template with {value} and {spelled}
+                    placeholders, filled with render_confirmation()
+
+    get_question returns nodes whole, so the agent gets the phrasing with the
+    node and speaks it as is. The hot path does no generation.
+
+    Phrasing comes from rules (label overrides, then patterns by type and
+    format) or, with --model, from one model call per node at build time,
+    falling back to the rules for any node whose call fails or whose output
+    is unusable. With
+    --tts, the prompt and transition audio are synthesized into the disk
+    cache as well (see tts.py).
+
+    The output is a new question file; point QUESTION_FILE at it, or
+    convert it to a .qbank, to serve it.
+
+USAGE:
+    python phrasing.py QuestionListCopy.json --out QuestionListCopy.phrased.json
+    python phrasing.py QuestionListCopy.json --out phrased.json --model gpt-4.1-mini --tts openai
+
+    render_confirmation(node, "123456789")   # "Let me read that back: 1-2-3, 4-5, 6-7-8-9. Did I get that right?"
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from question_graph import END_NODE_ID, QuestionGraph
+
+PHRASING_KEY = "phrasing"
+DEFAULT_CONCURRENCY = 8
+
+# Label -> spoken prompt, matched on the label without its parenthetical.
+PROMPT_OVERRIDES = {
+    "first name": "What's your first name?",
+    "middle name": "And your middle name?",
+    "last name": "And your last name?",
+    "sex": "What is your sex: male, female, or other?",
+    "date of birth": "What's your date of birth?",
+    "ssn": "I'll need your Social Security number.",
+    "place of birth": "Where were you born?",
+    "height": "How tall are you?",
+    "weight": "And your weight?",
+    "net worth": "What's your approximate net worth?",
+    "driver's license # / state": "What's your driver's license number, and which state issued it?",
+    "residential address": "What's your home address, including city, state and zip code?",
+    "mailing address": "Is your mailing address different? If so, what is it?",
+    "email address": "What's your email address?",
+    "employment - title": "What's your job title?",
+    "job title": "What's your job title?",
+    "employment - duties": "What are your main duties at work?",
+    "employment - years of service": "How many years have you worked there?",
+    "employment - salary": "What's your annual salary?",
+    "employer name": "What's the name of your employer?",
+    "employer address": "And your employer's address?",
+}
+
+SECTION_TRANSITIONS = {
+    "personal": "Let's start with some basic information about yourself.",
+    "employment": "Great! Now I have a few questions about your employment.",
+    "medical_history": "Thanks! Now I have a few questions about your medical history.",
+}
+CLOSING_TRANSITION = "Wonderful! That's all the questions I have."
+
+SPELLED_FORMATS = ("ssn", "email", "phone")
+
+# Placeholders a confirmation template may use; model output with others is rejected.
+CONFIRM_PLACEHOLDERS = {"value", "spelled"}
+
+MODEL_PHRASING_INSTRUCTIONS = """You write what a friendly phone interviewer says for one questionnaire field.
+Return only JSON: {"prompt": "...", "confirm": "..."}.
+prompt: one short spoken question for the field, no IDs, no parentheses, no lists of formats.
+confirm: a read-back that contains {value} (or {spelled} for numbers and emails) and ends with "Is that correct?" or "Did I get that right?".
+Keep the meaning of the field exactly; do not add questions."""
+
+
+def field_label(text):
+    """The field label without its trailing parenthetical."""
+    return re.sub(r"\s*\(.*\)\s*$", "", text or "").strip()
+
+
+def rule_prompt(node):
+    """Spoken prompt for a node from the override table and type/format patterns."""
+    text = (node.get("text") or "").strip()
+    label = field_label(text)
+    override = PROMPT_OVERRIDES.get(label.casefold())
+    if override:
+        return override
+    if text.endswith("?") or text.casefold().startswith(("please", "tell me")):
+        return text
+    meta = node.get("meta") or {}
+    choices = node.get("choices") or meta.get("allowed_values")
+    if choices:
+        options = ", ".join(choices[:-1]) + f", or {choices[-1]}" if len(choices) > 1 else choices[0]
+        return f"What is your {label.lower()}: {options}?"
+    if meta.get("format") == "phone":
+        return f"What's your {label.lower()} number?" if "number" not in label.lower() else f"What's your {label.lower()}?"
+    return f"Could you tell me your {label.lower()}?"
+
+
+def rule_confirmation(node):
+    meta = node.get("meta") or {}
+    if meta.get("format") in SPELLED_FORMATS:
+        return "Let me read that back: {spelled}. Did I get that right?"
+    if meta.get("subsection") == "name":
+        return "Got it, {value}, spelled {spelled}. Is that correct?"
+    if node.get("type") == "text" and not (node.get("choices") or meta.get("allowed_values")):
+        return "I have {value}. Is that correct?"
+    return "{value}, is that correct?"
+
+
+def spell(value, node=None):
+    """Character-by-character reading of a value: digits grouped like the field's format, letters hyphenated."""
+    value = str(value)
+    fmt = ((node or {}).get("meta") or {}).get("format")
+    digits = re.sub(r"\D", "", value)
+    if fmt == "ssn" and len(digits) == 9:
+        groups = [digits[:3], digits[3:5], digits[5:]]
+    elif fmt == "phone" and len(digits) == 10:
+        groups = [digits[:3], digits[3:6], digits[6:]]
+    else:
+        words = value.replace("@", " at ").replace(".", " dot ").split()
+        return ", ".join(word if word in ("at", "dot") else "-".join(word.upper()) for word in words)
+    return ", ".join("-".join(group) for group in groups)
+
+
+def render_confirmation(node, value):
+    """The node's confirmation line for a normalized ``value``."""
+    template = (node.get(PHRASING_KEY) or {}).get("confirm") or rule_confirmation(node)
+    return template.format(value=value, spelled=spell(value, node))
+
+
+def section_starts(graph):
+    """Node ids asked first in their section: the start node and any node entered from another section."""
+    section = {node_id: (node.get("meta") or {}).get("section") for node_id, node in graph.nodes.items()}
+    starts = {graph.start_id}
+    for node_id in graph.nodes:
+        for target in graph.successors(node_id):
+            if target in graph.nodes and target != END_NODE_ID and section.get(target) != section.get(node_id):
+                starts.add(target)
+    return starts
+
+
+def transition_line(node_id, node):
+    if node_id == END_NODE_ID or node.get("type") == "end":
+        return CLOSING_TRANSITION
+    section = (node.get("meta") or {}).get("section") or ""
+    return SECTION_TRANSITIONS.get(section) or f"Now I have a few questions about {section.replace('_', ' ')}."
+
+
+class RulePhraser:
+    """Deterministic phrasing from PROMPT_OVERRIDES and type/format patterns."""
+
+    def phrase(self, node_id, node):
+        return {"prompt": rule_prompt(node), "confirm": rule_confirmation(node)}
+
+
+class ModelPhraser:
+    """One model call per node at build time; a failed call or unusable output falls back to RulePhraser."""
+
+    def __init__(self, openai_client, model, fallback=None):
+        self.client = openai_client
+        self.model = model
+        self.fallback = fallback or RulePhraser()
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+
+    def phrase(self, node_id, node):
+        rules = self.fallback.phrase(node_id, node)
+        field = {k: node[k] for k in ("text", "type", "choices", "meta") if k in node}
+        try:
+            response = self.client.responses.create(model=self.model, instructions=MODEL_PHRASING_INSTRUCTIONS, input=json.dumps(field))
+            phrasing = json.loads(response.output_text)
+            prompt, confirm = phrasing["prompt"].strip(), phrasing["confirm"].strip()
+            placeholders = set(re.findall(r"{(\w*)}", confirm))
+            if not prompt or not placeholders or not placeholders <= CONFIRM_PLACEHOLDERS:
+                raise ValueError(confirm)
+            # render_confirmation formats the template on the hot path; stray braces must fail here instead.
+            confirm.format(value="x", spelled="x")
+        except Exception:
+            # API errors (429s, timeouts) included: one node must not abort the whole build.
+            with self._lock:
+                self.fallbacks += 1
+            return rules
+        return {"prompt": prompt, "confirm": confirm}
+
+
+def build_phrasing(graph, phraser=None, concurrency=DEFAULT_CONCURRENCY):
+    """{node_id: phrasing} for every node of ``graph``."""
+    phraser = phraser or RulePhraser()
+    starts = section_starts(graph)
+    questions = {node_id: node for node_id, node in graph.nodes.items() if node_id != END_NODE_ID and node.get("type") != "end"}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        phrased = dict(zip(questions, pool.map(lambda item: phraser.phrase(*item), questions.items())))
+    result = {}
+    for node_id, node in graph.nodes.items():
+        phrasing = dict(phrased.get(node_id, {}))
+        if node_id in starts or node_id not in questions:
+            phrasing["transition"] = transition_line(node_id, node)
+        result[node_id] = phrasing
+    return result
+
+
+def write_phrased(source, target, phrasing):
+    """Copy the question file at ``source`` to ``target`` with each node's phrasing added."""
+    with open(source, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for node_id, node_phrasing in phrasing.items():
+        data[node_id] = {**data[node_id], PHRASING_KEY: node_phrasing}
+    tmp_path = target + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    os.replace(tmp_path, target)
+
+
+def spoken_lines(phrasing):
+    """Every fixed line in the phrasing, for audio pre-synthesis."""
+    return list(dict.fromkeys(line for p in phrasing.values() for line in (p.get("transition"), p.get("prompt")) if line))
+
+
+def main():
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Precompute the spoken phrasing of every question node.")
+    parser.add_argument("source", help="Question file in the QuestionListCopy.json schema.")
+    parser.add_argument("--out", required=True, help="Question file to write with phrasing added.")
+    parser.add_argument("--model", help="Model deployment to phrase nodes with (default: rules only).")
+    parser.add_argument("--tts", choices=["openai"], help="Also synthesize prompts and transitions into the audio cache.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    args = parser.parse_args()
+
+    load_dotenv()
+    graph = QuestionGraph.load(args.source)
+    client = None
+    if args.model or args.tts:
+        from clients import get_openai_client
+
+        client = get_openai_client()
+    phraser = ModelPhraser(client, args.model) if args.model else RulePhraser()
+    phrasing = build_phrasing(graph, phraser, concurrency=args.concurrency)
+    write_phrased(args.source, args.out, phrasing)
+    print(f"Wrote phrasing for {len(phrasing)} nodes to {args.out}")
+    if isinstance(phraser, ModelPhraser) and phraser.fallbacks:
+        print(f"{phraser.fallbacks} nodes fell back to rule phrasing")
+
+    if args.tts:
+        from tts import CachedTextToSpeech, OpenAITextToSpeech, open_audio_cache
+
+        tts = CachedTextToSpeech(OpenAITextToSpeech(client), open_audio_cache())
+        lines = spoken_lines(phrasing)
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(tts.synthesize, lines))
+        print(f"Cached audio for {len(lines)} lines ({tts.stats['misses']} synthesized, {tts.stats['hits']} already cached)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+DESCRIPTION:
+    Idempotent provisioning of the voice questionnaire agents.
+
+    Every input that shapes a deployment (question file, instructions, model
+    name and tool config) is hashed. A local state file maps each hash to the
+    resource ids created for it, so a redeploy with no changes reuses the
+    existing vector store, uploaded node files and agent version and makes no write
+    calls.
+
+    In incremental mode a changed question file does not create a new vector
+    store. The new graph is diffed node by node against the last deployment
+    of the store (its per-node hashes are kept in the state file), and only
+    added, edited and removed node documents are changed in place. The store
+    id stays the same, so the agent version is reused unless the
+    instructions, model or tools changed.
+
+USAGE:
+    spec = AgentSpec(agent_name="my-voic-agent", vector_store_name="ProductInfoStore",
+                     instructions=voice_agent_instructions(), model=..., mcp_tool={...})
+    agent = provision_agent(project_client, openai_client, spec)
+
+    Set FORCE_PROVISION=1 to ignore the state file and create everything again,
+    or INCREMENTAL_PROVISION=1 to update the deployed vector store in place.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+
+from agent_tools import TOOL_SPECS, function_tools
+from graph_analysis import validate_graph
+from ingestion import DEFAULT_UPLOAD_CONCURRENCY, INGESTION_LAYOUT, diff_nodes, ingest_nodes, node_hashes, update_nodes
+from question_graph import DEFAULT_QUESTION_FILE, QuestionGraph
+
+DEFAULT_STATE_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), ".deploy_state.json"))
+
+# Each node is its own document, so one result is the whole node.
+FILE_SEARCH_MAX_RESULTS = 1
+
+
+@dataclass
+class AgentSpec:
+    """Everything needed to deploy one agent version."""
+
+    agent_name: str
+    vector_store_name: str
+    instructions: str
+    model: str
+    mcp_tool: dict
+    question_file: str = DEFAULT_QUESTION_FILE
+    metadata: dict = field(default_factory=dict)
+
+
+def _digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        data = part if isinstance(part, bytes) else json.dumps(part, sort_keys=True).encode("utf-8")
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return _digest(f.read())
+
+
+def tool_config(spec):
+    """JSON-compatible description of the tools attached to the agent, used for hashing."""
+    return {
+        "mcp": spec.mcp_tool,
+        "file_search": {"max_num_results": FILE_SEARCH_MAX_RESULTS},
+        "functions": {name: {"description": s["description"], "parameters": s["parameters"]} for name, s in TOOL_SPECS.items()},
+    }
+
+
+def vector_store_hash(spec):
+    return _digest(INGESTION_LAYOUT, spec.vector_store_name, file_hash(spec.question_file))
+
+
+def agent_hash(spec, vector_store_id):
+    return _digest(spec.agent_name, spec.instructions, spec.model, tool_config(spec), vector_store_id)
+
+
+class DeployState:
+    """Hash-to-resource-id mapping persisted as JSON next to the scripts."""
+
+    def __init__(self, path=DEFAULT_STATE_FILE):
+        self.path = path
+        self.data = {"vector_stores": {}, "agents": {}, "latest": {}}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.data.update(json.load(f))
+
+    @property
+    def vector_stores(self):
+        return self.data["vector_stores"]
+
+    @property
+    def agents(self):
+        return self.data["agents"]
+
+    @property
+    def latest(self):
+        """Vector store name -> hash key of its most recent deployment."""
+        return self.data["latest"]
+
+    def latest_vector_store(self, name):
+        """(key, record) of the last deployment of the store ``name`` that can be updated in place, or (None, None)."""
+        key = self.latest.get(name)
+        record = self.vector_stores.get(key)
+        if record is None or "node_hashes" not in record or record.get("layout") != INGESTION_LAYOUT:
+            return None, None
+        return key, record
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def record_vector_store(state, spec, key, vector_store_id, file_ids, hashes, replaces=None):
+    """Store the deployment of ``spec``'s vector store under ``key``, dropping the record it ``replaces``."""
+    if replaces is not None and replaces != key:
+        del state.vector_stores[replaces]
+    state.vector_stores[key] = {
+        "name": spec.vector_store_name,
+        "vector_store_id": vector_store_id,
+        "file_ids": file_ids,
+        "node_hashes": hashes,
+        "layout": INGESTION_LAYOUT,
+    }
+    state.latest[spec.vector_store_name] = key
+    state.save()
+
+
+def provision_vector_store(openai_client, spec, state, force=False, concurrency=DEFAULT_UPLOAD_CONCURRENCY, incremental=False):
+    """Return (vector_store_id, {node_id: file_id}), re-ingesting the question file only if it changed.
+
+    With ``incremental``, a changed file updates the last deployed store in place.
+    """
+    key = vector_store_hash(spec)
+    cached = state.vector_stores.get(key)
+    if cached and not force:
+        print(f"Reusing vector store (id: {cached['vector_store_id']})")
+        return cached["vector_store_id"], cached["file_ids"]
+
+    graph = QuestionGraph.load(spec.question_file)
+    hashes = node_hashes(graph)
+    previous_key, previous = state.latest_vector_store(spec.vector_store_name) if incremental and not force else (None, None)
+    if previous is not None:
+        vector_store_id = previous["vector_store_id"]
+        diff = diff_nodes(previous["node_hashes"], hashes)
+        file_ids = update_nodes(openai_client, vector_store_id, graph, previous["file_ids"], diff, concurrency=concurrency)
+        print(f"Vector store updated in place (id: {vector_store_id}): {diff}")
+    else:
+        vector_store = openai_client.vector_stores.create(name=spec.vector_store_name)
+        vector_store_id = vector_store.id
+        print(f"Vector store created (id: {vector_store_id})")
+        file_ids = ingest_nodes(openai_client, vector_store_id, graph, concurrency=concurrency)
+
+    record_vector_store(state, spec, key, vector_store_id, file_ids, hashes, replaces=previous_key)
+    return vector_store_id, file_ids
+
+
+def build_tools(spec, vector_store_id):
+    from azure.ai.projects.models import FileSearchTool, MCPTool
+
+    return [
+        MCPTool(**spec.mcp_tool),
+        FileSearchTool(vector_store_ids=[vector_store_id], max_num_results=FILE_SEARCH_MAX_RESULTS),
+        *function_tools(),
+    ]
+
+
+def provision_agent(project_client, openai_client, spec, state=None, force=False, incremental=False):
+    """Deploy ``spec`` and return a dict with the agent id, name and version.
+
+    Nothing is created when the state file already records a deployment with the
+    same content hash. With ``incremental``, question edits are applied to the
+    deployed vector store and keep the current agent version. Raises
+    GraphValidationError before any call when the question graph is broken.
+    """
+    from azure.ai.projects.models import PromptAgentDefinition
+
+    validate_graph(QuestionGraph.load(spec.question_file))
+    state = state or DeployState()
+    vector_store_id, _ = provision_vector_store(openai_client, spec, state, force=force, incremental=incremental)
+
+    key = agent_hash(spec, vector_store_id)
+    cached = state.agents.get(key)
+    if cached and not force:
+        print(f"Reusing agent (id: {cached['id']}, name: {cached['name']}, version: {cached['version']})")
+        return cached
+
+    agent = project_client.agents.create_version(
+        agent_name=spec.agent_name,
+        definition=PromptAgentDefinition(
+            model=spec.model,
+            instructions=spec.instructions,
+            tools=build_tools(spec, vector_store_id),
+        ),
+    )
+    print(f"Agent created (id: {agent.id}, name: {agent.name}, version: {agent.version})")
+
+    record = {"id": agent.id, "name": agent.name, "version": agent.version, "vector_store_id": vector_store_id}
+    state.agents[key] = record
+    state.save()
+    return record
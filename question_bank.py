@@ -0,0 +1,291 @@
+"""
+DESCRIPTION:
+    Indexed, memory-mappable question-bank format (.qbank) for large guides.
+
+    A guide with thousands of nodes should not be parsed in full to look up
+    one question. A .qbank file holds every node as its own compact JSON
+    record, plus two fixed-width tables:
+
+        header      magic, version, node count, region offsets
+        meta        the guide's "meta" object as JSON
+        node table  one entry per node in guide order: (node offset, node
+                    length, id offset, id length)
+        index       node table positions sorted by id, for binary search
+        data        node ids and node JSON records
+
+    QuestionBank maps the file and decodes a node only when it is asked for,
+    so opening a bank costs the same for 36 nodes or 36,000. It is a
+    read-only Mapping of node id to node, which QuestionGraph uses directly
+    as its node table (QuestionGraph.load picks it for a .qbank path).
+
+    convert() reads the current JSON schema incrementally, a chunk at a time,
+    and spools node records to a temporary file. Memory stays proportional to
+    the node count (one index entry each), not to the size of the guide.
+
+USAGE:
+    python question_bank.py convert QuestionListCopy.json QuestionListCopy.qbank
+    python question_bank.py get QuestionListCopy.qbank Q25
+
+    bank = QuestionBank("QuestionListCopy.qbank")
+    bank["Q25"]                       # one node, decoded on demand
+    graph = QuestionGraph.load("QuestionListCopy.qbank")
+"""
+
+import argparse
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from collections.abc import Mapping
+
+QBANK_SUFFIX = ".qbank"
+MAGIC = b"QBANK\x00\x00\x01"
+VERSION = 1
+
+# magic, version, node count, meta offset, meta length, node table offset, index offset
+HEADER = struct.Struct("<8sIIQIQQ")
+# node offset, node length, id offset, id length
+ENTRY = struct.Struct("<QIQH")
+INDEX_ENTRY = struct.Struct("<I")
+
+READ_CHUNK = 1 << 16
+COPY_CHUNK = 1 << 20
+
+
+class QuestionBankError(ValueError):
+    """The file is not a question bank this version can read."""
+
+
+class QuestionBank(Mapping):
+    """Read-only, lazily decoded view of a .qbank file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise QuestionBankError(f"{path} is too short to be a question bank")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._count, meta_offset, meta_length, self._table, self._index = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise QuestionBankError(f"{path} is not a version {VERSION} question bank")
+        self.meta = json.loads(self._map[meta_offset : meta_offset + meta_length])
+        self._cache = {}
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _entry(self, position):
+        return ENTRY.unpack_from(self._map, self._table + position * ENTRY.size)
+
+    def _id_at(self, position):
+        _, _, id_offset, id_length = self._entry(position)
+        return self._map[id_offset : id_offset + id_length]
+
+    def _sorted_position(self, i):
+        return INDEX_ENTRY.unpack_from(self._map, self._index + i * INDEX_ENTRY.size)[0]
+
+    def _find(self, node_id):
+        """Node table position of ``node_id``, or None (binary search over the sorted index)."""
+        key = node_id.encode("utf-8")
+        sorted_ids = _SortedIds(self)
+        i = bisect.bisect_left(sorted_ids, key)
+        if i < self._count and sorted_ids[i] == key:
+            return self._sorted_position(i)
+        return None
+
+    def __getitem__(self, node_id):
+        node = self._cache.get(node_id)
+        if node is not None:
+            return node
+        position = self._find(node_id) if isinstance(node_id, str) else None
+        if position is None:
+            raise KeyError(node_id)
+        node_offset, node_length, _, _ = self._entry(position)
+        node = self._cache[node_id] = json.loads(self._map[node_offset : node_offset + node_length])
+        return node
+
+    def __contains__(self, node_id):
+        return node_id in self._cache or (isinstance(node_id, str) and self._find(node_id) is not None)
+
+    def __iter__(self):
+        """Node ids in guide order."""
+        for position in range(self._count):
+            yield self._id_at(position).decode("utf-8")
+
+    def __len__(self):
+        return self._count
+
+
+class _SortedIds:
+    """Sequence view of the ids in index order, for bisect."""
+
+    def __init__(self, bank):
+        self.bank = bank
+
+    def __len__(self):
+        return self.bank._count
+
+    def __getitem__(self, i):
+        return self.bank._id_at(self.bank._sorted_position(i))
+
+
+# Streaming reader for the JSON guide
+
+
+class _JsonObjectReader:
+    """Yields the (key, value) pairs of a top-level JSON object, reading the file in chunks."""
+
+    def __init__(self, f, chunk_size=READ_CHUNK):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def _skip_space(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill():
+                return
+
+    def _expect(self, chars):
+        self._skip_space()
+        if self.pos >= len(self.buffer) or self.buffer[self.pos] not in chars:
+            found = self.buffer[self.pos : self.pos + 20] if self.pos < len(self.buffer) else "end of file"
+            raise QuestionBankError(f"Expected one of {chars!r} in the question file, found {found!r}")
+        self.pos += 1
+        return self.buffer[self.pos - 1]
+
+    def _value(self):
+        """Decode the next JSON value, reading more of the file until it is complete."""
+        self._skip_space()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number or literal cut at the end of the buffer may still be incomplete.
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def items(self):
+        self._expect("{")
+        self._skip_space()
+        if self.buffer[self.pos : self.pos + 1] == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise QuestionBankError(f"Expected a string key in the question file, found {key!r}")
+            self._expect(":")
+            yield key, self._value()
+            if self._expect(",}") == "}":
+                return
+
+
+def convert(json_path, bank_path):
+    """Write the JSON guide at ``json_path`` as a question bank; returns the node count."""
+    entries = []  # (node id bytes, offset in spool, node length)
+    meta = {}
+    with tempfile.TemporaryFile() as spool:
+        with open(json_path, "r", encoding="utf-8") as f:
+            for node_id, node in _JsonObjectReader(f).items():
+                if node_id == "meta":
+                    meta = node
+                    continue
+                record = json.dumps(node, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+                entries.append((node_id.encode("utf-8"), spool.tell(), len(record)))
+                spool.write(record)
+        seen = set()
+        for node_id, _, _ in entries:
+            if node_id in seen:
+                raise QuestionBankError(f"Duplicate question id {node_id.decode()!r} in {json_path}")
+            seen.add(node_id)
+
+        meta_bytes = json.dumps(meta, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        meta_offset = HEADER.size
+        table_offset = meta_offset + len(meta_bytes)
+        index_offset = table_offset + len(entries) * ENTRY.size
+        ids_offset = index_offset + len(entries) * INDEX_ENTRY.size
+        nodes_offset = ids_offset + sum(len(node_id) for node_id, _, _ in entries)
+
+        tmp_path = bank_path + ".tmp"
+        with open(tmp_path, "wb") as out:
+            out.write(HEADER.pack(MAGIC, VERSION, len(entries), meta_offset, len(meta_bytes), table_offset, index_offset))
+            out.write(meta_bytes)
+            id_offset = ids_offset
+            for node_id, spool_offset, length in entries:
+                out.write(ENTRY.pack(nodes_offset + spool_offset, length, id_offset, len(node_id)))
+                id_offset += len(node_id)
+            for position in sorted(range(len(entries)), key=lambda p: entries[p][0]):
+                out.write(INDEX_ENTRY.pack(position))
+            for node_id, _, _ in entries:
+                out.write(node_id)
+            spool.seek(0)
+            while True:
+                chunk = spool.read(COPY_CHUNK)
+                if not chunk:
+                    break
+                out.write(chunk)
+        os.replace(tmp_path, bank_path)
+    return len(entries)
+
+
+def is_question_bank(path):
+    if path.endswith(QBANK_SUFFIX):
+        return True
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert and inspect .qbank question banks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert_parser = commands.add_parser("convert", help="Convert a JSON guide to a question bank.")
+    convert_parser.add_argument("source", help="Question file in the QuestionListCopy.json schema.")
+    convert_parser.add_argument("target", nargs="?", help=f"Output path (default: source with {QBANK_SUFFIX}).")
+    get_parser = commands.add_parser("get", help="Print one node of a question bank.")
+    get_parser.add_argument("bank")
+    get_parser.add_argument("node_id")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        target = args.target or os.path.splitext(args.source)[0] + QBANK_SUFFIX
+        count = convert(args.source, target)
+        print(f"Wrote {count} nodes to {target} ({os.path.getsize(target)} bytes)")
+    else:
+        with QuestionBank(args.bank) as bank:
+            if args.node_id not in bank:
+                sys.exit(f"Unknown question id: {args.node_id}")
+            print(json.dumps({"id": args.node_id, **bank[args.node_id]}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+DESCRIPTION:
+    In-memory index over the questionnaire graph (QuestionListCopy.json).
+
+    The graph is compiled once into a dict keyed by question id, so the
+    get_question / next_question tools resolve a node or a branch with a
+    single lookup instead of a vector-search round trip.
+
+    A .qbank question bank (see question_bank.py) is opened without parsing
+    every node, so lookups on a large guide start immediately. QUESTION_FILE
+    overrides the default question file.
+
+USAGE:
+    graph = QuestionGraph.load("QuestionListCopy.json")
+    graph.get_question("Q25")
+    graph.next_question("Q25", "Diabetes")   # -> "Q26_DM_1"
+"""
+
+import json
+import os
+
+END_NODE_ID = "END"
+DEFAULT_BRANCH = "default"
+EMPTY_BRANCH = "empty"
+HAS_VALUE_BRANCH = "hasValue"
+# Answers that count as "no value" for the empty branch.
+EMPTY_ANSWERS = frozenset({"", "na", "n/a"})
+
+DEFAULT_QUESTION_FILE = os.environ.get("QUESTION_FILE") or os.path.abspath(os.path.join(os.path.dirname(__file__), "QuestionListCopy.json"))
+
+
+class QuestionGraph:
+    """Compiled, read-only view of a question graph."""
+
+    def __init__(self, nodes, meta=None):
+        self.meta = meta or {}
+        # Any Mapping of node id to node: a dict, or a QuestionBank that decodes nodes on demand.
+        self.nodes = nodes
+        self._branches = {}
+
+    @classmethod
+    def from_dict(cls, data):
+        meta = data.get("meta", {})
+        nodes = {node_id: node for node_id, node in data.items() if node_id != "meta"}
+        return cls(nodes, meta)
+
+    @classmethod
+    def load(cls, path=DEFAULT_QUESTION_FILE):
+        from question_bank import QuestionBank, is_question_bank
+
+        if is_question_bank(path):
+            bank = QuestionBank(path)
+            return cls(bank, bank.meta)
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def __contains__(self, node_id):
+        return node_id in self.nodes
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @property
+    def start_id(self):
+        """First question id in file order."""
+        return next(iter(self.nodes))
+
+    def get_question(self, question_id):
+        """Return the node for ``question_id`` with its id attached, or raise KeyError."""
+        node = self.nodes.get(question_id)
+        if node is None:
+            raise KeyError(f"Unknown question id: {question_id}")
+        return {"id": question_id, **node}
+
+    def next_question(self, question_id, answer=None):
+        """Resolve the id of the node that follows ``question_id`` for a validated ``answer``.
+
+        Linear nodes ignore the answer. Branching nodes match the answer against their
+        ``next`` keys; when nothing matches they fall back to the ``default`` branch,
+        then to the ``empty`` branch for a blank or NA answer or the ``hasValue``
+        branch for any other answer. With none of those, ValueError is raised rather
+        than guessing a branch. The end node has no successor and returns None.
+        """
+        node = self.nodes.get(question_id)
+        if node is None:
+            raise KeyError(f"Unknown question id: {question_id}")
+        target = node.get("next")
+        if target is None or isinstance(target, str):
+            return target
+        branches = self._branches.get(question_id)
+        if branches is None:
+            # Branch keys are matched case-insensitively, so "yes" and "Yes" resolve the same way.
+            branches = self._branches[question_id] = {key.casefold(): t for key, t in target.items()}
+        key = (answer or "").strip().casefold()
+        if key in branches:
+            return branches[key]
+        fallback = EMPTY_BRANCH if key in EMPTY_ANSWERS else HAS_VALUE_BRANCH
+        for branch in (DEFAULT_BRANCH, fallback.casefold()):
+            if branch in branches:
+                return branches[branch]
+        raise ValueError(f"Answer {answer!r} does not match any branch of {question_id}: {sorted(node['next'])}")
+
+    def successors(self, question_id):
+        """All node ids reachable in one step from ``question_id``."""
+        target = self.nodes[question_id].get("next")
+        if target is None:
+            return []
+        if isinstance(target, str):
+            return [target]
+        return list(dict.fromkeys(target.values()))
@@ -0,0 +1,303 @@
+"""
+DESCRIPTION:
+    Rate-limit-aware scheduling of model calls shared by concurrent sessions.
+
+    One RateLimitScheduler sits in front of the deployment's quota. Two
+    token buckets track requests per minute and tokens per minute, and every
+    call reserves one request plus its estimated tokens before it is sent.
+    Waiting calls are granted strictly by priority: a call for an interview
+    already in progress goes before the greeting of a new one, so a caller
+    mid-question is never stuck behind a wave of new calls. Once the
+    response arrives, the reservation is corrected to the tokens actually
+    used.
+
+    A 429 pauses every grant until its Retry-After (or retry-after-ms) has
+    passed and empties the local buckets, then the call is queued again at
+    its original priority. Budgets a little under the deployment's quota
+    (say 90%) leave room for the drift between the local estimate and the
+    server's own accounting. New
+    sessions are admitted only while the number of active sessions and the
+    backlog of waiting calls stay under their limits. Otherwise admission
+    waits, or fails with AdmissionRejected after its timeout, so overload
+    turns into a busy signal instead of a stall mid-interview.
+
+USAGE:
+    scheduler = RateLimitScheduler(rpm=600, tpm=400_000, max_sessions=200)
+    client = ScheduledClient(project_client.get_openai_client(), scheduler)   # an AsyncOpenAI client
+    async with scheduler.session():
+        driver = AsyncConversationDriver(client, model, sarah_instructions(), session_id="call-1")
+        ...
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import json
+import time
+from dataclasses import dataclass
+
+from metrics import summarize
+from token_count import estimate_tokens
+
+IN_PROGRESS = 0
+NEW_SESSION = 1
+
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_RETRY_AFTER = 1.0
+# Expected output tokens reserved per call when the request does not set max_output_tokens.
+DEFAULT_OUTPUT_RESERVE = 256
+
+
+class AdmissionRejected(RuntimeError):
+    """The scheduler is saturated and a new session could not be admitted in time."""
+
+
+class TokenBucket:
+    """Continuous-refill bucket; ``take`` may drive the level negative when reconciling."""
+
+    def __init__(self, capacity, per_second, clock=time.monotonic):
+        self.capacity = capacity
+        self.per_second = per_second
+        self.clock = clock
+        self.level = capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.per_second)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until ``amount`` is available (0 if it is now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.per_second
+
+    def take(self, amount):
+        self._refill()
+        self.level -= amount
+
+    @classmethod
+    def per_minute(cls, limit, burst_seconds=10, clock=time.monotonic):
+        """Bucket for a per-minute quota that allows at most ``burst_seconds`` worth of it at once.
+
+        Azure OpenAI enforces quotas over short windows, so a full minute's
+        burst would be throttled anyway.
+        """
+        return cls(max(1, limit * burst_seconds / 60.0), limit / 60.0, clock)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = 0
+    future: asyncio.Future = None
+
+
+class RateLimitScheduler:
+    def __init__(self, rpm, tpm, max_sessions=None, max_backlog=None, clock=time.monotonic):
+        self.requests = TokenBucket.per_minute(rpm, clock=clock)
+        self.tokens = TokenBucket.per_minute(tpm, clock=clock)
+        self.clock = clock
+        self.max_sessions = max_sessions
+        self.max_backlog = max_backlog
+        self.active_sessions = 0
+        self.paused_until = 0.0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._admission = None
+        self._admitting = 0
+        # The event loop keeps only weak references to tasks; hold the notifications until they finish.
+        self._notify_tasks = set()
+        self.stats = {"granted": 0, "throttled": 0, "rejected_sessions": 0, "wait_seconds": {IN_PROGRESS: [], NEW_SESSION: []}}
+
+    # Call scheduling
+
+    async def acquire(self, tokens, priority=IN_PROGRESS):
+        """Wait until one request and ``tokens`` tokens may be sent."""
+        started = self.clock()
+        waiter = _Waiter(priority, next(self._seq), tokens, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, waiter)
+        self._pump()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            # A cancelled waiter is skipped by _pump; one granted just before cancellation gives its share back.
+            if not waiter.future.cancelled():
+                self.release(tokens)
+            raise
+        self.stats["granted"] += 1
+        self.stats["wait_seconds"][priority].append(self.clock() - started)
+
+    def reconcile(self, reserved, used):
+        """Correct a reservation of ``reserved`` tokens to the ``used`` tokens the call actually consumed."""
+        self.tokens.take(used - reserved)
+        self._pump()
+
+    def release(self, tokens):
+        """Give back a reservation that was never sent."""
+        self.tokens.take(-tokens)
+        self.requests.take(-1)
+        self._pump()
+
+    def throttled(self, retry_after):
+        """A 429 came back: hold every grant for ``retry_after`` seconds.
+
+        The local buckets only estimate the server's, so they are also
+        drained: after the pause, calls are paced from an empty bucket
+        instead of bursting into the same limit again.
+        """
+        self.stats["throttled"] += 1
+        self.paused_until = max(self.paused_until, self.clock() + retry_after)
+        for bucket in (self.requests, self.tokens):
+            bucket.take(max(0.0, bucket.level))
+        self._pump()
+
+    def _pump(self):
+        """Grant waiters in priority order while the buckets allow, else arm one timer for the head."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        while self._waiters:
+            head = self._waiters[0]
+            if head.future.done():
+                heapq.heappop(self._waiters)
+                continue
+            delay = max(self.paused_until - self.clock(), self.requests.wait_time(1), self.tokens.wait_time(head.tokens))
+            if delay > 0:
+                self._wakeup = asyncio.get_running_loop().call_later(delay, self._pump)
+                break
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.tokens.take(head.tokens)
+            head.future.set_result(None)
+        self._notify_admission()
+
+    @property
+    def backlog(self):
+        return sum(1 for w in self._waiters if not w.future.done())
+
+    # Session admission
+
+    def _can_admit(self):
+        if self.max_sessions is not None and self.active_sessions >= self.max_sessions:
+            return False
+        if self.max_backlog is not None and self.backlog >= self.max_backlog:
+            return False
+        return True
+
+    def _notify_admission(self):
+        if self._admission is not None and self._admitting:
+            async def notify(condition):
+                async with condition:
+                    condition.notify_all()
+
+            task = asyncio.get_running_loop().create_task(notify(self._admission))
+            self._notify_tasks.add(task)
+            task.add_done_callback(self._notify_tasks.discard)
+
+    @contextlib.asynccontextmanager
+    async def session(self, timeout=None):
+        """Hold one session slot for the duration of a call; raises AdmissionRejected after ``timeout``."""
+        if self._admission is None:
+            self._admission = asyncio.Condition()
+        self._admitting += 1
+        try:
+            async with self._admission:
+                await asyncio.wait_for(self._admission.wait_for(self._can_admit), timeout)
+                self.active_sessions += 1
+        except asyncio.TimeoutError:
+            self.stats["rejected_sessions"] += 1
+            raise AdmissionRejected(f"{self.active_sessions} active sessions, {self.backlog} calls waiting") from None
+        finally:
+            self._admitting -= 1
+        try:
+            yield
+        finally:
+            self.active_sessions -= 1
+            self._notify_admission()
+
+    def report(self):
+        waits = self.stats["wait_seconds"]
+        return {
+            "granted": self.stats["granted"],
+            "throttled": self.stats["throttled"],
+            "rejected_sessions": self.stats["rejected_sessions"],
+            "wait_seconds_in_progress": summarize(waits[IN_PROGRESS]),
+            "wait_seconds_new_session": summarize(waits[NEW_SESSION]),
+        }
+
+
+def request_priority(input_items):
+    """NEW_SESSION for the opening request of a call, IN_PROGRESS once the model has answered or a tool has run."""
+    for item in input_items or ():
+        role = item.get("role") if isinstance(item, dict) else getattr(item, "role", None)
+        kind = item.get("type") if isinstance(item, dict) else getattr(item, "type", None)
+        if role in ("assistant", "developer") or kind in ("function_call", "function_call_output"):
+            return IN_PROGRESS
+    return NEW_SESSION
+
+
+def estimate_request_tokens(kwargs):
+    """Input plus reserved output tokens for a responses.create call."""
+    prompt = json.dumps([kwargs.get("instructions"), kwargs.get("tools"), kwargs.get("input")], default=str)
+    return estimate_tokens(prompt) + (kwargs.get("max_output_tokens") or DEFAULT_OUTPUT_RESERVE)
+
+
+def retry_after_seconds(error, default=DEFAULT_RETRY_AFTER):
+    """Retry-After of a 429 from the OpenAI SDK error's response headers."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    if headers.get("retry-after-ms"):
+        return float(headers["retry-after-ms"]) / 1000
+    try:
+        return float(headers.get("retry-after", default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _is_rate_limited(error):
+    return getattr(error, "status_code", None) == 429
+
+
+class _ScheduledResponses:
+    def __init__(self, client):
+        self._client = client
+
+    async def create(self, **kwargs):
+        owner = self._client
+        scheduler = owner.scheduler
+        tokens = estimate_request_tokens(kwargs)
+        priority = request_priority(kwargs.get("input"))
+        for attempt in range(owner.max_retries + 1):
+            await scheduler.acquire(tokens, priority)
+            try:
+                response = await owner.client.responses.create(**kwargs)
+            except Exception as e:
+                if not _is_rate_limited(e) or attempt == owner.max_retries:
+                    scheduler.reconcile(tokens, 0)
+                    raise
+                scheduler.reconcile(tokens, 0)
+                scheduler.throttled(retry_after_seconds(e))
+                continue
+            usage = getattr(response, "usage", None)
+            scheduler.reconcile(tokens, usage.input_tokens + usage.output_tokens if usage else tokens)
+            return response
+
+
+class ScheduledClient:
+    """AsyncOpenAI-shaped wrapper whose responses.create goes through a RateLimitScheduler.
+
+    The scheduler does the 429 retries, so the wrapped client's own SDK retries are turned off.
+    """
+
+    def __init__(self, client, scheduler, max_retries=DEFAULT_MAX_RETRIES):
+        self.client = client.with_options(max_retries=0) if hasattr(client, "with_options") else client
+        self.scheduler = scheduler
+        self.max_retries = max_retries
+        self.responses = _ScheduledResponses(self)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
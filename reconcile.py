@@ -0,0 +1,262 @@
+"""
+DESCRIPTION:
+    Deletes vector stores, uploaded node files and agent versions that the
+    deployment no longer references.
+
+    Every deploy that changes its inputs leaves the previous vector store,
+    its node files and the previous agent version behind, and listing or
+    searching them gets slower as they pile up. This command pages through
+    all three, works out what is still referenced and deletes the rest:
+
+        agent versions  of the agents in agent_specs.AGENT_SPECS; the --keep
+                        newest versions of each agent and the version recorded
+                        in .deploy_state.json for the current spec are kept
+        vector stores   named like a spec's store; kept when a kept agent
+                        version searches it or the state records it for the
+                        current spec
+        files           node_<id>.json uploads (purpose "assistants") found
+                        in an orphaned store of the selected agents or in
+                        the state's records for their stores; kept while a
+                        kept vector store or another agent's record has them
+
+    Only resources matching the specs' agent and store names and the node
+    file naming are considered, so anything else in the project is left
+    alone. Deletes run in concurrent batches, agent versions first, then
+    stores, then files, so nothing is deleted while something kept still
+    points at it. Entries for deleted resources are dropped from the state
+    file.
+
+USAGE:
+    python reconcile.py --dry-run              # list what would be deleted
+    python reconcile.py --keep 3               # keep the 3 newest versions of each agent
+    python reconcile.py my-voic-agent --concurrency 16
+
+    Before running:
+
+    pip install "azure-ai-projects>=2.0.0b1" azure-identity openai aiohttp python-dotenv
+
+    Set AZURE_AI_PROJECT_ENDPOINT and AZURE_AI_MODEL_DEPLOYMENT_NAME as for
+    main.py / agent.py.
+"""
+
+import argparse
+import asyncio
+import re
+import time
+from dataclasses import dataclass, field
+
+from agent_specs import AGENT_SPECS
+from clients import async_clients
+from provisioning import DeployState, agent_hash, vector_store_hash
+
+DEFAULT_KEEP = 1
+DEFAULT_CONCURRENCY = 8
+DEFAULT_BATCH_SIZE = 100
+PAGE_SIZE = 100
+
+NODE_FILE_PATTERN = re.compile(r"^node_.+\.json$")
+
+
+def _get(item, key, default=None):
+    return item.get(key, default) if isinstance(item, dict) else getattr(item, key, default)
+
+
+def searched_vector_stores(agent_version):
+    """Vector store ids used by the file_search tools of an agent version."""
+    tools = _get(_get(agent_version, "definition", {}), "tools") or []
+    return {vs for tool in tools if _get(tool, "type") == "file_search" for vs in _get(tool, "vector_store_ids") or []}
+
+
+def current_records(specs, state):
+    """The state's vector store and agent records for the current content of ``specs``."""
+    stores, agents = {}, {}
+    for spec in specs:
+        store = state.vector_stores.get(vector_store_hash(spec))
+        if store is None:
+            continue
+        stores[spec.agent_name] = store
+        agent = state.agents.get(agent_hash(spec, store["vector_store_id"]))
+        if agent is not None:
+            agents[spec.agent_name] = agent
+    return stores, agents
+
+
+@dataclass
+class Plan:
+    """Resources to delete, by kind, and how many of each kind were kept."""
+
+    agent_versions: list = field(default_factory=list)  # (agent_name, version)
+    vector_stores: list = field(default_factory=list)
+    files: list = field(default_factory=list)
+    kept: dict = field(default_factory=dict)
+    searched: dict = field(default_factory=dict)  # (agent_name, version) -> vector store ids
+
+    def items(self):
+        return {"agent versions": self.agent_versions, "vector stores": self.vector_stores, "files": self.files}
+
+
+async def list_agent_versions(project_client, agent_name):
+    """All versions of ``agent_name``, newest first; none if the agent does not exist."""
+    from azure.core.exceptions import ResourceNotFoundError
+
+    try:
+        return [v async for v in project_client.agents.list_versions(agent_name, limit=PAGE_SIZE, order="desc")]
+    except ResourceNotFoundError:
+        return []
+
+
+async def list_vector_store_files(openai_client, vector_store_id):
+    return {f.id async for f in openai_client.vector_stores.files.list(vector_store_id=vector_store_id, limit=PAGE_SIZE)}
+
+
+async def plan_reconcile(project_client, openai_client, specs, state, keep=DEFAULT_KEEP):
+    """Work out which agent versions, vector stores and node files are orphaned."""
+    plan = Plan()
+    current_stores, current_agents = current_records(specs, state)
+
+    # Agent versions: the newest ``keep`` plus the one the state deploys for the current spec.
+    versions = await asyncio.gather(*(list_agent_versions(project_client, spec.agent_name) for spec in specs))
+    kept_versions = []
+    for spec, agent_versions in zip(specs, versions):
+        current = current_agents.get(spec.agent_name)
+        for i, version in enumerate(agent_versions):
+            if i < keep or (current and str(current["version"]) == str(version.version)):
+                kept_versions.append(version)
+            else:
+                plan.agent_versions.append((spec.agent_name, version.version))
+                plan.searched[(spec.agent_name, version.version)] = searched_vector_stores(version)
+    plan.kept["agent versions"] = len(kept_versions)
+
+    # Vector stores: any searched by a kept version, plus the current ones.
+    referenced_stores = {vs for version in kept_versions for vs in searched_vector_stores(version)}
+    referenced_stores |= {store["vector_store_id"] for store in current_stores.values()}
+    store_names = {spec.vector_store_name for spec in specs}
+    kept_stores = []
+    async for store in openai_client.vector_stores.list(limit=PAGE_SIZE):
+        if store.name not in store_names:
+            continue
+        if store.id in referenced_stores:
+            kept_stores.append(store.id)
+        else:
+            plan.vector_stores.append(store.id)
+    plan.kept["vector stores"] = len(kept_stores)
+
+    # Files: only those of the selected agents' stores are candidates, so reconciling
+    # one agent never touches another agent's uploads.
+    listed = await asyncio.gather(*(list_vector_store_files(openai_client, vs) for vs in kept_stores + plan.vector_stores))
+    referenced_files = set().union(*listed[: len(kept_stores)])
+    candidate_files = set().union(*listed[len(kept_stores) :])
+    for store in state.vector_stores.values():
+        if store["name"] in store_names:
+            candidate_files |= set(store["file_ids"].values())
+        else:
+            referenced_files |= set(store["file_ids"].values())
+    for store in current_stores.values():
+        referenced_files |= set(store["file_ids"].values())
+    kept_files = 0
+    async for file in openai_client.files.list(purpose="assistants", limit=PAGE_SIZE):
+        if file.id not in candidate_files or not NODE_FILE_PATTERN.match(file.filename or ""):
+            continue
+        if file.id in referenced_files:
+            kept_files += 1
+        else:
+            plan.files.append(file.id)
+    plan.kept["files"] = kept_files
+    return plan
+
+
+async def delete_in_batches(items, delete, concurrency=DEFAULT_CONCURRENCY, batch_size=DEFAULT_BATCH_SIZE):
+    """Run ``delete(item)`` for every item, ``concurrency`` at a time. Returns {item: error} for failures.
+
+    A resource that is already gone counts as deleted.
+    """
+    from azure.core.exceptions import ResourceNotFoundError
+    from openai import NotFoundError
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item):
+        async with semaphore:
+            try:
+                await delete(item)
+            except (ResourceNotFoundError, NotFoundError):
+                pass
+
+    failed = {}
+    for i in range(0, len(items), batch_size):
+        batch = items[i : i + batch_size]
+        results = await asyncio.gather(*(run(item) for item in batch), return_exceptions=True)
+        failed.update({item: result for item, result in zip(batch, results) if isinstance(result, Exception)})
+    return failed
+
+
+async def apply_plan(project_client, openai_client, plan, state, concurrency=DEFAULT_CONCURRENCY, batch_size=DEFAULT_BATCH_SIZE):
+    """Delete what ``plan`` lists and drop the deleted resources from ``state``. Returns {kind: {item: error}}."""
+    failed = {
+        "agent versions": await delete_in_batches(
+            plan.agent_versions, lambda v: project_client.agents.delete_version(v[0], v[1]), concurrency, batch_size
+        )
+    }
+    # A store still searched by a version that failed to delete must stay.
+    still_searched = {vs for version in failed["agent versions"] for vs in plan.searched.get(version, ())}
+    stores = [vs for vs in plan.vector_stores if vs not in still_searched]
+    failed["vector stores"] = await delete_in_batches(
+        stores, lambda vs: openai_client.vector_stores.delete(vector_store_id=vs), concurrency, batch_size
+    )
+    failed["files"] = await delete_in_batches(plan.files, lambda f: openai_client.files.delete(f), concurrency, batch_size)
+
+    deleted_versions = {(name, str(version)) for name, version in plan.agent_versions if (name, version) not in failed["agent versions"]}
+    deleted_stores = {vs for vs in stores if vs not in failed["vector stores"]}
+    state.data["agents"] = {k: r for k, r in state.agents.items() if (r["name"], str(r["version"])) not in deleted_versions}
+    state.data["vector_stores"] = {k: r for k, r in state.vector_stores.items() if r["vector_store_id"] not in deleted_stores}
+    state.save()
+    return failed
+
+
+async def reconcile(specs, keep=DEFAULT_KEEP, dry_run=False, concurrency=DEFAULT_CONCURRENCY, batch_size=DEFAULT_BATCH_SIZE, state=None):
+    """Plan and (unless ``dry_run``) apply the cleanup for ``specs``. Returns (plan, failures)."""
+    state = state or DeployState()
+    async with async_clients() as (project_client, openai_client, _):
+        plan = await plan_reconcile(project_client, openai_client, specs, state, keep=keep)
+        if dry_run:
+            return plan, {}
+        return plan, await apply_plan(project_client, openai_client, plan, state, concurrency=concurrency, batch_size=batch_size)
+
+
+def main():
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Delete orphaned vector stores, node files and agent versions.")
+    parser.add_argument("agents", nargs="*", help=f"Agents to reconcile (default: all of {', '.join(AGENT_SPECS)}).")
+    parser.add_argument("--keep", type=int, default=DEFAULT_KEEP, help="Newest versions of each agent to keep.")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be deleted.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Deletes in flight at once.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Deletes per batch.")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.agents if name not in AGENT_SPECS]
+    if unknown:
+        parser.error(f"unknown agent(s): {', '.join(unknown)}")
+    if args.keep < 0:
+        parser.error("--keep must be 0 or more")
+
+    load_dotenv()
+    specs = [AGENT_SPECS[name]() for name in (args.agents or AGENT_SPECS)]
+
+    start = time.perf_counter()
+    plan, failed = asyncio.run(reconcile(specs, keep=args.keep, dry_run=args.dry_run, concurrency=args.concurrency, batch_size=args.batch_size))
+    verb = "Would delete" if args.dry_run else "Deleted"
+    for kind, items in plan.items().items():
+        errors = failed.get(kind, {})
+        print(f"{verb} {len(items) - len(errors)} {kind}, kept {plan.kept[kind]}")
+        if args.dry_run:
+            for item in items:
+                print(f"  {':'.join(map(str, item)) if isinstance(item, tuple) else item}")
+        for item, error in errors.items():
+            print(f"  failed {item}: {error!r}")
+    print(f"Reconciled in {time.perf_counter() - start:.1f}s")
+    raise SystemExit(1 if any(failed.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+DESCRIPTION:
+    Checkpointed interview state, keyed by call/session id.
+
+    A session holds the current node, the confirmed answers, the retry count
+    for the current question and the silence counter. It is saved after every
+    confirmed answer, so a dropped call resumes where it stopped and the model
+    only needs the compact state, not the whole transcript.
+
+    Backends are chosen by SESSION_STORE:
+        sqlite:///path/to/sessions.db   (default: .sessions.db next to this file)
+        memory://                       (process-local, for tests and benchmarks)
+
+USAGE:
+    store = open_session_store()
+    state = store.load("call-123") or SessionState("call-123", current_node="Q1")
+    state.record_answer("Q1", "Superman", next_node="Q2")
+    store.save(state)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+
+DEFAULT_SESSION_DB = os.path.abspath(os.path.join(os.path.dirname(__file__), ".sessions.db"))
+
+
+@dataclass
+class SessionState:
+    session_id: str
+    current_node: str = ""
+    answers: dict = field(default_factory=dict)
+    retries: int = 0
+    silences: int = 0
+    completed: bool = False
+    updated_at: float = 0.0
+
+    def record_answer(self, question_id, value, next_node=None):
+        """Store a confirmed answer and move to ``next_node``, resetting the per-question counters."""
+        self.answers[question_id] = value
+        if next_node is not None:
+            self.current_node = next_node
+        self.retries = 0
+        self.silences = 0
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+
+class SessionStore:
+    """Backend interface. Implementations must be safe to call from several threads."""
+
+    def load(self, session_id):
+        raise NotImplementedError
+
+    def save(self, state):
+        raise NotImplementedError
+
+    def delete(self, session_id):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def load(self, session_id):
+        with self._lock:
+            data = self._sessions.get(session_id)
+        return SessionState.from_dict(json.loads(data)) if data else None
+
+    def save(self, state):
+        state.updated_at = time.time()
+        with self._lock:
+            self._sessions[state.session_id] = json.dumps(state.to_dict())
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, path=DEFAULT_SESSION_DB):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def load(self, session_id):
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return SessionState.from_dict(json.loads(row[0])) if row else None
+
+    def save(self, state):
+        state.updated_at = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, state, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                (state.session_id, json.dumps(state.to_dict()), state.updated_at),
+            )
+
+    def delete(self, session_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_session_store(url=None):
+    """Open the backend named by ``url`` or the SESSION_STORE environment variable."""
+    url = url or os.environ.get("SESSION_STORE") or f"sqlite:///{DEFAULT_SESSION_DB}"
+    if url.startswith("memory://"):
+        return InMemorySessionStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///") :])
+    raise ValueError(f"Unsupported SESSION_STORE: {url}")
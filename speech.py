@@ -0,0 +1,132 @@
+"""
+DESCRIPTION:
+    Sentence and clause chunking of streamed model text, and the speech sinks
+    that receive the chunks.
+
+    SentenceChunker turns text deltas into speakable pieces: a chunk ends at
+    a sentence boundary (. ! ? followed by whitespace) or, once it is long
+    enough to be worth a TTS request, at a clause boundary (, ; : or a dash).
+    Common abbreviations and decimal numbers do not end a sentence, and a run
+    without any boundary is cut at the last space before MAX_CHUNK_CHARS.
+
+    A speech sink is anything with speak(text), end_turn() and close():
+    PrintSpeechSink writes to stdout, RecordingSpeechSink keeps timestamped
+    chunks for benchmarks, and a TTS-backed sink plugs in the same way.
+
+USAGE:
+    chunker = SentenceChunker()
+    for delta in deltas:
+        for chunk in chunker.feed(delta):
+            sink.speak(chunk)
+    for chunk in chunker.flush():
+        sink.speak(chunk)
+"""
+
+import re
+import sys
+import time
+
+# Clauses shorter than this are held back and spoken with what follows.
+MIN_CLAUSE_CHARS = 24
+MAX_CHUNK_CHARS = 220
+
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "st", "jr", "sr", "vs", "etc", "e.g", "i.e", "no", "apt", "ave"}
+
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*(?=\s)")
+_CLAUSE_END = re.compile(r"(?:[,;:]|\s[-–—])(?=\s)")
+
+
+def _ends_abbreviation(text, end):
+    """True when the period ending at ``end`` belongs to an abbreviation or an initial."""
+    word = re.search(r"([A-Za-z.]+)\.$", text[:end])
+    if not word:
+        return False
+    token = word.group(1).lower()
+    return token in ABBREVIATIONS or len(token) == 1
+
+
+class SentenceChunker:
+    """Incremental splitter: feed() deltas, get back complete chunks; flush() the rest at the end."""
+
+    def __init__(self, min_clause_chars=MIN_CLAUSE_CHARS, max_chunk_chars=MAX_CHUNK_CHARS):
+        self.min_clause_chars = min_clause_chars
+        self.max_chunk_chars = max_chunk_chars
+        self._buffer = ""
+
+    def feed(self, delta):
+        self._buffer += delta
+        chunks = []
+        while True:
+            cut = self._boundary()
+            if cut is None:
+                break
+            chunk, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:].lstrip()
+            if chunk:
+                chunks.append(chunk)
+        return chunks
+
+    def flush(self):
+        chunk, self._buffer = self._buffer.strip(), ""
+        return [chunk] if chunk else []
+
+    def _boundary(self):
+        """Index just past the earliest usable boundary in the buffer, or None."""
+        text = self._buffer
+        sentence = next(
+            (m.end() for m in _SENTENCE_END.finditer(text) if not (text[m.end() - 1] == "." and _ends_abbreviation(text, m.end()))),
+            None,
+        )
+        clause = next((m.end() for m in _CLAUSE_END.finditer(text) if m.end() >= self.min_clause_chars), None)
+        cuts = [cut for cut in (sentence, clause) if cut is not None]
+        if cuts:
+            return min(cuts)
+        if len(text) > self.max_chunk_chars:
+            space = text.rfind(" ", 0, self.max_chunk_chars)
+            return space if space > 0 else self.max_chunk_chars
+        return None
+
+
+class SpeechSink:
+    """Receives speakable chunks in order. speak() should return once the chunk's audio is ready or queued."""
+
+    def speak(self, text):
+        raise NotImplementedError
+
+    def end_turn(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class NullSpeechSink(SpeechSink):
+    def speak(self, text):
+        pass
+
+
+class PrintSpeechSink(SpeechSink):
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def speak(self, text):
+        self.stream.write(text + " ")
+        self.stream.flush()
+
+    def end_turn(self):
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+class RecordingSpeechSink(SpeechSink):
+    """Keeps (perf_counter timestamp, text) per chunk and the chunks of each finished turn."""
+
+    def __init__(self):
+        self.chunks = []
+        self.turns = []
+
+    def speak(self, text):
+        self.chunks.append((time.perf_counter(), text))
+
+    def end_turn(self):
+        self.turns.append([text for _, text in self.chunks])
+        self.chunks = []
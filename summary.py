@@ -0,0 +1,122 @@
+"""
+DESCRIPTION:
+    Deterministic END-of-interview summary and submission payload.
+
+    Reading every answer back used to be the model's longest generation of
+    the call, and assembling the Cosmos DB document by hand is where
+    stringified or malformed payloads came from. Both are built here instead,
+    straight from the session's confirmed answers and the question nodes,
+    grouped by meta.section in the order the sections were answered:
+
+        summary_chunks()    the spoken read-back, one chunk per section (long
+                            sections split at item boundaries), ready for TTS
+        build_payload()     {"sessionId", "completed", "sections": {section:
+                            {field: value}}} with "" for empty and "NA" for
+                            not-applicable answers
+
+    Field names come from meta.field when a node has one, otherwise from the
+    snake_cased label. The read_summary tool returns both; the conversation
+    driver speaks the chunks itself, so all the model says is "Does everything
+    sound correct?".
+
+USAGE:
+    for chunk in summary_chunks(graph, state.answers):
+        sink.speak(chunk)
+    build_payload(graph, "call-123", state.answers)
+"""
+
+import re
+
+from normalization import NA_PHRASES
+from phrasing import field_label
+from speech import MAX_CHUNK_CHARS
+
+SUMMARY_INTRO = "Let me quickly read back what I have."
+
+SECTION_TITLES = {
+    "personal": "your personal details",
+    "employment": "your employment",
+    "medical_history": "your medical history",
+}
+OTHER_SECTION = "other"
+
+SPOKEN_EMPTY = "none given"
+SPOKEN_NA = "not applicable"
+
+
+def field_name(node):
+    meta = node.get("meta") or {}
+    return meta.get("field") or re.sub(r"[^a-z0-9]+", "_", field_label(node.get("text")).casefold().replace("'", "")).strip("_")
+
+
+def payload_value(value):
+    """Stored form of an answer: "" for no value, "NA" for not applicable, otherwise the trimmed text.
+
+    Answers were already normalized when they were confirmed; this only
+    catches not-applicable spellings, so a confirmed "No" stays "No".
+    """
+    if value is None:
+        return ""
+    text = str(value).strip()
+    return "NA" if text.casefold() in NA_PHRASES else text
+
+
+def spoken_value(value):
+    value = payload_value(value)
+    if value == "":
+        return SPOKEN_EMPTY
+    if value == "NA":
+        return SPOKEN_NA
+    return value
+
+
+def grouped_answers(graph, answers):
+    """{section: [(question id, node, value), ...]} in answer order; unknown question ids are skipped."""
+    sections = {}
+    for question_id, value in answers.items():
+        node = graph.nodes.get(question_id)
+        if node is None or node.get("type") in ("end", "action"):
+            continue
+        section = (node.get("meta") or {}).get("section") or OTHER_SECTION
+        sections.setdefault(section, []).append((question_id, node, value))
+    return sections
+
+
+def _section_title(section):
+    return SECTION_TITLES.get(section) or section.replace("_", " ")
+
+
+def _spoken_label(node):
+    return (node.get("meta") or {}).get("summary_label") or field_label(node.get("text")).replace(" - ", " ").rstrip("?").strip()
+
+
+def summary_chunks(graph, answers, max_chars=MAX_CHUNK_CHARS):
+    """Yield the spoken summary: the intro, then each section's answers."""
+    yield SUMMARY_INTRO
+    for section, items in grouped_answers(graph, answers).items():
+        chunk = f"For {_section_title(section)}:"
+        for _, node, value in items:
+            item = f"{_spoken_label(node)}, {spoken_value(value)}"
+            if len(chunk) + len(item) + 2 > max_chars and not chunk.endswith(":"):
+                yield chunk + "."
+                chunk = item
+            else:
+                chunk = f"{chunk} {item}" if chunk.endswith(":") else f"{chunk}; {item}"
+        yield chunk + "."
+
+
+def render_summary(graph, answers):
+    return " ".join(summary_chunks(graph, answers))
+
+
+def build_payload(graph, session_id, answers):
+    """JSON-compatible submission document for a finished session."""
+    sections = {}
+    for section, items in grouped_answers(graph, answers).items():
+        fields = sections.setdefault(section, {})
+        for question_id, node, value in items:
+            name = field_name(node) or question_id
+            if name in fields:
+                name = f"{name}_{question_id.lower()}"
+            fields[name] = payload_value(value)
+    return {"sessionId": session_id, "completed": True, "sections": sections}
@@ -0,0 +1,28 @@
+"""
+DESCRIPTION:
+    Token estimates for prompts and conversation items.
+
+    Uses tiktoken's o200k_base encoding when tiktoken is installed, and falls
+    back to the usual four-characters-per-token estimate otherwise.
+"""
+
+import json
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding("o200k_base")
+
+
+def estimate_tokens(text):
+    if not isinstance(text, str):
+        text = json.dumps(text, ensure_ascii=False, separators=(",", ":"))
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
@@ -0,0 +1,334 @@
+"""
+DESCRIPTION:
+    Spans per turn, model call and tool call, exported to JSONL or OTLP.
+
+    ConversationDriver (and its async and streaming variants) take a Tracer.
+    Each caller turn becomes a "turn" span, in one trace per conversation,
+    with one child span per model request and per function tool call:
+
+        turn    node_id (question being answered), retries on that node after
+                the turn, model_calls, tool_calls, tokens
+        model   model, route and attempt (2 when a fast response was rejected
+                and re-sent to the main model), input/cached/output tokens and
+                the hosted tools the response ran (file_search_call, mcp_call)
+        tool    tool name, node_id from its questionId/currentNode argument,
+                and error when the tool answered with one
+
+    Hosted tools run inside the model call, so their time is part of the
+    model span; they appear as its server_tools attribute.
+
+    Exporters are picked by URL, from the argument or TRACE_EXPORT:
+        file:///path/to/traces.jsonl      one span per line
+        otlp+http://localhost:4318        OTLP/HTTP JSON to <url>/v1/traces, batched in a background thread
+        memory://                         kept in a list (tests, benchmarks)
+
+    The report aggregates a JSONL file: p50/p95 per node, per tool and per
+    model route.
+
+USAGE:
+    tracer = Tracer(open_span_exporter("file://traces.jsonl"))
+    driver = ConversationDriver(openai_client, model, sarah_instructions(), session_id="call-1", tracer=tracer)
+    ...
+    tracer.close()
+
+    python tracing.py traces.jsonl
+"""
+
+import argparse
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+
+from metrics import summarize
+
+SERVICE_NAME = "voice-questionnaire-agent"
+
+OTLP_BATCH_SIZE = 256
+OTLP_TIMEOUT = 5.0
+# A partial batch is sent after this many idle seconds.
+OTLP_FLUSH_INTERVAL = 1.0
+
+_CLOSE = object()
+
+
+def new_trace_id():
+    return secrets.token_hex(16)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str = None
+    start_ns: int = 0
+    duration: float = 0.0
+    status: str = "ok"
+    attributes: dict = field(default_factory=dict)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class _ActiveSpan:
+    """Context manager that times a span and exports it on exit."""
+
+    __slots__ = ("tracer", "span", "_started")
+
+    def __init__(self, tracer, span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self):
+        self.span.start_ns = time.time_ns()
+        self._started = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.duration = time.perf_counter() - self._started
+        if exc is not None:
+            self.span.status = "error"
+            self.span.attributes.setdefault("error", repr(exc))
+        self.tracer.export(self.span)
+        return False
+
+
+class Tracer:
+    """Creates spans and hands finished ones to an exporter; without one, spans are dropped."""
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self):
+        return self.exporter is not None
+
+    def span(self, name, parent=None, trace_id=None, **attributes):
+        """A context manager that yields a Span and exports it when the block exits."""
+        trace_id = parent.trace_id if parent is not None else trace_id or new_trace_id()
+        span = Span(name, trace_id, secrets.token_hex(8), parent.span_id if parent is not None else None, attributes=attributes)
+        return _ActiveSpan(self, span)
+
+    def export(self, span):
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+    def close(self):
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+class InMemorySpanExporter:
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def close(self):
+        pass
+
+
+class JsonlSpanExporter:
+    """Appends one JSON object per span; safe to share between threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def otlp_span(span):
+    """One span in the OTLP/JSON encoding."""
+    otlp = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.start_ns + int(span.duration * 1e9)),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items() if v is not None],
+        "status": {"code": 2 if span.status == "error" else 1},
+    }
+    if span.parent_id:
+        otlp["parentSpanId"] = span.parent_id
+    return otlp
+
+
+def otlp_payload(spans, service_name=SERVICE_NAME):
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+                "scopeSpans": [{"scope": {"name": "tracing"}, "spans": [otlp_span(s) for s in spans]}],
+            }
+        ]
+    }
+
+
+class OtlpHttpSpanExporter:
+    """Posts spans in batches to an OTLP/HTTP collector from a background thread.
+
+    Export never blocks the call: spans are queued, and a batch that cannot
+    be delivered is counted in ``dropped`` instead of raising.
+    """
+
+    def __init__(self, endpoint, batch_size=OTLP_BATCH_SIZE, timeout=OTLP_TIMEOUT, service_name=SERVICE_NAME):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.service_name = service_name
+        self.sent = 0
+        self.dropped = 0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._worker.start()
+
+    def export(self, span):
+        self._queue.put(span)
+
+    def close(self):
+        self._queue.put(_CLOSE)
+        self._worker.join()
+
+    def _run(self):
+        batch = []
+        while True:
+            try:
+                span = self._queue.get(timeout=OTLP_FLUSH_INTERVAL if batch else None)
+            except queue.Empty:
+                span = None
+            if span is not None and span is not _CLOSE:
+                batch.append(span)
+                if len(batch) < self.batch_size:
+                    continue
+            if batch:
+                self._post(batch)
+                batch = []
+            if span is _CLOSE:
+                return
+
+    def _post(self, spans):
+        body = json.dumps(otlp_payload(spans, self.service_name)).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+            self.sent += len(spans)
+        except (urllib.error.URLError, OSError):
+            self.dropped += len(spans)
+
+
+def open_span_exporter(url=None):
+    """Open the exporter named by ``url`` or TRACE_EXPORT; None when tracing is off."""
+    url = url or os.environ.get("TRACE_EXPORT")
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return InMemorySpanExporter()
+    if url.startswith("file://"):
+        return JsonlSpanExporter(url[len("file://") :])
+    if url.startswith(("otlp+http://", "otlp+https://")):
+        return OtlpHttpSpanExporter(url[len("otlp+") :])
+    raise ValueError(f"Unsupported TRACE_EXPORT: {url}")
+
+
+# Report
+
+
+def load_spans(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def aggregate(spans):
+    """Latency summaries per node (turn spans), per tool and per model route, plus error and retry counts."""
+    groups = {"node": defaultdict(list), "tool": defaultdict(list), "model": defaultdict(list)}
+    errors = defaultdict(int)
+    retries = defaultdict(int)
+    for span in spans:
+        attributes = span.get("attributes") or {}
+        if span["name"] == "turn":
+            key = ("node", attributes.get("node_id") or "(start)")
+            retries[key] = max(retries[key], attributes.get("retries") or 0)
+        elif span["name"] == "tool":
+            key = ("tool", attributes.get("tool") or "?")
+        elif span["name"] == "model":
+            key = ("model", attributes.get("route") or attributes.get("model") or "?")
+        else:
+            continue
+        groups[key[0]][key[1]].append(span["duration"])
+        if span.get("status") == "error" or attributes.get("error"):
+            errors[key] += 1
+    return {
+        kind: {
+            name: {**summarize(durations), "errors": errors[(kind, name)], **({"max_retries": retries[(kind, name)]} if kind == "node" else {})}
+            for name, durations in sorted(by_name.items())
+        }
+        for kind, by_name in groups.items()
+    }
+
+
+def print_report(report, top=None):
+    for kind, title in (("node", "turns by node"), ("tool", "tool calls"), ("model", "model calls by route")):
+        rows = sorted(report[kind].items(), key=lambda item: item[1]["p95"], reverse=True)[:top]
+        if not rows:
+            continue
+        print(f"\n{title}")
+        print(f"  {'name':<32} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'errors':>6}")
+        for name, stats in rows:
+            print(
+                f"  {name:<32} {stats['count']:>6} {stats['p50'] * 1000:>8.1f} {stats['p95'] * 1000:>8.1f} "
+                f"{stats['max'] * 1000:>8.1f} {stats['errors']:>6}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="p50/p95 latency per node, tool and model route from a JSONL trace file.")
+    parser.add_argument("path", help="JSONL file written with TRACE_EXPORT=file://...")
+    parser.add_argument("--top", type=int, help="Show only the N slowest rows of each table (by p95).")
+    parser.add_argument("--json", action="store_true", help="Print the aggregate as JSON.")
+    args = parser.parse_args()
+
+    report = aggregate(load_spans(args.path))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, top=args.top)
+
+
+if __name__ == "__main__":
+    main()
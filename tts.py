@@ -0,0 +1,159 @@
+"""
+DESCRIPTION:
+    Pluggable text-to-speech with an LRU disk cache of synthesized audio.
+
+    A TTS engine is anything with synthesize(text) -> bytes and a cache_key
+    naming its voice and settings. OpenAITextToSpeech uses the audio.speech
+    endpoint of an OpenAI-compatible client; other engines plug in the same
+    way.
+
+    CachedTextToSpeech puts an AudioCache in front of an engine. Fixed lines
+    (question prompts, section transitions, silence phrases) are synthesized
+    once, at build time by phrasing.py or on first use, and read from disk
+    after that. The cache stores one file per (engine settings, text) and
+    evicts the least recently used files once it grows past max_bytes.
+
+    TtsSpeechSink is a speech sink (see speech.py) that synthesizes each
+    chunk through the cache and hands the audio to a player callback.
+
+    AUDIO_CACHE_DIR and AUDIO_CACHE_MAX_MB configure the default cache.
+
+USAGE:
+    tts = CachedTextToSpeech(OpenAITextToSpeech(openai_client), open_audio_cache())
+    audio = tts.synthesize("What's your first name?")
+    sink = TtsSpeechSink(tts, play=audio_out.write)
+"""
+
+import hashlib
+import os
+import threading
+
+from speech import SpeechSink
+
+DEFAULT_AUDIO_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".audio_cache"))
+DEFAULT_AUDIO_CACHE_MAX_MB = 256
+
+DEFAULT_TTS_MODEL = "gpt-4o-mini-tts"
+DEFAULT_TTS_VOICE = "alloy"
+DEFAULT_AUDIO_FORMAT = "wav"
+
+
+class OpenAITextToSpeech:
+    """Speech from an OpenAI-compatible client's audio.speech endpoint."""
+
+    def __init__(self, openai_client, model=DEFAULT_TTS_MODEL, voice=DEFAULT_TTS_VOICE, response_format=DEFAULT_AUDIO_FORMAT):
+        self.client = openai_client
+        self.model = model
+        self.voice = voice
+        self.response_format = response_format
+
+    @property
+    def cache_key(self):
+        return f"openai:{self.model}:{self.voice}:{self.response_format}"
+
+    def synthesize(self, text):
+        response = self.client.audio.speech.create(model=self.model, voice=self.voice, input=text, response_format=self.response_format)
+        return response.content
+
+
+class AudioCache:
+    """Directory of audio files bounded by total size, evicting the least recently used.
+
+    Recency is the file's mtime, refreshed on every hit, so it survives
+    restarts and can be shared by processes on one host.
+    """
+
+    def __init__(self, directory=DEFAULT_AUDIO_CACHE_DIR, max_bytes=DEFAULT_AUDIO_CACHE_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._sizes = {}
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(".audio") and os.path.isfile(path):
+                self._sizes[path] = os.path.getsize(path)
+        self.total_bytes = sum(self._sizes.values())
+
+    def path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".audio")
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return data
+
+    def put(self, key, data):
+        path = self.path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.total_bytes += len(data) - self._sizes.get(path, 0)
+            self._sizes[path] = len(data)
+            if self.total_bytes > self.max_bytes:
+                self._evict(keep=path)
+
+    def _evict(self, keep):
+        def mtime(path):
+            try:
+                return os.path.getmtime(path)
+            except FileNotFoundError:
+                return 0.0
+
+        for path in sorted(self._sizes, key=mtime):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.total_bytes -= self._sizes.pop(path)
+
+
+def open_audio_cache(directory=None, max_mb=None):
+    directory = directory or os.environ.get("AUDIO_CACHE_DIR") or DEFAULT_AUDIO_CACHE_DIR
+    max_mb = max_mb or float(os.environ.get("AUDIO_CACHE_MAX_MB", DEFAULT_AUDIO_CACHE_MAX_MB))
+    return AudioCache(directory, int(max_mb * 1024 * 1024))
+
+
+class CachedTextToSpeech:
+    """A TTS engine behind an AudioCache; safe to share between threads."""
+
+    def __init__(self, engine, cache):
+        self.engine = engine
+        self.cache = cache
+        self.stats = {"hits": 0, "misses": 0}
+
+    def synthesize(self, text):
+        key = f"{self.engine.cache_key}\n{text}"
+        audio = self.cache.get(key)
+        if audio is not None:
+            self.stats["hits"] += 1
+            return audio
+        self.stats["misses"] += 1
+        audio = self.engine.synthesize(text)
+        self.cache.put(key, audio)
+        return audio
+
+
+class TtsSpeechSink(SpeechSink):
+    """Speech sink that synthesizes every chunk and passes the audio to ``play``."""
+
+    def __init__(self, tts, play):
+        self.tts = tts
+        self.play = play
+
+    def speak(self, text):
+        self.play(self.tts.synthesize(text))
@@ -0,0 +1,205 @@
+"""
+DESCRIPTION:
+    asyncio turn manager that owns the call's silence timers.
+
+    A model cannot keep time, so silence is handled here instead of in the
+    prompt. After the agent finishes speaking, the manager waits for the
+    caller. Each silence timeout plays a fixed phrase from SILENCE_POLICIES
+    through the speech sink and records the silence in the session, with no
+    model call. The third consecutive silence plays the goodbye phrase and
+    ends the call. Any speech (even a speech-start event before the
+    transcript is final) stops the timer; a transcript resets the counter,
+    in memory and in the session. A speech-start that is not followed by a
+    transcript within SPEECH_TIMEOUT_SECONDS (a voice activity false
+    positive) re-arms the silence timer.
+
+    Caller events arrive on an asyncio.Queue:
+        SpeechStarted()          voice activity detected; stop the timer
+        Transcript("...")        final text of one caller utterance
+        Hangup()                 the caller hung up
+
+USAGE:
+    events = asyncio.Queue()
+    manager = TurnManager(driver, speech_sink, SILENCE_POLICIES["sarah"])
+    outcome = await manager.run(events)    # "completed", "silence" or "hangup"
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+
+from agent_tools import get_graph, get_session_store
+
+# Longest wait for a transcript after the caller starts speaking.
+SPEECH_TIMEOUT_SECONDS = 15.0
+
+
+@dataclass(frozen=True)
+class SpeechStarted:
+    pass
+
+
+@dataclass(frozen=True)
+class Transcript:
+    text: str
+
+
+@dataclass(frozen=True)
+class Hangup:
+    pass
+
+
+@dataclass(frozen=True)
+class SilencePolicy:
+    """Seconds to wait before each silence phrase, counted from the previous prompt, and the phrases.
+
+    Phrases may use {question}, the text of the question being asked. The
+    last phrase ends the call.
+    """
+
+    waits: tuple
+    phrases: tuple
+
+    @property
+    def max_silences(self):
+        return len(self.waits)
+
+
+SILENCE_POLICIES = {
+    # Sarah: 2s, then 3s more (5s total), then 3s more (8s total).
+    "sarah": SilencePolicy(
+        waits=(2.0, 3.0, 3.0),
+        phrases=(
+            "Take your time, I'm here when you're ready.",
+            "No worries! I was asking: {question}",
+            "It sounds like now might not be the best time. No problem - call back anytime. Have a great day!",
+        ),
+    ),
+    "terse": SilencePolicy(
+        waits=(1.8, 1.8, 1.8),
+        phrases=(
+            "I didn't hear a response. Please answer the question. {question}",
+            "I still didn't catch that. Please say your answer now. {question}",
+            "It seems you're unavailable right now. We can continue later. Thank you.",
+        ),
+    ),
+}
+
+
+@dataclass
+class SilenceEvent:
+    silence: int
+    scheduled: float
+    actual: float
+
+
+@dataclass
+class CallStats:
+    silences: list = field(default_factory=list)
+    model_turns: int = 0
+    outcome: str = ""
+
+    @property
+    def timer_errors(self):
+        """Seconds each silence phrase fired after its scheduled time."""
+        return [event.actual - event.scheduled for event in self.silences]
+
+
+class TurnManager:
+    """Runs one call: caller events in, agent turns and silence phrases out."""
+
+    def __init__(self, driver, speech_sink, policy, clock=time.monotonic, speech_timeout=SPEECH_TIMEOUT_SECONDS):
+        self.driver = driver
+        self.speech_sink = speech_sink
+        self.policy = policy
+        self.clock = clock
+        self.speech_timeout = speech_timeout
+        self.stats = CallStats()
+        # Streaming drivers speak their own replies; others hand back text for the sink.
+        self._driver_speaks = getattr(driver, "speech_sink", None) is not None
+
+    async def run(self, events):
+        """Drive the call until the interview completes, the caller hangs up or stays silent."""
+        await self._agent_turn(None)
+        silences = 0
+        while not self.driver.finished:
+            event, scheduled = await self._next_event(events, self.policy.waits[silences])
+            if event is None:
+                silences += 1
+                self.stats.silences.append(SilenceEvent(silences, scheduled, self.clock()))
+                await self._record_silences(silences)
+                question = await self._current_question()
+                await self._say(self.policy.phrases[silences - 1].format(question=question))
+                if silences >= self.policy.max_silences:
+                    return self._finish("silence")
+                continue
+            if isinstance(event, Hangup):
+                return self._finish("hangup")
+            if silences:
+                silences = 0
+                await self._record_silences(0)
+            if isinstance(event, Transcript):
+                await self._agent_turn(event.text)
+        return self._finish("completed")
+
+    async def _next_event(self, events, wait):
+        """(next caller event, silence deadline), with None as the event if the deadline passes first.
+
+        Speech-start stops the clock until the transcript arrives; if none arrives
+        within the speech timeout, the silence clock starts again from there.
+        """
+        deadline = self.clock() + wait
+        timeout = wait
+        speaking = False
+        while True:
+            try:
+                event = await asyncio.wait_for(events.get(), max(0.0, timeout))
+            except asyncio.TimeoutError:
+                if not speaking:
+                    return None, deadline
+                speaking = False
+                deadline = self.clock() + wait
+                timeout = wait
+                continue
+            if not isinstance(event, SpeechStarted):
+                return event, deadline
+            speaking = True
+            timeout = self.speech_timeout
+
+    async def _agent_turn(self, text):
+        self.stats.model_turns += 1
+        call = self.driver.start if text is None else self.driver.turn
+        args = () if text is None else (text,)
+        if inspect.iscoroutinefunction(call):
+            reply = await call(*args)
+        else:
+            reply = await asyncio.to_thread(call, *args)
+        if not self._driver_speaks:
+            await self._say(reply)
+
+    async def _say(self, text):
+        if text:
+            await asyncio.to_thread(self.speech_sink.speak, text)
+            await asyncio.to_thread(self.speech_sink.end_turn)
+
+    async def _record_silences(self, silences):
+        def update():
+            store = get_session_store()
+            state = store.load(self.driver.session_id)
+            if state is not None:
+                state.silences = silences
+                store.save(state)
+
+        await asyncio.to_thread(update)
+
+    async def _current_question(self):
+        state = await asyncio.to_thread(get_session_store().load, self.driver.session_id)
+        node = get_graph().nodes.get(state.current_node) if state else None
+        if not node:
+            return ""
+        return (node.get("phrasing") or {}).get("prompt") or node.get("text", "")
+
+    def _finish(self, outcome):
+        self.stats.outcome = outcome
+        return outcome